@@ -0,0 +1,107 @@
+"""
+Timed benchmarks for the analysis and plotting hot paths.
+
+    python -m pytest benchmarks/bench_analysis.py --benchmark-columns=min,median,max
+
+Sizes (rows per frame) come from BENCH_SIZES (default "10000,100000"); add
+1000000 or more to compare against production volumes. Each case also
+records the rows and the tracemalloc peak of one run in extra_info, which
+is included in --benchmark-json output.
+"""
+import os
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from benchmarks.synthetic import FrameStore, make_sensor_frame
+from utils.co_coverage import compute_co_coverage_matrix, compute_partial_co_coverage_vector
+from utils.filtering import filter_single_dataset_by_heuristics
+from utils.missingness import compute_gap_stats
+from utils.plot_functions import plot_temporal_coverage_heatmap, plot_time_series_heatmap
+from utils.summary import calculate_comprehensive_statistics
+
+SIZES = [int(size) for size in os.environ.get('BENCH_SIZES', '10000,100000').split(',')]
+ROUNDS = int(os.environ.get('BENCH_ROUNDS', '3'))
+N_FEATURES = int(os.environ.get('BENCH_FEATURES', '12'))
+
+_frames = {}
+
+
+def sensor_frame(n_rows, seed=0):
+    key = (n_rows, seed)
+    if key not in _frames:
+        _frames[key] = make_sensor_frame(n_rows, n_features=N_FEATURES, gap_distribution='pareto',
+                                         dropped_rows=0.01, seed=seed)
+    return _frames[key]
+
+
+def run(benchmark, func, *args, **kwargs):
+    """Record the peak traced memory of one call, then time the call."""
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info['peak_mb'] = round(peak / 2 ** 20, 2)
+    return benchmark.pedantic(func, args=args, kwargs=kwargs, rounds=ROUNDS, iterations=1)
+
+
+@pytest.mark.parametrize('n_rows', SIZES)
+def test_gap_stats(benchmark, n_rows):
+    df = sensor_frame(n_rows)
+    benchmark.extra_info['rows'] = n_rows
+    run(benchmark, compute_gap_stats, df)
+
+
+@pytest.mark.parametrize('n_rows', SIZES)
+def test_co_coverage_matrix(benchmark, n_rows):
+    df = sensor_frame(n_rows)
+    benchmark.extra_info['rows'] = n_rows
+    run(benchmark, compute_co_coverage_matrix, df)
+
+
+@pytest.mark.parametrize('n_rows', SIZES)
+def test_partial_co_coverage_vector(benchmark, n_rows):
+    df = sensor_frame(n_rows)
+    feature_pool = [*df.columns[1:], 'absent_feature']
+    daily_bins = pd.date_range(df['Date'].min().floor('D'), df['Date'].max().ceil('D'), freq='D')
+    benchmark.extra_info['rows'] = n_rows
+    run(benchmark, compute_partial_co_coverage_vector, df, feature_pool, daily_bins)
+
+
+@pytest.mark.parametrize('n_rows', SIZES)
+def test_filter_by_heuristics(benchmark, n_rows):
+    df = sensor_frame(n_rows)
+    benchmark.extra_info['rows'] = n_rows
+    run(benchmark, filter_single_dataset_by_heuristics, df, list(df.columns[1:5]))
+
+
+@pytest.mark.parametrize('n_rows', SIZES)
+def test_comprehensive_statistics(benchmark, n_rows):
+    store = FrameStore({
+        'Sweden Bedroom': sensor_frame(n_rows, seed=0),
+        'Sweden Livingroom': sensor_frame(n_rows, seed=1),
+        'India': sensor_frame(n_rows, seed=2),
+    })
+    benchmark.extra_info['rows'] = 3 * n_rows
+    run(benchmark, calculate_comprehensive_statistics, store)
+
+
+@pytest.mark.parametrize('n_rows', SIZES)
+@pytest.mark.parametrize('renderer', ['heatmap', 'image'])
+def test_time_series_heatmap(benchmark, n_rows, renderer):
+    df = sensor_frame(n_rows)
+    benchmark.extra_info['rows'] = n_rows
+    run(benchmark, lambda: plot_time_series_heatmap(df, renderer=renderer).to_json())
+
+
+@pytest.mark.parametrize('n_rows', SIZES)
+@pytest.mark.parametrize('renderer', ['heatmap', 'image'])
+def test_temporal_coverage_heatmap(benchmark, n_rows, renderer):
+    df = sensor_frame(n_rows)
+    benchmark.extra_info['rows'] = n_rows
+    run(benchmark, lambda: plot_temporal_coverage_heatmap(df, 'D', renderer=renderer).to_json())
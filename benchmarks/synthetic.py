@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+GAP_DISTRIBUTIONS = ('geometric', 'pareto', 'fixed')
+
+
+def _gap_lengths(rng, n, mean_length, distribution):
+    """Draw n gap lengths (in rows, at least 1) with the given mean."""
+    if distribution == 'geometric':
+        return rng.geometric(1 / max(mean_length, 1), size=n)
+    if distribution == 'pareto':
+        # Lomax with shape 2 has mean equal to its scale: mostly short gaps, a few very long ones
+        return np.maximum((rng.pareto(2.0, size=n) * mean_length).astype(np.int64), 1)
+    if distribution == 'fixed':
+        return np.full(n, max(int(mean_length), 1))
+    raise ValueError(f"Unsupported gap distribution: {distribution}")
+
+
+def _gap_mask(rng, n_rows, rate, mean_length, distribution):
+    """Boolean mask with runs of True covering about `rate` of the rows."""
+    n_gaps = int(round(n_rows * rate / max(mean_length, 1)))
+    if n_gaps == 0 or n_rows == 0:
+        return np.zeros(n_rows, dtype=bool)
+    starts = rng.integers(0, n_rows, size=n_gaps)
+    ends = np.minimum(starts + _gap_lengths(rng, n_gaps, mean_length, distribution), n_rows)
+    delta = np.zeros(n_rows + 1, dtype=np.int64)
+    np.add.at(delta, starts, 1)
+    np.add.at(delta, ends, -1)
+    return np.cumsum(delta[:-1]) > 0
+
+
+def make_sensor_frame(n_rows=10_000, freq='5min', n_features=8, start='2023-01-01', missing_rate=0.1,
+                      mean_gap=12, gap_distribution='geometric', outage_rate=0.02, mean_outage=72,
+                      outage_features=1.0, dropped_rows=0.0, seed=0):
+    """
+    Synthetic indoor-air-quality style frame with realistic missingness.
+
+    Each feature is a daily cycle plus a random walk and noise. Missing values
+    come from independent per-feature gaps and from outages that blank a
+    group of features at the same time (a logger or gateway going down).
+
+    Parameters:
+        n_rows (int): Number of timestamps before dropping rows.
+        freq (str): Sampling interval.
+        n_features (int): Number of numeric features.
+        start (str): First timestamp.
+        missing_rate (float): Approximate fraction of each feature lost to independent gaps.
+        mean_gap (float): Mean independent gap length in rows.
+        gap_distribution (str): 'geometric', 'pareto' (heavy-tailed) or 'fixed'.
+        outage_rate (float): Approximate fraction of rows inside correlated outages.
+        mean_outage (float): Mean outage length in rows.
+        outage_features (float): Fraction of features blanked by each outage.
+        dropped_rows (float): Fraction of timestamps removed entirely (irregular sampling).
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: 'Date' column followed by float features 'sensor_0', 'sensor_1', ...
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=n_rows, freq=freq)
+    hours = (dates.hour + dates.minute / 60).to_numpy()
+
+    daily = np.sin(2 * np.pi * hours / 24)[:, None] * rng.uniform(1, 10, n_features)
+    drift = np.cumsum(rng.normal(0, 0.05, (n_rows, n_features)), axis=0)
+    values = 20 * rng.uniform(0.5, 2, n_features) + daily + drift + rng.normal(0, 0.5, (n_rows, n_features))
+
+    for f in range(n_features):
+        values[_gap_mask(rng, n_rows, missing_rate, mean_gap, gap_distribution), f] = np.nan
+
+    outage = _gap_mask(rng, n_rows, outage_rate, mean_outage, gap_distribution)
+    affected = rng.permutation(n_features)[:max(int(round(n_features * outage_features)), 1)]
+    values[np.ix_(outage, affected)] = np.nan
+
+    df = pd.DataFrame(values, columns=[f'sensor_{i}' for i in range(n_features)])
+    df.insert(0, 'Date', dates)
+    if dropped_rows:
+        df = df[rng.random(n_rows) >= dropped_rows].reset_index(drop=True)
+    return df
+
+
+class FrameStore:
+    """
+    Minimal in-memory stand-in for DataSingleton (dataset_names / get_data).
+    """
+
+    def __init__(self, frames):
+        self._frames = dict(frames)
+
+    def dataset_names(self):
+        return list(self._frames)
+
+    def get_data(self, dataset_name):
+        if dataset_name not in self._frames:
+            raise ValueError(f"Dataset {dataset_name} not found.")
+        return self._frames[dataset_name]
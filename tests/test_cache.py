@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from utils.datasets.cache import DatasetCache
+from utils.datasets.data_singleton import _load_dataset, _load_in_worker
+
+
+class _Loader:
+    VERSION = 1
+    frame = None
+
+    @classmethod
+    def load_and_preprocess(cls, file_path):
+        return cls.frame.copy()
+
+
+def _source(tmp_path):
+    path = tmp_path / 'source.csv'
+    path.write_text('x')
+    return str(path)
+
+
+def test_round_trip(tmp_path):
+    _Loader.frame = pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=5, freq='h'),
+                                  'PM2.5': [1.0, np.nan, 3.0, 4.0, 5.0]})
+    cache = DatasetCache(tmp_path / 'cache')
+    source = _source(tmp_path)
+    first, origin = _load_dataset(_Loader, source, cache)
+    assert origin == 'file'
+    second, origin = _load_dataset(_Loader, source, cache)
+    assert origin == 'cache'
+    pd.testing.assert_frame_equal(second, first)
+
+
+def test_mixed_object_column_loads_uncached(tmp_path):
+    _Loader.frame = pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=4, freq='h'),
+                                  'Note': [1, 'a', 2.0, None]})
+    cache = DatasetCache(tmp_path / 'cache')
+    source = _source(tmp_path)
+    data, origin = _load_dataset(_Loader, source, cache)
+    pd.testing.assert_frame_equal(data, _Loader.frame)
+    assert origin == 'file'
+    assert cache.load(source, _Loader) is None
+
+    (kind, payload), _ = _load_in_worker(_Loader, source, cache)
+    assert kind == 'pickle'
+    pd.testing.assert_frame_equal(payload, _Loader.frame)
+
+
+def test_unwritable_cache_dir_loads_uncached(tmp_path):
+    _Loader.frame = pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=4, freq='h'), 'CO2': [1.0, 2, 3, 4]})
+    blocker = tmp_path / 'not-a-directory'
+    blocker.write_text('')
+    cache = DatasetCache(blocker / 'cache')
+    data, origin = _load_dataset(_Loader, _source(tmp_path), cache)
+    assert origin == 'file'
+    pd.testing.assert_frame_equal(data, _Loader.frame)
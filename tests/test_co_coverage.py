@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from utils.bitmaps import bitmap_co_counts, bitmap_joint_count, pack_presence
+from utils.co_coverage import (compute_avg_daily_co_coverage_vector, compute_co_coverage_matrix,
+                               compute_partial_co_coverage_vector)
+
+
+def _legacy_co_matrix(df, available, daily_bins):
+    """Per-column groupby and pairwise loop used before vectorization, kept as the reference."""
+    df = df.copy()
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df = df[df['Date'].notna()]
+    df = df[df['Date'].between(daily_bins[0], daily_bins[-1])]
+    df['bin'] = pd.cut(df['Date'], bins=daily_bins, labels=daily_bins[:-1], right=False)
+
+    daily_presence = pd.DataFrame(0, index=daily_bins[:-1], columns=available)
+    for col in available:
+        daily_presence[col] = df.groupby('bin', observed=True)[col].apply(lambda x: x.notna().any()).astype(int)
+
+    T = len(daily_bins) - 1
+    co_matrix = pd.DataFrame(0.0, index=available, columns=available)
+    for i in available:
+        for j in available:
+            co_matrix.loc[i, j] = (daily_presence[i].astype(bool) & daily_presence[j].astype(bool)).sum() / T
+    return co_matrix
+
+
+def _legacy_partial(df, feature_pool, daily_bins):
+    available = [f for f in feature_pool if f in df.columns]
+    if len(available) < 1:
+        return None
+    avg_cov = _legacy_co_matrix(df, available, daily_bins).mean(axis=1)
+    return [avg_cov.get(f, 0.0) for f in feature_pool]
+
+
+def _legacy_avg_daily(df, features, daily_bins):
+    available = [col for col in features if col in df.columns]
+    if len(available) < 2:
+        return None
+    co_matrix = _legacy_co_matrix(df, available, daily_bins)
+    return [co_matrix[feature].mean() if feature in co_matrix else 0 for feature in features]
+
+
+def _sparse_frame(seed):
+    """Irregular timestamps with scattered NaNs and one contiguous outage per column."""
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 2000))
+    dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 40 * 86400, n)), unit='s')
+    df = pd.DataFrame({'Date': dates})
+    for col in 'abcd':
+        values = rng.random(n)
+        values[rng.random(n) < rng.random()] = np.nan
+        start = rng.integers(0, n)
+        values[start:start + rng.integers(0, n)] = np.nan
+        df[col] = values
+    if seed % 3 == 0:
+        df.loc[df.sample(min(5, n), random_state=seed).index, 'Date'] = pd.NaT
+    if seed % 2:
+        df['Date'] = df['Date'].astype(str)
+    return df
+
+
+def test_co_coverage_vectors_match_loops():
+    daily_bins = pd.date_range('2023-01-05', '2023-02-03', freq='D')
+    pool = ['a', 'x', 'c', 'd', 'b']
+    for seed in range(8):
+        df = _sparse_frame(seed)
+        assert compute_partial_co_coverage_vector(df, pool, daily_bins) == _legacy_partial(df, pool, daily_bins)
+        assert compute_avg_daily_co_coverage_vector(df, pool, daily_bins) == _legacy_avg_daily(df, pool, daily_bins)
+
+
+def test_too_few_features():
+    daily_bins = pd.date_range('2023-01-05', '2023-02-03', freq='D')
+    df = _sparse_frame(1)
+    assert compute_partial_co_coverage_vector(df, ['x'], daily_bins) is None
+    assert compute_avg_daily_co_coverage_vector(df, ['a', 'x'], daily_bins) is None
+
+
+def test_bitmap_co_counts_match_dense_product():
+    rng = np.random.default_rng(0)
+    for n in [1, 63, 64, 65, 1000]:
+        df = pd.DataFrame(rng.random((n, 5)), columns=list('abcde'))
+        df = df.mask(rng.random((n, 5)) < 0.3)
+        presence = df.notna().astype(int)
+        bits = pack_presence(df)
+        np.testing.assert_array_equal(bitmap_co_counts(bits), (presence.T @ presence).to_numpy())
+        assert bitmap_joint_count(bits, [0, 2, 4]) == int(presence[['a', 'c', 'e']].all(axis=1).sum())
+
+
+def test_co_coverage_matrix_matches_dense_product():
+    df = _sparse_frame(4).assign(Date=lambda d: pd.to_datetime(d['Date']), Count=7)
+    presence = df.set_index('Date').select_dtypes(include='number').notna().astype(int)
+    expected = presence.T @ presence / len(presence) * 100
+    pd.testing.assert_frame_equal(compute_co_coverage_matrix(df), expected, check_dtype=False)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.datasets.compaction import compact_frame
+from utils.missingness import compute_feature_coverage, compute_gap_stats
+
+
+def _loaded(n=500):
+    """Unsorted frame as a loader returns it: string dates, float64 readings, int64 counts and a text column."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Date': pd.date_range('2023-01-01', periods=n, freq='10min').strftime('%Y-%m-%d %H:%M:%S'),
+        'PM2.5': rng.integers(0, 500, n) / 4,       # exact in float32
+        'CO2': rng.integers(400, 2000, n),
+        'Pressure': 101325 + rng.random(n),  # float32 moves it by up to ~4e-8 relative
+        'Room': rng.choice(['bedroom', 'kitchen'], n),
+    })
+    df.loc[rng.random(n) < 0.2, 'PM2.5'] = np.nan
+    return df.sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def test_round_trip():
+    df = _loaded()
+    compacted, stats = compact_frame(df, tolerance=1e-9)
+
+    assert compacted['Date'].is_monotonic_increasing
+    assert compacted.dtypes.to_dict() == {'Date': np.dtype('<M8[us]'), 'PM2.5': np.float32, 'CO2': np.int16,
+                                          'Pressure': np.float64, 'Room': 'category'}
+    assert stats['float32_columns'] == ['PM2.5'] and stats['categorical_columns'] == ['Room']
+    assert stats['bytes_after'] < stats['bytes_before']
+
+    restored = compacted.astype(df.dtypes.drop('Date').to_dict())
+    expected = df.assign(Date=pd.to_datetime(df['Date'])).sort_values('Date', ignore_index=True)
+    pd.testing.assert_frame_equal(restored, expected)
+    pd.testing.assert_series_equal(compute_feature_coverage(compacted), compute_feature_coverage(expected))
+    pd.testing.assert_frame_equal(compute_gap_stats(compacted), compute_gap_stats(expected))
+
+
+def test_default_tolerance_bounds_float32_error():
+    df = _loaded()
+    expected = df.assign(Date=pd.to_datetime(df['Date'])).sort_values('Date', ignore_index=True)
+    compacted, stats = compact_frame(df)
+    assert compacted['Pressure'].dtype == np.float32 and stats['float32_columns'] == ['PM2.5', 'Pressure']
+    np.testing.assert_allclose(compacted['Pressure'], expected['Pressure'], rtol=1e-6)
+
+
+def test_non_numeric_modes():
+    kept, stats = compact_frame(_loaded(), non_numeric='keep')
+    assert not isinstance(kept['Room'].dtype, pd.CategoricalDtype) and stats['categorical_columns'] == []
+    dropped, stats = compact_frame(_loaded(), non_numeric='drop')
+    assert 'Room' not in dropped.columns and stats['dropped_columns'] == ['Room']
+    with pytest.raises(ValueError):
+        compact_frame(_loaded(), non_numeric='encode')
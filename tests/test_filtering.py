@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from utils.filtering import (filter_multiple_datasets_by_heuristics, filter_single_dataset_by_heuristics,
+                             sweep_heuristic_thresholds)
+
+
+def _legacy_filter(df, features, interval='D', theta_feat=0.8, theta_joint=0.7):
+    """Per-interval loop used before batching, kept as the reference."""
+    df = df.copy()
+    df['Date'] = pd.to_datetime(df['Date'])
+    df = df[df['Date'].notna()]
+    df = df.set_index('Date')
+
+    results = []
+    metadata = []
+    for name, group in df.groupby(pd.Grouper(freq=interval)):
+        if len(group) == 0:
+            continue
+        expected = len(group)
+        feat_cov = (group[features].notna().sum() / expected).fillna(0)
+        if (feat_cov < theta_feat).any():
+            continue
+        binary = group[features].notna().astype(int)
+        co_matrix = (binary.T @ binary) / expected
+        i_lower = np.tril_indices(len(features), k=-1)
+        if (co_matrix.values[i_lower] < theta_joint).any():
+            continue
+        results.append(group)
+        metadata.append({'interval': name, 'rows': expected, 'min_feat_cov': feat_cov.min(),
+                         'min_joint_cov': co_matrix.values[i_lower].min()})
+
+    filtered = pd.concat(results) if results else pd.DataFrame()
+    return filtered.reset_index(), pd.DataFrame(metadata)
+
+
+def _noisy_frame(seed):
+    """Regular series with NaT dates, duplicated rows, scattered NaNs and an outage per column."""
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 2000))
+    df = pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=n, freq='7min')})
+    for col in 'abcd':
+        values = rng.random(n)
+        values[rng.random(n) < rng.random() * 0.3] = np.nan
+        start = rng.integers(0, n)
+        values[start:start + rng.integers(0, n)] = np.nan
+        df[col] = values
+    if seed % 2:
+        df = df.sample(frac=1, random_state=seed)
+    df.loc[df.index[:3], 'Date'] = pd.NaT
+    return pd.concat([df, df.iloc[:50]])
+
+
+def test_batched_filter_matches_loop():
+    for seed in range(4):
+        df = _noisy_frame(seed)
+        for interval in ['D', 'h', 'W']:
+            for theta_feat, theta_joint in [(0.3, 0.2), (0.8, 0.7), (0, 0)]:
+                expected = _legacy_filter(df, ['a', 'b', 'c'], interval, theta_feat, theta_joint)
+                result = filter_single_dataset_by_heuristics(df, ['a', 'b', 'c'], interval, theta_feat, theta_joint)
+                pd.testing.assert_frame_equal(result[0], expected[0])
+                pd.testing.assert_frame_equal(result[1], expected[1])
+
+
+def test_single_feature_has_no_joint_check():
+    df = pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=48, freq='h'),
+                       'd': [1.0] * 24 + [np.nan] * 24})
+    filtered, summary = filter_single_dataset_by_heuristics(df, ['d'], 'D', 0.5, 1.1)
+    pd.testing.assert_frame_equal(filtered, df.iloc[:24])
+    assert len(summary) == 1 and np.isnan(summary.loc[0, 'min_joint_cov'])
+
+
+class _Store:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_data(self, name):
+        return self.frames[name]
+
+
+def test_sweep_matches_repeated_runs():
+    store = _Store({'noisy': _noisy_frame(1), 'empty': _noisy_frame(2).iloc[:0],
+                    'no_d': _noisy_frame(3).drop(columns='d')})
+    names, features = list(store.frames), ['a', 'b', 'd']
+    theta_feats, theta_joints, intervals = [0, 0.25, 0.5, 0.8, 1], [0, 0.3, 0.7, 1], ['h', 'D', 'W']
+
+    sweep = sweep_heuristic_thresholds(store, names, features, theta_feats, theta_joints, intervals)
+    grid = sweep.groupby(['interval', 'theta_feat', 'theta_joint'], sort=False)
+    assert grid.ngroups == len(intervals) * len(theta_feats) * len(theta_joints)
+    for (interval, theta_feat, theta_joint), result in grid:
+        _, expected = filter_multiple_datasets_by_heuristics(store, names, features, interval, theta_feat, theta_joint)
+        pd.testing.assert_frame_equal(result[expected.columns].reset_index(drop=True), expected)
+    assert sweep['retained_rows'].between(1, sweep['original_rows'] - 1).any()
+    assert sweep.loc[sweep['dataset'] == 'no_d', 'error'].notna().all()
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.helper_functions import resample_time_series
+
+
+def _readings():
+    """Hourly readings over five days with NaNs, an empty day, a float32 and an int column."""
+    rng = np.random.default_rng(0)
+    dates = pd.Series(pd.date_range('2023-01-01', periods=120, freq='h'))
+    df = pd.DataFrame({'Date': dates, 'PM2.5': rng.random(120), 'Humidity': rng.random(120).astype(np.float32),
+                       'CO2': rng.integers(400, 2000, 120)})
+    df.loc[rng.random(120) < 0.3, 'PM2.5'] = np.nan
+    return df[~dates.between('2023-01-03', '2023-01-03 23:00')].reset_index(drop=True)
+
+
+@pytest.mark.parametrize('agg', ['mean', 'sum', 'count', 'min', 'max', 'std', 'median'])
+def test_single_aggregation_matches_resample(agg):
+    df = _readings()
+    expected = df.set_index('Date').resample('D').agg(agg).reset_index()
+    pd.testing.assert_frame_equal(resample_time_series(df, 'D', agg), expected, check_freq=False)
+
+
+def test_combined_aggregations_match_separate_runs():
+    df = _readings()
+    aggs = ['mean', 'sum', 'count', 'coverage', 'max', 'q90']
+    combined = resample_time_series(df, '12h', aggs)
+    assert list(combined.columns[1:]) == [(col, agg) for col in ['PM2.5', 'Humidity', 'CO2'] for agg in aggs]
+    pd.testing.assert_series_equal(combined['Date'], resample_time_series(df, '12h')['Date'])
+    for agg in aggs:
+        single = resample_time_series(df, '12h', agg).set_index('Date')
+        result = combined.set_index('Date').xs(agg, axis=1, level=1)
+        pd.testing.assert_frame_equal(result, single, check_freq=False, check_names=False)
+    assert combined[('Humidity', 'mean')].dtype == np.float32
+
+
+def test_coverage():
+    df = _readings()
+    indexed = df.set_index('Date')
+    expected = indexed.resample('D').count().div(indexed.resample('D').size().replace(0, np.nan), axis=0) * 100
+    pd.testing.assert_frame_equal(resample_time_series(df, 'D', 'coverage').set_index('Date'), expected,
+                                  check_freq=False)
+    against_expected = resample_time_series(df, 'D', 'coverage', expected_points=48).set_index('Date')
+    pd.testing.assert_frame_equal(against_expected, indexed.resample('D').count() / 48 * 100, check_freq=False)
+    assert against_expected.loc['2023-01-03'].eq(0).all()
+
+
+def test_quantile_and_unsupported():
+    df = _readings()
+    expected = df.set_index('Date').resample('D').quantile(0.9).reset_index()
+    pd.testing.assert_frame_equal(resample_time_series(df, 'D', 'q90'), expected, check_freq=False)
+    for agg in ['mode', 'q101', ['mean', 'first']]:
+        with pytest.raises(ValueError):
+            resample_time_series(df, 'D', agg)
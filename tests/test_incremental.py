@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from utils.co_coverage import compute_co_coverage_matrix
+from utils.incremental import IncrementalCoverageStats
+from utils.missingness import compute_feature_coverage, compute_gap_stats, compute_periodic_coverage
+
+
+def _legacy_stats(data, resolution='D', finer_resolution='h', threshold=0.8):
+    """Per-dataset metrics of calculate_comprehensive_statistics before the single-pass rewrite."""
+    data = data.copy()
+    data['Date'] = pd.to_datetime(data['Date'], errors='coerce')
+    data = data.dropna(subset=['Date']).set_index('Date')
+    total_records = len(data)
+    missing_records = data.isnull().sum().sum()
+    completeness_ratio = (total_records - missing_records) / total_records if total_records > 0 else 0
+    time_span = (data.index.max() - data.index.min()).days
+
+    finer = (data.resample(finer_resolution).size() > 0).astype(int)
+    daily_counts = finer.groupby(pd.Grouper(freq=resolution)).sum()
+    total_expected_bins = len(daily_counts)
+    recorded_bins = (daily_counts >= 12).sum()
+    usable_bins = (daily_counts / 24 >= threshold).sum()
+    usable_bins2 = (daily_counts / 24 >= 0.5).sum()
+    return {
+        'Total Records': total_records,
+        'Missing Records': missing_records,
+        'Completeness Ratio': completeness_ratio * 100,
+        'Time Span (days)': time_span,
+        'Total Expected Bins': total_expected_bins,
+        'Recorded Bins (>=12h)': recorded_bins,
+        'Usable Bins (>80%)': usable_bins,
+        'Percentage Recorded Data': recorded_bins / total_expected_bins * 100,
+        'Percentage Usable Data (>80%)': usable_bins / total_expected_bins * 100,
+        'Percentage Usable Data (>50%)': usable_bins2 / total_expected_bins * 100,
+    }
+
+
+def _feed(seed=0, n=6000):
+    """Ten-minute feed with an outage of several days, long gaps and a text column."""
+    rng = np.random.default_rng(seed)
+    dates = pd.Series(pd.date_range('2023-01-01 03:20', periods=n, freq='10min'))
+    keep = ~dates.between('2023-01-10', '2023-01-14') & (rng.random(n) > 0.1)
+    df = pd.DataFrame({'Date': dates, 'PM2.5': rng.random(n), 'CO2': rng.integers(400, 2000, n).astype(float)})
+    df.loc[rng.random(n) < 0.2, 'PM2.5'] = np.nan
+    df.loc[1500:2600, 'CO2'] = np.nan
+    df['Room'] = np.where(rng.random(n) < 0.1, None, 'bedroom')
+    return df[keep.to_numpy()].reset_index(drop=True)
+
+
+def test_incremental_matches_batch():
+    full = _feed()
+    stats = IncrementalCoverageStats()
+    for rows in np.array_split(np.arange(len(full)), 7):
+        stats.update(full.iloc[rows])
+
+    pd.testing.assert_series_equal(stats.feature_coverage(), compute_feature_coverage(full))
+    pd.testing.assert_frame_equal(stats.co_coverage_matrix(), compute_co_coverage_matrix(full))
+    pd.testing.assert_frame_equal(stats.periodic_coverage(), compute_periodic_coverage(full))
+    pd.testing.assert_frame_equal(stats.gap_stats(), compute_gap_stats(full))
+
+    expected = _legacy_stats(full)
+    result = stats.comprehensive_statistics()
+    assert {k: float(v) for k, v in result.items()} == {k: float(v) for k, v in expected.items()}
+
+
+def test_gap_open_across_batches():
+    full = pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=9, freq='h'),
+                         'a': [1, np.nan, np.nan, np.nan, np.nan, 2, np.nan, np.nan, np.nan]})
+    stats = IncrementalCoverageStats()
+    for rows in [[0, 1], [2], [3, 4, 5, 6], [7, 8]]:
+        stats.update(full.iloc[rows])
+    pd.testing.assert_frame_equal(stats.gap_stats(), compute_gap_stats(full))
+    assert stats.gap_stats().loc[0, 'max_gap'] == 4
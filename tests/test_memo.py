@@ -0,0 +1,69 @@
+import gc
+
+import numpy as np
+import pandas as pd
+
+from utils import memo
+from utils.memo import dataset_token, memoize, register_dataset, result_cache
+
+calls = []
+
+
+@memoize
+def _present(df, column='a'):
+    calls.append(column)
+    return int(df[column].count())
+
+
+def _frame():
+    return pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=4, freq='h'), 'a': [1.0, 2.0, 3.0, 4.0]})
+
+
+def test_in_place_mutation_needs_version_bump():
+    calls.clear()
+    df = _frame()
+    register_dataset(df, 'memo-mutation', 'v1')
+    try:
+        assert _present(df) == 4
+        df.loc[0, 'a'] = np.nan
+        assert _present(df) == 4  # stale: the version was not bumped
+        assert len(calls) == 1
+
+        register_dataset(df, 'memo-mutation', 'v2')
+        assert _present(df) == 3
+        assert _present(df) == 3
+        assert len(calls) == 2
+    finally:
+        result_cache.invalidate('memo-mutation')
+
+
+def test_arguments_are_part_of_the_key():
+    calls.clear()
+    df = _frame().assign(b=[np.nan, 1.0, np.nan, 1.0])
+    register_dataset(df, 'memo-arguments', 'v1')
+    try:
+        assert (_present(df), _present(df, 'b'), _present(df, column='b')) == (4, 2, 2)
+        assert calls == ['a', 'b']
+    finally:
+        result_cache.invalidate('memo-arguments')
+
+
+def test_reused_id_is_not_a_hit(monkeypatch):
+    # Every object reports the same id, as a new frame allocated at a freed frame's address would
+    monkeypatch.setattr(memo, 'id', lambda obj: 0, raising=False)
+    calls.clear()
+    df = _frame()
+    register_dataset(df, 'memo-reuse', 'v1')
+    try:
+        assert _present(df) == 4
+        other = _frame().iloc[:2]
+        assert dataset_token(other) is None
+        assert _present(other) == 2
+
+        del df
+        gc.collect()
+        assert dataset_token(other) is None
+        assert _present(other) == 2
+        assert len(calls) == 3
+    finally:
+        result_cache.invalidate('memo-reuse')
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from utils.datasets.mexico import MexicoPreprocessing
+
+
+def _legacy_fix(df):
+    """Row-by-row correction used before vectorization, kept as the reference."""
+    df = df.copy()
+    for i in range(1, len(df) - 1):
+        if df['Date'].iloc[i].hour == 23 and df['Date'].iloc[i + 1].hour == 0 and df['Date'].iloc[i].day == df['Date'].iloc[i + 1].day:
+            df.at[i, 'Date'] = df['Date'].iloc[i] - pd.Timedelta(days=1)
+    return df
+
+
+def _mislabeled_export(n_days=40, seed=0):
+    """Hourly export where some 23:00 readings carry the next day's date."""
+    rng = np.random.default_rng(seed)
+    dates = pd.Series(pd.date_range('2023-01-01', periods=24 * n_days, freq='h'))
+    late = np.flatnonzero((dates.dt.hour == 23).to_numpy())
+    mislabeled = late[rng.random(len(late)) < 0.5]
+    dates.iloc[mislabeled] += pd.Timedelta(days=1)
+    # a few dropped rows so that 23:00 is sometimes followed by something else
+    keep = rng.random(len(dates)) > 0.05
+    keep[:2] = True
+    return pd.DataFrame({
+        'Data number': np.arange(keep.sum()),
+        'Date': dates[keep].reset_index(drop=True),
+        'PM2.5': rng.random(keep.sum()),
+    })
+
+
+def test_vectorized_fix_matches_loop():
+    for seed in range(5):
+        df = _mislabeled_export(seed=seed)
+        expected = _legacy_fix(df)
+        assert (expected['Date'] != df['Date']).any()
+        result = df.assign(Date=MexicoPreprocessing.correct_midnight_timestamps(df['Date']))
+        pd.testing.assert_frame_equal(result, expected)
+
+
+def test_first_and_last_rows_untouched():
+    df = pd.DataFrame({'Date': pd.to_datetime(['2023-01-02 23:00', '2023-01-02 00:00', '2023-01-03 23:00'])})
+    result = MexicoPreprocessing.correct_midnight_timestamps(df['Date'])
+    pd.testing.assert_series_equal(result, _legacy_fix(df)['Date'])
+    pd.testing.assert_series_equal(result, df['Date'])
+
+
+def test_load_and_preprocess_matches_loop(tmp_path):
+    df = _mislabeled_export(n_days=10)
+    path = tmp_path / 'per-hour.xlsx'
+    df.assign(Date=df['Date'].dt.strftime('%d-%m-%Y %H:%M')).to_excel(path, index=False)
+
+    expected = _legacy_fix(df).drop(columns=['Data number'])
+    result = MexicoPreprocessing.load_and_preprocess(path)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
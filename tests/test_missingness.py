@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.missingness import (RegularGrid, build_gap_index, compute_gap_stats, compute_temporal_coverage_matrix,
+                               reconstruct_time_index)
+
+
+def _legacy_gap_stats(df):
+    """Per-column cumsum/value_counts used before the gap index, kept as the reference."""
+    df = df.copy().sort_values('Date')
+    stats = []
+    for col in df.select_dtypes(include='number').columns:
+        is_na = df[col].isna()
+        gaps = (is_na != is_na.shift()).cumsum()[is_na]
+        gap_lengths = gaps.value_counts().values
+        if len(gap_lengths) > 0:
+            stats.append({'feature': col, 'num_gaps': len(gap_lengths),
+                          'mean_gap': np.mean(gap_lengths), 'max_gap': np.max(gap_lengths)})
+        else:
+            stats.append({'feature': col, 'num_gaps': 0, 'mean_gap': 0, 'max_gap': 0})
+    return pd.DataFrame(stats)
+
+
+def _legacy_temporal_coverage(df, sample_rate, selected_columns=None):
+    """
+    Nested resampling and per-column pd.cut loop of the old heatmap, kept as the reference.
+
+    The old code divided by a fixed '1{sample_rate}' duration, which has no
+    meaning for months; monthly bins divide by each month's actual width instead.
+    """
+    finer_rate = {'D': 'h', 'W': 'h', 'M': 'D'}[sample_rate]
+    df = df.copy()
+    df['Date'] = pd.to_datetime(df['Date'])
+    finer = df.sort_values('Date').set_index('Date').resample(finer_rate).mean().reset_index()
+    broader_bins = pd.date_range(start=finer['Date'].iloc[0], end=finer['Date'].iloc[-1],
+                                 freq='MS' if sample_rate == 'M' else sample_rate)
+    if not selected_columns:
+        selected_columns = [col for col in finer.columns if col != 'Date']
+
+    finer_dur = pd.Timedelta(1, unit=finer_rate)
+    if sample_rate == 'M':
+        max_points = pd.Series(np.diff(broader_bins) / finer_dur, index=broader_bins[:-1])
+    else:
+        max_points = max(pd.Timedelta(f'1{sample_rate}') / finer_dur, 1)
+
+    coverage_matrix = []
+    for col in selected_columns:
+        finer['bin'] = pd.cut(finer['Date'], bins=broader_bins, labels=broader_bins[:-1], right=False)
+        bin_counts = finer.groupby('bin', observed=True)[col].count()
+        coverage = (bin_counts / max_points) * 100
+        coverage_matrix.append(coverage.reindex(broader_bins[:-1], fill_value=0).tolist())
+    return np.array(coverage_matrix, dtype=float), broader_bins[:-1], list(selected_columns)
+
+
+def _legacy_reconstruct(df, freq):
+    """Dense reindex used before RegularGrid, kept as the reference."""
+    df = df.copy().sort_values('Date').set_index('Date')
+    df = df.reindex(pd.date_range(start=df.index.min(), end=df.index.max(), freq=freq))
+    df.index.name = 'Date'
+    return df.reset_index()
+
+
+def _dense_coverage(dense, freq):
+    indexed = dense.set_index('Date')
+    numeric = indexed.select_dtypes(include='number')
+    return numeric.resample(freq).count().div(indexed.resample(freq).size(), axis=0) * 100
+
+
+def _sensor_grid(seed, n=5000, step='10min'):
+    """Shuffled grid readings with dropped slots, a long outage, an int column and a text column."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2023-01-01 00:10', periods=n, freq=step)
+    keep = rng.random(n) > 0.3
+    keep[[0, -1]] = True
+    keep[1000:2500] = False
+    df = pd.DataFrame({'Date': dates[keep], 'a': rng.random(keep.sum()),
+                       'b': rng.integers(0, 9, keep.sum()), 's': 'x'})
+    df.loc[rng.random(len(df)) < 0.2, 'a'] = np.nan
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def _gappy_frame(seed, n=None, freq='7min'):
+    """Shuffled regular series with scattered NaNs, one long outage per column and a complete column."""
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 3000)) if n is None else n
+    df = pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=n, freq=freq)})
+    for col in 'abcd':
+        values = rng.random(n)
+        values[rng.random(n) < rng.random() * 0.3] = np.nan
+        start = rng.integers(0, n)
+        values[start:start + rng.integers(0, n)] = np.nan
+        df[col] = values
+    df['full'] = 1.0
+    return df.sample(frac=1, random_state=seed)
+
+
+def test_gap_stats_match_value_counts():
+    for seed in range(10):
+        df = _gappy_frame(seed)
+        pd.testing.assert_frame_equal(compute_gap_stats(df), _legacy_gap_stats(df))
+
+
+def test_gap_index_runs():
+    df = pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=8, freq='h'),
+                       'a': [np.nan, 1, np.nan, np.nan, 2, 3, np.nan, np.nan]})
+    gaps = build_gap_index(df.iloc[::-1])
+    np.testing.assert_array_equal(gaps.gap_starts('a'), [0, 2, 6])
+    np.testing.assert_array_equal(gaps.gap_lengths('a'), [1, 2, 2])
+    assert list(gaps.gap_durations('a')) == [pd.Timedelta('1h'), pd.Timedelta('2h'), pd.Timedelta('1h')]
+    assert len(gaps.query(min_length=2)) == 2
+
+
+def test_temporal_coverage_matches_nested_resampling():
+    rng = np.random.default_rng(1)
+    n = 20000
+    seconds = np.sort(rng.integers(0, 120 * 86400, n))
+    df = pd.DataFrame({'Date': pd.Timestamp('2023-01-03 05:17') + pd.to_timedelta(seconds, unit='s'),
+                       'a': rng.random(n), 'b': rng.random(n), 'c': rng.random(n)})
+    for col in 'abc':
+        df.loc[rng.random(n) < 0.4, col] = np.nan
+    df.loc[5000:9000, 'b'] = np.nan
+
+    for sample_rate in ['D', 'W', 'M']:
+        for selected in [None, ['c', 'a']]:
+            expected, labels, features = _legacy_temporal_coverage(df, sample_rate, selected)
+            matrix, edges, names = compute_temporal_coverage_matrix(df, sample_rate, selected)
+            np.testing.assert_allclose(matrix, expected)
+            pd.testing.assert_index_equal(edges[:-1], labels)
+            assert names == features
+
+
+def test_regular_grid_matches_dense_reindex(monkeypatch):
+    for seed in range(3):
+        df = _sensor_grid(seed)
+        dense = _legacy_reconstruct(df, '10min')
+        pd.testing.assert_frame_equal(reconstruct_time_index(df, '10min'), dense)
+        pd.testing.assert_frame_equal(reconstruct_time_index(df), dense)
+
+        grid = RegularGrid.from_frame(df)
+        numeric = dense.select_dtypes(include='number')
+        pd.testing.assert_series_equal(grid.coverage(), numeric.notna().sum() / len(dense) * 100)
+        pd.testing.assert_frame_equal(grid.gap_stats(), _legacy_gap_stats(dense))
+        pd.testing.assert_frame_equal(grid.gap_index().to_frame(), build_gap_index(dense).to_frame())
+        pd.testing.assert_frame_equal(grid.resample('D', 'mean'),
+                                      dense.set_index('Date')[['a', 'b']].resample('D').mean(), check_freq=False)
+
+        # Coverage per period is counted from the period edges, never from the dense index
+        with monkeypatch.context() as m:
+            m.setattr(RegularGrid, 'index', property(lambda self: pytest.fail('dense grid built')))
+            for freq in ['D', '2D', '3h', 'W', 'W-MON', 'ME', 'MS', 'QE']:
+                pd.testing.assert_frame_equal(grid.resample(freq, 'coverage'), _dense_coverage(dense, freq),
+                                              check_freq=False)
+
+
+def test_regular_grid_daily_steps():
+    df = pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=400, freq='D'), 'v': np.arange(400.)})
+    df = df.iloc[np.r_[0:50, 80:300, 310:400]]
+    dense = _legacy_reconstruct(df, 'D')
+    pd.testing.assert_frame_equal(reconstruct_time_index(df, 'D'), dense)
+
+    grid = RegularGrid.from_frame(df, 'D')
+    pd.testing.assert_frame_equal(grid.gap_stats(), _legacy_gap_stats(dense))
+    for freq in ['D', 'W', 'ME', 'MS', 'QE']:
+        pd.testing.assert_frame_equal(grid.resample(freq, 'coverage'), _dense_coverage(dense, freq), check_freq=False)
+
+
+def test_reconstruct_calendar_and_off_grid_rows():
+    monthly = pd.DataFrame({'Date': pd.date_range('2020-01-01', periods=24, freq='MS')[::2], 'v': range(12)})
+    pd.testing.assert_frame_equal(reconstruct_time_index(monthly, 'MS'), _legacy_reconstruct(monthly, 'MS'))
+
+    df = _sensor_grid(9)
+    df.loc[len(df)] = [pd.Timestamp('2023-01-01 00:13'), 1.0, 1, 'y']
+    pd.testing.assert_frame_equal(reconstruct_time_index(df, '10min'), _legacy_reconstruct(df, '10min'))
+    with pytest.raises(ValueError):
+        reconstruct_time_index(pd.concat([df, df.iloc[:1]]), '10min')
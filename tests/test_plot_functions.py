@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.plot_functions import downsample_time_series, plot_time_series_heatmap
+
+
+def _series():
+    """Eight hourly rows, shuffled; four buckets of 1h45 hold two rows each."""
+    df = pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=8, freq='h'),
+                       'a': [1, 2, np.nan, 4, 5, 6, 7, np.nan],
+                       'b': [8, 3, 6, 1, np.nan, np.nan, 2, 2]})
+    return df.sample(frac=1, random_state=0)
+
+
+@pytest.mark.parametrize('agg, a, b', [
+    ('mean', [1.5, 4, 5.5, 7], [5.5, 3.5, np.nan, 2]),
+    ('min', [1, 4, 5, 7], [3, 1, np.nan, 2]),
+    ('max', [2, 4, 6, 7], [8, 6, np.nan, 2]),
+    ('coverage', [100, 50, 100, 50], [100, 100, 0, 100]),
+])
+def test_bucket_values(agg, a, b):
+    edges, z, columns = downsample_time_series(_series(), 4, agg)
+    assert list(columns) == ['a', 'b']
+    np.testing.assert_array_equal(z, [a, b])
+    assert list(edges) == list(pd.date_range('2023-01-01', periods=4, freq='105min'))
+
+
+def test_empty_buckets_are_nan():
+    _, z, _ = downsample_time_series(_series(), 16, 'mean')
+    filled = [0, 2, 4, 6, 9, 11, 13, 15]
+    np.testing.assert_array_equal(z[0, filled], [1, 2, np.nan, 4, 5, 6, 7, np.nan])
+    assert np.isnan(np.delete(z, filled, axis=1)).all()
+
+
+def test_unsupported_aggregation():
+    with pytest.raises(ValueError):
+        downsample_time_series(_series(), 4, 'median')
+    with pytest.raises(ValueError):
+        plot_time_series_heatmap(_series(), agg='median')
+
+
+@pytest.mark.parametrize('renderer', ['heatmap', 'image', 'matplotlib'])
+@pytest.mark.parametrize('zoom_levels', [None, [10, 50]])
+def test_empty_frame(renderer, zoom_levels):
+    df = pd.DataFrame({'Date': pd.to_datetime([]), 'a': []})
+    plot_time_series_heatmap(df, renderer=renderer, zoom_levels=zoom_levels)
+
+    edges, z, columns = downsample_time_series(df, 10)
+    assert len(edges) == 0 and z.shape == (1, 0) and list(columns) == ['a']
+
+
+def test_short_series_keeps_rows():
+    df = _series()
+    fig = plot_time_series_heatmap(df, max_columns=100)
+    np.testing.assert_array_equal(fig.data[0].z, df.sort_values('Date')[['a', 'b']].T.values)
+    assert fig.data[0].colorbar.title.text == 'Value'
+
+
+def test_short_series_coverage():
+    df = _series()
+    fig = plot_time_series_heatmap(df, max_columns=100, agg='coverage')
+    expected = df.sort_values('Date')[['a', 'b']].notna().T.values * 100
+    np.testing.assert_array_equal(fig.data[0].z, expected)
+    assert fig.data[0].colorbar.title.text == 'Coverage (%)'
+
+
+def test_long_series_is_downsampled():
+    fig = plot_time_series_heatmap(_series(), max_columns=4, agg='coverage')
+    np.testing.assert_array_equal(fig.data[0].z, [[100, 50, 100, 50], [100, 100, 0, 100]])
+    assert fig.data[0].colorbar.title.text == 'Coverage (%)'
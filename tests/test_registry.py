@@ -0,0 +1,112 @@
+import pandas as pd
+import pytest
+
+from utils.datasets.data_singleton import select_preprocessing_class
+from utils.datasets.sweden import SwedenPreprocessing
+from utils.registry import DatasetRegistry, import_loader, load_config, resolve_paths
+
+
+class CsvPreprocessing:
+    """Loader for the test files: plain CSV with a Date column."""
+
+    @staticmethod
+    def load_and_preprocess(path):
+        return pd.read_csv(path, parse_dates=['Date'])
+
+
+def _registry(tmp_path):
+    for home, year in [('b', 2022), ('a', 2023)]:
+        pd.DataFrame({'Date': pd.date_range(f'{year}-06-01', periods=3, freq='h'), 'CO2': [400, 410, 420]}) \
+            .to_csv(tmp_path / f'{home}.csv', index=False)
+    (tmp_path / 'notes.txt').write_text('not a dataset')
+    config = tmp_path / 'datasets.toml'
+    config.write_text(f'''
+[groups.Home]
+loader = "test_registry.CsvPreprocessing"
+pattern = "{tmp_path}/*.csv"
+name = "Home_{{stem}}"
+
+[groups.Sweden]
+loader = "utils.datasets.sweden.SwedenPreprocessing"
+files = {{ "Sweden Bedroom" = "{tmp_path}/bedroom.txt" }}
+''')
+    return DatasetRegistry.from_file(config, manifest_path=tmp_path / 'manifest.json')
+
+
+def test_lookup(tmp_path):
+    registry = _registry(tmp_path)
+    assert registry.data_dict() == {'Home_a': str(tmp_path / 'a.csv'), 'Home_b': str(tmp_path / 'b.csv'),
+                                    'Sweden Bedroom': str(tmp_path / 'bedroom.txt')}
+    loaders = registry.loaders()
+    assert loaders == {'Home_a': CsvPreprocessing, 'Home_b': CsvPreprocessing, 'Sweden Bedroom': SwedenPreprocessing}
+
+    # Registry names need not follow the naming scheme the fallback matches on
+    assert select_preprocessing_class('Home_a', loaders) is CsvPreprocessing
+    assert select_preprocessing_class('Sweden Livingroom', loaders) is SwedenPreprocessing
+
+
+def test_select_by_metadata(tmp_path, monkeypatch):
+    registry = _registry(tmp_path)
+    assert registry.select(overlaps='2023') == ['Home_a']
+    assert registry.select(groups=['Home'], columns=['CO2'], min_rows=3) == ['Home_a', 'Home_b']
+    table = registry.manifest(scan=False)
+    assert table.set_index('dataset').loc['Sweden Bedroom', 'rows'] is pd.NA
+
+    # A second registry plans from the manifest, loading only files that changed
+    def fail(path):
+        raise RuntimeError(path)
+    monkeypatch.setattr(CsvPreprocessing, 'load_and_preprocess', staticmethod(fail))
+    reread = DatasetRegistry.from_file(tmp_path / 'datasets.toml', manifest_path=tmp_path / 'manifest.json')
+    assert reread.select(groups=['Home'], overlaps='2022') == ['Home_b']
+    (tmp_path / 'a.csv').write_text('Date,CO2\n')
+    assert list(reread.scan(['Home_a', 'Home_b'])) == ['Home_a']
+
+
+def test_unknown_names(tmp_path):
+    loaders = _registry(tmp_path).loaders()
+    with pytest.raises(ValueError, match='Home_c'):
+        select_preprocessing_class('Home_c', loaders)
+    with pytest.raises(ValueError, match='Home_c'):
+        select_preprocessing_class('Home_c')
+    with pytest.raises(AttributeError):
+        import_loader('test_registry.JsonPreprocessing')
+    with pytest.raises(ModuleNotFoundError):
+        import_loader('utils.datasets.nowhere.NowherePreprocessing')
+
+
+@pytest.mark.parametrize('body, message', [
+    ('[groups.Home]\npattern = "*.csv"\n', 'no loader'),
+    ('[groups.Home]\nloader = "test_registry.CsvPreprocessing"\n', 'exactly one'),
+    ('[groups.Home]\nloader = "test_registry.CsvPreprocessing"\npattern = "*.csv"\nfiles = { Home = "a.csv" }\n',
+     'exactly one'),
+])
+def test_invalid_groups(tmp_path, body, message):
+    config = tmp_path / 'datasets.toml'
+    config.write_text(body)
+    with pytest.raises(ValueError, match=message):
+        load_config(config)
+
+
+def test_unsupported_format(tmp_path):
+    config = tmp_path / 'datasets.ini'
+    config.write_text('')
+    with pytest.raises(ValueError, match='.ini'):
+        load_config(config)
+
+
+def test_relative_paths_resolve_against_data_root(tmp_path, monkeypatch):
+    monkeypatch.delenv('TS_MISSINGNESS_DATA_ROOT', raising=False)
+    groups = {'Home': {'loader': 'test_registry.CsvPreprocessing', 'pattern': 'homes/*.csv'},
+              'Sweden': {'loader': 'utils.datasets.sweden.SwedenPreprocessing',
+                         'files': {'Sweden Bedroom': 'Sweden/IAQbedroom.txt', 'Sweden Kitchen': '/mnt/kitchen.txt'}}}
+    resolved = resolve_paths(groups, tmp_path)
+    assert resolved['Home']['pattern'] == str(tmp_path / 'homes' / '*.csv')
+    assert resolved['Sweden']['files'] == {'Sweden Bedroom': str(tmp_path / 'Sweden' / 'IAQbedroom.txt'),
+                                           'Sweden Kitchen': '/mnt/kitchen.txt'}
+    assert groups['Home']['pattern'] == 'homes/*.csv'
+
+    with pytest.raises(ValueError, match='TS_MISSINGNESS_DATA_ROOT'):
+        DatasetRegistry(groups, manifest_path=None)
+    monkeypatch.setenv('TS_MISSINGNESS_DATA_ROOT', str(tmp_path))
+    assert DatasetRegistry(groups, manifest_path=None).groups == resolved
+    assert resolve_paths(groups, '/data')['Home']['pattern'] == '/data/homes/*.csv'
@@ -0,0 +1,116 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils import get_data
+from utils.registry import DatasetRegistry
+from utils.report import MANIFEST_NAME, generate_reports, main
+
+
+class CsvPreprocessing:
+    """Loader for the test files: plain CSV with a Date column."""
+
+    @staticmethod
+    def load_and_preprocess(path):
+        return pd.read_csv(path, parse_dates=['Date'])
+
+
+def _write_home(path, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=96, freq='h'),
+                       'CO2': rng.integers(400, 2000, 96).astype(float), 'PM2.5': rng.random(96)})
+    df.loc[rng.random(96) < 0.2, 'CO2'] = np.nan
+    df.to_csv(path, index=False)
+
+
+def _homes(tmp_path):
+    for home in 'ab':
+        _write_home(tmp_path / f'{home}.csv', ord(home))
+    data_dict = {f'Home {home}': str(tmp_path / f'{home}.csv') for home in 'ab'}
+    return data_dict, dict.fromkeys(data_dict, CsvPreprocessing)
+
+
+def test_unchanged_datasets_are_skipped(tmp_path):
+    data_dict, loaders = _homes(tmp_path)
+    out = tmp_path / 'reports'
+    logged = []
+
+    first = generate_reports(data_dict, out, executor='threads', loaders=loaders, log=logged.append)
+    assert first['status'].tolist() == ['ok', 'ok'] and first['rows'].tolist() == [96, 96]
+    manifest = json.loads((out / MANIFEST_NAME).read_text())
+    assert sorted(manifest) == ['Home a', 'Home b']
+    assert len(manifest['Home a']['artifacts']) == 9
+    assert all((out / artifact).exists() for entry in manifest.values() for artifact in entry['artifacts'])
+    coverage = pd.read_parquet(out / 'Home_a' / 'feature_coverage.parquet')
+    assert coverage.set_index('feature').loc['PM2.5', 'coverage'] == 100
+
+    assert generate_reports(data_dict, out, loaders=loaders, log=logged.append)['status'].tolist() == \
+        ['skipped', 'skipped']
+
+    # Changed inputs, changed options, missing artifacts and --force rebuild
+    _write_home(tmp_path / 'b.csv', 0)
+    assert generate_reports(data_dict, out, executor='serial', loaders=loaders)['status'].tolist() == \
+        ['skipped', 'ok']
+    assert generate_reports(data_dict, out, executor='serial', loaders=loaders, datasets=['Home a'],
+                            figures=False)['status'].tolist() == ['ok']
+    (out / 'Home_b' / 'gaps.parquet').unlink()
+    assert generate_reports(data_dict, out, executor='serial', loaders=loaders)['status'].tolist() == \
+        ['ok', 'ok']
+    assert generate_reports(data_dict, out, executor='serial', loaders=loaders, force=True)['status'].tolist() == \
+        ['ok', 'ok']
+    assert logged[-2:] == ['Home a: unchanged, skipped', 'Home b: unchanged, skipped']
+
+
+def _registry_without_manifest(path, data_root=None):
+    return DatasetRegistry.from_file(path, manifest_path=None, data_root=data_root)
+
+
+def test_failures_set_the_exit_code(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(get_data, 'get_registry', _registry_without_manifest)
+    data_dict, _ = _homes(tmp_path)
+    (tmp_path / 'c.csv').write_text('not,a,dataset\n')
+    data_dict.update({'Home c': str(tmp_path / 'c.csv'), 'Home d': str(tmp_path / 'd.csv')})
+    registry = tmp_path / 'datasets.json'
+    registry.write_text(json.dumps({'groups': {'Home': {
+        'loader': 'test_report.CsvPreprocessing', 'files': data_dict}}}))
+    out = tmp_path / 'reports'
+    argv = ['--out', str(out), '--registry', str(registry), '--cache-dir', '', '--executor', 'threads',
+            '--no-figures']
+
+    assert main(argv) == 1
+    assert capsys.readouterr().out.splitlines()[-1].startswith('2 written, 0 skipped, 2 failed')
+    manifest = json.loads((out / MANIFEST_NAME).read_text())
+    assert sorted(manifest) == ['Home a', 'Home b']
+
+    # Failed datasets are retried; the others are skipped
+    assert main(argv) == 1
+    assert capsys.readouterr().out.splitlines()[-1].startswith('0 written, 2 skipped, 2 failed')
+    assert main(argv + ['--datasets', 'Home a', 'Home b']) == 0
+
+    os.remove(tmp_path / 'c.csv')
+    _write_home(tmp_path / 'd.csv', 3)
+    assert main(argv + ['--datasets', 'Home c', 'Home d']) == 1
+    assert capsys.readouterr().out.splitlines()[-1].startswith('1 written, 0 skipped, 1 failed')
+
+
+def test_registry_paths_need_a_data_root(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(get_data, 'get_registry', _registry_without_manifest)
+    monkeypatch.delenv('TS_MISSINGNESS_DATA_ROOT', raising=False)
+    _homes(tmp_path)
+    registry = tmp_path / 'datasets.toml'
+    registry.write_text('[groups.Home]\nloader = "test_report.CsvPreprocessing"\npattern = "*.csv"\n'
+                        'name = "Home {stem}"\n')
+    argv = ['--out', str(tmp_path / 'reports'), '--registry', str(registry), '--cache-dir', '',
+            '--executor', 'serial', '--no-figures']
+
+    assert main(argv) == 2
+    assert 'TS_MISSINGNESS_DATA_ROOT' in capsys.readouterr().err
+    assert not (tmp_path / 'reports').exists()
+
+    assert main(argv + ['--data-root', str(tmp_path)]) == 0
+    assert capsys.readouterr().out.splitlines()[-1].startswith('2 written')
+    monkeypatch.setenv('TS_MISSINGNESS_DATA_ROOT', str(tmp_path))
+    assert main(argv) == 0
+    assert capsys.readouterr().out.splitlines()[-1].startswith('0 written, 2 skipped')
@@ -0,0 +1,72 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.datasets.shared_store import SharedStore, attach_frame
+
+
+def _frame(n=500):
+    rng = np.random.default_rng(0)
+    values = rng.random(n)
+    values[rng.random(n) < 0.2] = np.nan
+    return pd.DataFrame({
+        'Date': pd.date_range('2023-01-01', periods=n, freq='10min'),
+        'PM2.5': values,
+        'CO2': rng.integers(400, 2000, n),
+        'Humidity': rng.random(n).astype(np.float32),
+        'Room': 'bedroom',
+    })
+
+
+def _exists(block_name):
+    try:
+        shared_memory.SharedMemory(name=block_name).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def test_attach_matches_numeric_columns():
+    store = SharedStore()
+    df = _frame()
+    try:
+        view = attach_frame(store.publish('home', df))
+        pd.testing.assert_frame_equal(view, df[['Date', 'PM2.5', 'CO2', 'Humidity']])
+        with pytest.raises(ValueError):
+            view.iloc[0, 1] = 0.0
+    finally:
+        store.close()
+
+
+def test_views_outlive_released_block():
+    store = SharedStore()
+    df = _frame()
+    handle = store.publish('home', df)
+    view = attach_frame(handle)
+    column = view['PM2.5']
+    store.close()
+    assert not _exists(handle.block_name)
+    pd.testing.assert_series_equal(column, df['PM2.5'])
+    pd.testing.assert_frame_equal(view, df[['Date', 'PM2.5', 'CO2', 'Humidity']])
+
+
+def _column_sum(handle):
+    return float(attach_frame(handle)['PM2.5'].sum())
+
+
+def test_worker_exit_keeps_block():
+    store = SharedStore()
+    df = _frame()
+    try:
+        handle = store.publish('home', df)
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            assert executor.submit(_column_sum, handle).result() == pytest.approx(df['PM2.5'].sum())
+        assert _exists(handle.block_name)
+        pd.testing.assert_series_equal(attach_frame(handle)['PM2.5'], df['PM2.5'])
+    finally:
+        store.close()
+    assert not _exists(handle.block_name)
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from utils.summary import calculate_comprehensive_statistics, dataset_bin_counts, roll_up_counts
+
+PERCENTAGES = ['Percentage Recorded Data', 'Percentage Usable Data (>80%)', 'Percentage Usable Data (>50%)']
+
+
+class _Store:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def dataset_names(self):
+        return list(self.frames)
+
+    def get_data(self, name):
+        return self.frames[name]
+
+
+def _hourly(days, hours):
+    """Readings in the given hours of the given days, every 10 minutes."""
+    stamps = pd.date_range(days[0], days[-1] + pd.Timedelta(days=1), freq='10min', inclusive='left')
+    keep = stamps.normalize().isin(days) & np.isin(stamps.hour, hours)
+    return pd.DataFrame({'Date': stamps[keep], 'PM2.5': 1.0})
+
+
+def test_resolutions_agree_on_sparse_series():
+    # February 2021 runs Monday to Sunday, so days, weeks and the month all cover it exactly
+    days = pd.date_range('2021-02-01', '2021-02-28', freq='D')
+    frames = {f'{n} hours': _hourly(days, range(n)) for n in [20, 14, 10]}
+    frames['1 day a week'] = _hourly(days[::7], range(24))
+    tables = calculate_comprehensive_statistics(_Store(frames), resolution=['D', 'W', 'ME'])
+
+    pd.testing.assert_frame_equal(tables['W'][PERCENTAGES].iloc[:3], tables['D'][PERCENTAGES].iloc[:3])
+    pd.testing.assert_frame_equal(tables['ME'][PERCENTAGES].iloc[:3], tables['D'][PERCENTAGES].iloc[:3])
+    assert list(tables['D']['Percentage Usable Data (>80%)'].iloc[:3]) == [100, 0, 0]
+    assert list(tables['D']['Percentage Recorded Data'].iloc[:3]) == [100, 100, 0]
+
+    # Full days once a week (1 Feb to 22 Feb): the days count, but no week or month is covered
+    assert tables['D'].loc['1 day a week', 'Percentage Usable Data (>80%)'] == 4 / 22 * 100
+    assert tables['W'].loc['1 day a week', 'Percentage Recorded Data'] == 0
+    assert tables['ME'].loc['1 day a week', 'Percentage Usable Data (>50%)'] == 0
+
+
+def test_expected_bins_follow_calendar():
+    finer_counts, *_ = dataset_bin_counts(_hourly(pd.date_range('2021-01-01', '2021-03-31', freq='D'), range(24)))
+    rolled = roll_up_counts(finer_counts, ['D', 'W', 'ME'])
+    assert set(rolled['D']['expected_bins']) == {24}
+    assert set(rolled['W']['expected_bins']) == {168}
+    assert list(rolled['ME']['expected_bins']) == [31 * 24, 28 * 24, 31 * 24]
+    assert (rolled['ME']['present_bins'] == rolled['ME']['expected_bins']).all()
+
+
+def test_bin_counts_skip_undated_rows():
+    df = pd.DataFrame({'Date': ['2023-01-01 00:00', None, '2023-01-02 05:00', 'bad'],
+                       'PM2.5': [np.nan, np.nan, 1.0, np.nan], 'Room': [None, 'a', None, None]})
+    finer_counts, total_records, missing_records, time_span = dataset_bin_counts(df)
+    assert (total_records, missing_records, time_span) == (2, 3, 1)
+    assert finer_counts.sum() == 2
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+if hasattr(np, 'bitwise_count'):
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        """Sum of set bits along the last axis."""
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        """Sum of set bits along the last axis."""
+        return _POPCOUNT_TABLE[np.ascontiguousarray(words).view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def pack_presence(df: pd.DataFrame, columns=None) -> np.ndarray:
+    """
+    Pack the non-missing mask of each column into a bitmap (one bit per row).
+
+    Columns are packed one at a time, so the only full-length temporary is a
+    single boolean column rather than an int64 (rows x features) matrix.
+
+    Parameters:
+        df (pd.DataFrame): Data to pack.
+        columns (list or None): Columns to pack, in order. Defaults to all columns.
+
+    Returns:
+        np.ndarray: uint64 array of shape (features, words); bits past the last
+        row are zero.
+    """
+    if columns is None:
+        columns = df.columns
+
+    n_words = (len(df) + 63) // 64
+    bits = np.zeros((len(columns), n_words * 8), dtype=np.uint8)
+    for f, col in enumerate(columns):
+        packed = np.packbits(df[col].notna().to_numpy())
+        bits[f, :len(packed)] = packed
+    return bits.view(np.uint64)
+
+
+def bitmap_counts(bits: np.ndarray) -> np.ndarray:
+    """
+    Count present rows per feature.
+
+    Returns:
+        np.ndarray: int64 array of shape (features,).
+    """
+    return _popcount(bits)
+
+
+def bitmap_co_counts(bits: np.ndarray) -> np.ndarray:
+    """
+    Count rows where both features of each pair are present (AND + popcount).
+
+    Returns:
+        np.ndarray: Symmetric int64 array of shape (features, features); the
+        diagonal holds the per-feature counts.
+    """
+    n_features = bits.shape[0]
+    counts = np.zeros((n_features, n_features), dtype=np.int64)
+    for i in range(n_features):
+        row = _popcount(bits[i] & bits[i:])
+        counts[i, i:] = row
+        counts[i:, i] = row
+    return counts
+
+
+def bitmap_joint_count(bits: np.ndarray, features=None) -> int:
+    """
+    Count rows where all of the given features are present.
+
+    Parameters:
+        bits (np.ndarray): Packed presence from pack_presence.
+        features (list or None): Row positions in bits to combine. Defaults to all.
+
+    Returns:
+        int: Number of rows with every selected feature present.
+    """
+    if features is not None:
+        bits = bits[list(features)]
+    if bits.shape[0] == 0:
+        raise ValueError("At least one feature is required.")
+    return int(_popcount(np.bitwise_and.reduce(bits, axis=0)))
@@ -1,6 +1,97 @@
 import pandas as pd
 import numpy as np
 
+from utils.bitmaps import pack_presence, bitmap_co_counts
+from utils.memo import memoize
+from utils.profiling import profiled
+
+def _as_ns(values) -> np.ndarray:
+    """Return datetime-like values as int64 nanoseconds since the epoch (NaT -> min int64)."""
+    return np.asarray(values, dtype='datetime64[ns]').view('i8')
+
+def bin_edges(daily_bins) -> np.ndarray:
+    """
+    Convert bin edges to int64 nanoseconds once, for reuse across many datasets.
+
+    The result can be passed anywhere a `daily_bins` argument is expected.
+    """
+    return _as_ns(daily_bins)
+
+def _parsed_dates(dates: pd.Series) -> pd.Series:
+    """Parse a 'Date' column unless it already holds datetimes."""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates
+    return pd.to_datetime(dates, errors='coerce')
+
+@profiled
+def compute_bin_presence(df: pd.DataFrame, columns, daily_bins):
+    """
+    Scatter the non-missing mask of the given columns into bins.
+
+    Timestamps are mapped to integer bin positions once with a searchsorted over
+    the bin edges, and the NaN mask of all columns is scattered in a single pass.
+    Bins are half-open, [b_k, b_k+1), as with pd.cut(right=False).
+
+    Parameters:
+        df (pd.DataFrame): Dataset with 'Date' and the requested columns.
+        columns (list): Columns to include (all must be in df), in output order.
+        daily_bins (pd.DatetimeIndex or np.ndarray): Bin edges, or the output of bin_edges.
+
+    Returns:
+        tuple: (presence, bin_rows) where presence is a boolean (T x F) array,
+        True where column f has a value in bin t, and bin_rows counts the rows per bin.
+    """
+    edges = _as_ns(daily_bins)
+    dates = _as_ns(_parsed_dates(df['Date']))
+    T = len(edges) - 1
+
+    pos = np.searchsorted(edges, dates, side='right') - 1
+    valid = (dates != np.iinfo(np.int64).min) & (pos >= 0) & (pos < T)
+    pos = pos[valid]
+
+    mask = df[list(columns)].notna().to_numpy()[valid]
+    rows, cols = np.nonzero(mask)
+    presence = np.zeros((T, len(columns)), dtype=bool)
+    presence[pos[rows], cols] = True
+    return presence, np.bincount(pos, minlength=T)
+
+def compute_presence_matrix(df: pd.DataFrame, columns, daily_bins) -> np.ndarray:
+    """
+    Reduce a dataset to a boolean (T x F) presence matrix over the given bins.
+
+    Parameters:
+        df (pd.DataFrame): Dataset with 'Date' and the requested columns.
+        columns (list): Columns to include (all must be in df), in output order.
+        daily_bins (pd.DatetimeIndex): Bin edges.
+
+    Returns:
+        np.ndarray: Boolean array, True where column f has a value in bin t.
+    """
+    presence, bin_rows = compute_bin_presence(df, columns, daily_bins)
+    return fill_empty_bins(presence, bin_rows)
+
+def fill_empty_bins(presence: np.ndarray, bin_rows: np.ndarray) -> np.ndarray:
+    """
+    Mark bins without any rows as covered for every feature, in place.
+
+    This is how empty bins have always been counted (the old per-column groupby
+    left them as NaN, which cast to True).
+    """
+    presence[bin_rows == 0] = True
+    return presence
+
+def compute_presence_co_coverage(presence: np.ndarray) -> np.ndarray:
+    """
+    Compute the (F x F) co-coverage matrix from a (T x F) presence matrix.
+
+    Returns:
+        np.ndarray: Fraction of the T bins in which both features are present.
+    """
+    p = presence.astype(np.float64)
+    return (p.T @ p) / presence.shape[0]
+
+@profiled
+@memoize
 def compute_partial_co_coverage_vector(df, feature_pool, daily_bins):
     """
     Compute average co-coverage vector for a dataset using only available features.
@@ -14,30 +105,16 @@ def compute_partial_co_coverage_vector(df, feature_pool, daily_bins):
     Returns:
         list: Average co-coverage for each feature in feature_pool (zero if not in dataset).
     """
-    df = df.copy()
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-    df = df[df['Date'].notna()]
-    df = df[df['Date'].between(daily_bins[0], daily_bins[-1])]
-
     available = [f for f in feature_pool if f in df.columns]
     if len(available) < 1:
         return None
 
-    df['bin'] = pd.cut(df['Date'], bins=daily_bins, labels=daily_bins[:-1], right=False)
-
-    daily_presence = pd.DataFrame(0, index=daily_bins[:-1], columns=available)
-    for col in available:
-        daily_presence[col] = df.groupby('bin', observed=True)[col].apply(lambda x: x.notna().any()).astype(int)
-
-    T = len(daily_bins) - 1
-    co_matrix = pd.DataFrame(0.0, index=available, columns=available)
-    for i in available:
-        for j in available:
-            # co_matrix.loc[i, j] = (daily_presence[i] & daily_presence[j]).sum() / T
-            co_matrix.loc[i, j] = (daily_presence[i].astype(bool) & daily_presence[j].astype(bool)).sum() / T
-    avg_cov = co_matrix.mean(axis=1)
+    co_matrix = compute_presence_co_coverage(compute_presence_matrix(df, available, daily_bins))
+    avg_cov = dict(zip(available, co_matrix.mean(axis=1)))
     return [avg_cov.get(f, 0.0) for f in feature_pool]
 
+@profiled
+@memoize
 def compute_avg_daily_co_coverage_vector(df, features, daily_bins):
     """
     Compute average daily co-coverage vector for a single dataset.
@@ -50,31 +127,17 @@ def compute_avg_daily_co_coverage_vector(df, features, daily_bins):
     Returns:
         list: Average co-coverage per feature.
     """
-    df = df.copy()
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-    df = df[df['Date'].notna()]
-    df = df[df['Date'].between(daily_bins[0], daily_bins[-1])]
-
     available = [col for col in features if col in df.columns]
     if len(available) < 2:
         return None
 
-    df['bin'] = pd.cut(df['Date'], bins=daily_bins, labels=daily_bins[:-1], right=False)
-
-    daily_presence = pd.DataFrame(0, index=daily_bins[:-1], columns=available)
-    for col in available:
-        daily_presence[col] = df.groupby('bin', observed=True)[col].apply(lambda x: x.notna().any()).astype(int)
-
-    T = len(daily_bins) - 1
-    co_matrix = pd.DataFrame(0.0, index=available, columns=available)
-    for i in available:
-        for j in available:
-            co_matrix.loc[i, j] = (daily_presence[i].astype(bool) & daily_presence[j].astype(bool)).sum() / T
-
-    avg_vector = [co_matrix[feature].mean() if feature in co_matrix else 0 for feature in features]
-    return avg_vector
+    co_matrix = compute_presence_co_coverage(compute_presence_matrix(df, available, daily_bins))
+    avg_cov = dict(zip(available, co_matrix.mean(axis=0)))
+    return [avg_cov[feature] if feature in avg_cov else 0 for feature in features]
 
 
+@profiled
+@memoize
 def compute_co_coverage_matrix(df: pd.DataFrame, selected_columns=None) -> pd.DataFrame:
     """
     Compute the co-coverage matrix for a given DataFrame.
@@ -89,17 +152,14 @@ def compute_co_coverage_matrix(df: pd.DataFrame, selected_columns=None) -> pd.Da
     if 'Date' not in df.columns:
         raise ValueError("DataFrame must include a 'Date' column.")
 
-    df = df.copy()
-    df = df.set_index('Date')
-
-    numeric_cols = df.select_dtypes(include='number').columns
+    numeric_cols = df.select_dtypes(include='number').columns.drop('Date', errors='ignore')
     if selected_columns:
-        numeric_cols = [col for col in selected_columns if col in numeric_cols]
+        numeric_cols = pd.Index([col for col in selected_columns if col in numeric_cols])
 
-    presence = df[numeric_cols].notna().astype(int)  # binary matrix
+    bits = pack_presence(df, numeric_cols)  # one bit per timestamp per feature
 
-    co_counts = presence.T @ presence         # shared timestamps
-    total_counts = presence.shape[0]          # total time points
+    co_counts = pd.DataFrame(bitmap_co_counts(bits), index=numeric_cols, columns=numeric_cols)  # shared timestamps
+    total_counts = len(df)                    # total time points
 
     co_coverage = co_counts / total_counts * 100  # as percent
     return co_coverage
@@ -0,0 +1,128 @@
+import glob
+import hashlib
+import logging
+import os
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetCache:
+    """
+    Content-addressed on-disk cache of preprocessed datasets.
+
+    Frames are stored as uncompressed Arrow IPC files named after a key built
+    from the source path, size, mtime and the preprocessing class version, so a
+    changed source (or loader) simply misses and is rebuilt. Hits skip the
+    source parsing: the file is read through a memory map and converted to
+    pandas in a single copy. Frames that cannot be cached (an unwritable
+    directory, mixed-type object columns) are logged and used uncached.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            logger.warning("Cannot create the dataset cache directory %s: %s", self.cache_dir, e)
+
+    @staticmethod
+    def source_fingerprint(file_path, preprocessing_class):
+        """
+        Identify a source file and the loader that preprocesses it.
+
+        Returns:
+            str: Hex digest of path, size, mtime and preprocessor name/version.
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        version = getattr(preprocessing_class, 'VERSION', 0)
+        token = f"{path}|{stat.st_size}|{stat.st_mtime_ns}|" \
+                f"{preprocessing_class.__module__}.{preprocessing_class.__qualname__}|{version}"
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _path_prefix(self, file_path):
+        return hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:16]
+
+    def path_for(self, file_path, preprocessing_class):
+        """Cache file path for the current state of a source file."""
+        key = self.source_fingerprint(file_path, preprocessing_class)
+        return os.path.join(self.cache_dir, f"{self._path_prefix(file_path)}-{key}.arrow")
+
+    def load(self, file_path, preprocessing_class):
+        """
+        Return the cached frame for a source, or None on a miss.
+        """
+        path = self.path_for(file_path, preprocessing_class)
+        if not os.path.exists(path):
+            return None
+        return read_arrow(path)
+
+    def store(self, file_path, preprocessing_class, df):
+        """
+        Write a preprocessed frame to the cache, replacing older entries for the same source.
+
+        Returns:
+            str or None: Path of the cache file, or None if the frame could not be cached.
+        """
+        path = self.path_for(file_path, preprocessing_class)
+        try:
+            write_arrow(df, path)
+        except (OSError, pa.ArrowException) as e:
+            logger.warning("Not caching %s: %s", file_path, e)
+            return None
+
+        for stale in glob.glob(os.path.join(self.cache_dir, f"{self._path_prefix(file_path)}-*.arrow")):
+            if stale != path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+        return path
+
+
+def write_arrow(df, path):
+    """
+    Atomically write a DataFrame to an uncompressed Arrow IPC file.
+    """
+    table = pa.Table.from_pandas(df)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_arrow(path):
+    """
+    Read a DataFrame from an Arrow IPC file.
+
+    The file is memory-mapped, so Arrow reads it without an intermediate buffer;
+    to_pandas then copies the columns into pandas-owned arrays.
+    """
+    source = pa.memory_map(path, 'r')
+    return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def to_ipc_bytes(df):
+    """
+    Serialize a DataFrame to an in-memory Arrow IPC stream.
+    """
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def from_ipc_bytes(buf):
+    """
+    Read a DataFrame back from to_ipc_bytes output.
+    """
+    return pa.ipc.open_stream(pa.py_buffer(buf)).read_all().to_pandas()
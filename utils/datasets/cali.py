@@ -1,17 +1,43 @@
 import pandas as pd
 
+from utils.profiling import profile_stage, profiled
+
 class CaliPreprocessing:
+    VERSION = 1  # bump when the preprocessing output changes
+
     @staticmethod
+    @profiled(rows='result')
     def load_and_preprocess(file_path):
-        df = pd.read_csv(file_path)
+        with profile_stage('read_csv') as stage:
+            df = pd.read_csv(file_path)
+            stage.rows = len(df)
     
         # Rename the 'Time' column to 'Date'
         df = df.rename(columns={'Time': 'Date'})
         
         # Convert 'Date' to datetime format
-        df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d %H:%M:%S', errors='coerce')
+        with profile_stage('to_datetime', rows=len(df)):
+            df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d %H:%M:%S', errors='coerce')
         
         df = df[['Date'] + df.select_dtypes(include=['number']).columns.tolist()]
 
         
         return df
+
+    @staticmethod
+    def iter_chunks(file_path, chunksize=100_000):
+        """
+        Stream the file as preprocessed chunks without reading it whole.
+
+        Numeric columns are identified from the first `chunksize` rows; only
+        those and 'Time' are read, with float64 dtypes.
+        """
+        sample = pd.read_csv(file_path, nrows=chunksize)
+        numeric_cols = sample.drop(columns=['Time']).select_dtypes(include=['number']).columns.tolist()
+
+        reader = pd.read_csv(file_path, usecols=['Time'] + numeric_cols,
+                             dtype={col: 'float64' for col in numeric_cols}, chunksize=chunksize)
+        for chunk in reader:
+            chunk = chunk.rename(columns={'Time': 'Date'})
+            chunk['Date'] = pd.to_datetime(chunk['Date'], format='%Y-%m-%d %H:%M:%S', errors='coerce')
+            yield chunk[['Date'] + numeric_cols]
@@ -1,11 +1,19 @@
 import pandas as pd
 
+from utils.profiling import profile_stage, profiled
+
 class CaliAptPreprocessing:
+    VERSION = 1  # bump when the preprocessing output changes
+
     @staticmethod
+    @profiled(rows='result')
     def load_and_preprocess(file_path):
-        df = pd.read_csv(file_path)
+        with profile_stage('read_csv') as stage:
+            df = pd.read_csv(file_path)
+            stage.rows = len(df)
         # Convert 'Time' column to datetime and rename it to 'Date'
-        df['Date'] = pd.to_datetime(df['Time'], format='%m/%d/%y %H:%M')
+        with profile_stage('to_datetime', rows=len(df)):
+            df['Date'] = pd.to_datetime(df['Time'], format='%m/%d/%y %H:%M')
 
         # Drop the old 'Time' column (optional)
         df = df.drop(columns=['Time'])
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+NON_NUMERIC_MODES = ('categorize', 'drop', 'keep')
+
+
+def _narrow_float(values, tolerance):
+    """float32 copy of a float array, or None if any value moves by more than tolerance (relative)."""
+    with np.errstate(over='ignore'):
+        narrowed = values.astype(np.float32)
+    if np.allclose(narrowed, values, rtol=tolerance, atol=0, equal_nan=True):
+        return narrowed
+    return None
+
+
+def compact_frame(df: pd.DataFrame, tolerance=1e-6, non_numeric='categorize'):
+    """
+    Shrink a preprocessed frame for keeping it resident.
+
+    Float columns become float32 where every value stays within `tolerance`
+    (relative) of the original, integer columns take the smallest integer
+    type that holds them, 'Date' is parsed to datetime64 and the rows are
+    sorted by it, and other columns are categorized, dropped or kept.
+
+    Parameters:
+        df (pd.DataFrame): Frame with a 'Date' column.
+        tolerance (float): Maximum relative change allowed when downcasting to float32.
+        non_numeric (str): 'categorize', 'drop' or 'keep' for non-numeric columns.
+
+    Returns:
+        tuple: (compacted DataFrame, dict with bytes_before, bytes_after,
+        float32_columns, categorical_columns, dropped_columns)
+    """
+    if non_numeric not in NON_NUMERIC_MODES:
+        raise ValueError(f"Unsupported non-numeric mode: {non_numeric}")
+
+    columns = {}
+    float32_columns, categorical_columns, dropped_columns = [], [], []
+    for col in df.columns:
+        series = df[col]
+        if col == 'Date':
+            if not pd.api.types.is_datetime64_any_dtype(series):
+                series = pd.to_datetime(series, errors='coerce')
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            narrowed = _narrow_float(series.to_numpy(), tolerance)
+            if narrowed is not None:
+                series = pd.Series(narrowed, index=series.index, name=col)
+                float32_columns.append(col)
+        elif pd.api.types.is_integer_dtype(series):
+            series = pd.to_numeric(series, downcast='integer')
+        elif not (pd.api.types.is_numeric_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype)):
+            if non_numeric == 'drop':
+                dropped_columns.append(col)
+                continue
+            if non_numeric == 'categorize':
+                series = series.astype('category')
+                categorical_columns.append(col)
+        columns[col] = series
+
+    compacted = pd.DataFrame(columns, index=df.index)
+    if 'Date' in compacted.columns:
+        compacted = compacted.sort_values('Date', kind='stable', ignore_index=True)
+
+    stats = {
+        'bytes_before': int(df.memory_usage(deep=True).sum()),
+        'bytes_after': int(compacted.memory_usage(deep=True).sum()),
+        'float32_columns': float32_columns,
+        'categorical_columns': categorical_columns,
+        'dropped_columns': dropped_columns,
+    }
+    return compacted, stats
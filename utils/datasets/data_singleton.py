@@ -1,66 +1,412 @@
-from concurrent.futures import ThreadPoolExecutor
-from threading import Lock
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock, RLock
+
+from utils.memo import register_dataset
+from utils.profiling import profile_stage, propagate
+
+EXECUTORS = ('threads', 'processes', 'serial')
+
+
+def _load_dataset(preprocessing_class, file_path, cache=None):
+    """
+    Load one dataset, going through the on-disk cache when one is given.
+    :return: (data, source) where source is 'cache' or 'file'.
+    """
+    if cache is not None:
+        data = cache.load(file_path, preprocessing_class)
+        if data is not None:
+            return data, 'cache'
+
+    data = preprocessing_class.load_and_preprocess(file_path)
+    if cache is not None:
+        cache.store(file_path, preprocessing_class, data)
+    return data, 'file'
+
+
+def _load_in_worker(preprocessing_class, file_path, cache=None):
+    """
+    Process-pool entry point. Frames are handed back as Arrow data rather than
+    pickled: the cache file path when a cache is configured (the parent reads it
+    back), otherwise an Arrow IPC buffer. Frames Arrow cannot hold (mixed-type
+    object columns) fall back to pickling.
+    """
+    import pyarrow as pa
+    from utils.datasets.cache import to_ipc_bytes
+
+    start = time.perf_counter()
+    data = preprocessing_class.load_and_preprocess(file_path)
+    path = cache.store(file_path, preprocessing_class, data) if cache is not None else None
+    if path is not None:
+        payload = ('path', path)
+    else:
+        try:
+            payload = ('ipc', to_ipc_bytes(data))
+        except pa.ArrowException:
+            payload = ('pickle', data)
+    return payload, time.perf_counter() - start
+
+
+def select_preprocessing_class(name, loaders=None):
+    """
+    Select the preprocessing class of a dataset: from loaders when it maps the
+    name, otherwise based on the dataset name.
+    """
+    if loaders and name in loaders:
+        return loaders[name]
+    if 'Sweden' in name:
+        from utils.datasets.sweden import SwedenPreprocessing
+        return SwedenPreprocessing
+    elif 'India' == name:
+        from utils.datasets.india import IndiaPreprocessing
+        return IndiaPreprocessing
+    elif 'Mexico' == name:
+        from utils.datasets.mexico import MexicoPreprocessing
+        return MexicoPreprocessing
+    elif 'Calihome' in name:
+        from utils.datasets.cali import CaliPreprocessing
+        return CaliPreprocessing
+    elif 'Caliapt' in name:
+        from utils.datasets.cali2 import CaliAptPreprocessing
+        return CaliAptPreprocessing
+    elif 'Italy' in name:
+        from utils.datasets.italy import ItalyPreprocessing
+        return ItalyPreprocessing
+    else:
+        raise ValueError(f"No preprocessing class defined for the dataset {name}")
+
 
 class DataSingleton:
     _instance = None
 
     _lock = Lock()  # Ensures thread-safe singleton instantiation
 
-    def __new__(cls, data_dict=None):
+    def __new__(cls, data_dict=None, cache_dir=None, lazy=False, memory_budget=None,
+                executor='threads', max_workers=None, compact=False, compact_tolerance=1e-6,
+                compact_non_numeric='categorize', loaders=None):
+        """
+        :param data_dict: A dictionary where keys are dataset names and values are file paths.
+        :param cache_dir: Directory for the on-disk cache of preprocessed frames (None disables it).
+        :param lazy: If True, datasets are loaded on first access instead of up front.
+        :param memory_budget: Maximum resident size of the loaded frames (and of their shared-memory
+            blocks, see share) in bytes; least recently used frames are evicted beyond it and
+            reloaded on demand. None means unlimited.
+        :param executor: Backend for the initial load: 'threads', 'processes' or 'serial'.
+        :param max_workers: Pool size for the 'threads' and 'processes' backends.
+        :param compact: If True, loaded frames are compacted before being stored (see
+            utils.datasets.compaction.compact_frame and compaction_report).
+        :param compact_tolerance: Maximum relative change allowed when downcasting floats to float32.
+        :param compact_non_numeric: 'categorize', 'drop' or 'keep' for non-numeric columns.
+        :param loaders: Optional mapping of dataset names to preprocessing classes (e.g. from
+            DatasetRegistry.loaders()); other names fall back to matching on the name.
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unsupported executor: {executor}")
         with cls._lock:  # Thread-safe initialization
             if cls._instance is None:
                 cls._instance = super(DataSingleton, cls).__new__(cls)
-                cls._instance._data_store = {}
-                if data_dict:
+                cls._instance._data_store = OrderedDict()  # least recently used first
+                cls._instance._sources = dict(data_dict or {})
+                cls._instance._sizes = {}
+                cls._instance._pending = {}
+                cls._instance._store_lock = RLock()
+                cls._instance._prefetch_executor = None
+                cls._instance._memory_budget = memory_budget
+                cls._instance._executor = executor
+                cls._instance._max_workers = max_workers
+                cls._instance._load_times = []
+                cls._instance._cache = None
+                cls._instance._loaders = dict(loaders or {})
+                cls._instance._shared_store = None
+                cls._instance._shared_versions = {}  # dataset -> weak reference to the published frame
+                cls._instance._shared_sizes = {}  # dataset -> bytes of its shared-memory block
+                cls._instance._compaction = None
+                cls._instance._compaction_stats = {}
+                if compact:
+                    cls._instance._compaction = {'tolerance': compact_tolerance,
+                                                 'non_numeric': compact_non_numeric}
+                if cache_dir:
+                    from utils.datasets.cache import DatasetCache
+                    cls._instance._cache = DatasetCache(cache_dir)
+                if data_dict and not lazy:
                     cls._instance._load_all_data_parallel(data_dict)
         return cls._instance
 
     def _load_all_data_parallel(self, data_dict):
         """
-        Load and preprocess all datasets in parallel.
+        Load and preprocess all datasets in parallel with the configured executor backend.
         :param data_dict: A dictionary where keys are dataset names and values are file paths.
         """
         def process_dataset(name, file_path):
-            preprocessing_class = self._select_preprocessing_class(name)
-            return name, preprocessing_class.load_and_preprocess(file_path)
+            start = time.perf_counter()
+            with profile_stage('DataSingleton.load', dataset=name, executor=self._executor) as stage:
+                preprocessing_class = self._select_preprocessing_class(name)
+                data, source = _load_dataset(preprocessing_class, file_path, self._cache)
+                stage.rows = len(data)
+                stage.args['source'] = source
+            return name, data, source, time.perf_counter() - start
 
-        # Use ThreadPoolExecutor for parallel processing
-        with ThreadPoolExecutor() as executor:
-            results = executor.map(lambda item: process_dataset(*item), data_dict.items())
+        if self._executor == 'serial':
+            results = [process_dataset(*item) for item in data_dict.items()]
+        elif self._executor == 'threads':
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                results = list(executor.map(propagate(lambda item: process_dataset(*item)), data_dict.items()))
+        else:
+            results = self._load_with_processes(data_dict)
 
         # Store results in the shared data store
-        for name, data in results:
+        for name, data, source, seconds in results:
+            self._store(name, data)
+            self._record_load(name, data, source, seconds)
+
+    def _load_with_processes(self, data_dict):
+        """
+        Load datasets in a process pool. Cache hits are read in this process;
+        only misses are shipped to workers.
+        """
+        from utils.datasets.cache import from_ipc_bytes, read_arrow
+
+        results = []
+        futures = {}
+        with ProcessPoolExecutor(max_workers=self._max_workers) as executor:
+            for name, file_path in data_dict.items():
+                start = time.perf_counter()
+                preprocessing_class = self._select_preprocessing_class(name)
+                if self._cache is not None:
+                    data = self._cache.load(file_path, preprocessing_class)
+                    if data is not None:
+                        results.append((name, data, 'cache', time.perf_counter() - start))
+                        continue
+                futures[name] = executor.submit(_load_in_worker, preprocessing_class, file_path, self._cache)
+
+            for name, future in futures.items():
+                (kind, payload), seconds = future.result()
+                with profile_stage('DataSingleton.receive', dataset=name, executor='processes') as stage:
+                    if kind == 'path':
+                        data = read_arrow(payload)
+                    elif kind == 'ipc':
+                        data = from_ipc_bytes(payload)
+                    else:
+                        data = payload
+                    stage.rows = len(data)
+                results.append((name, data, 'file', seconds))
+        return results
+
+    def _record_load(self, name, data, source, seconds, executor=None):
+        with self._store_lock:
+            self._load_times.append({
+                'dataset': name,
+                'executor': executor or self._executor,
+                'source': source,
+                'rows': len(data),
+                'seconds': seconds,
+            })
+
+    def load_report(self):
+        """
+        Per-dataset load timings, in load order.
+        :return: DataFrame with columns dataset, executor ('on-demand' for lazy loads),
+            source ('cache' or 'file'), rows, seconds.
+        """
+        import pandas as pd
+        with self._store_lock:
+            return pd.DataFrame(self._load_times, columns=['dataset', 'executor', 'source', 'rows', 'seconds'])
+
+    def _store(self, name, data):
+        """
+        Insert a loaded frame as most recently used and enforce the memory budget.
+        """
+        if self._compaction is not None:
+            from utils.datasets.compaction import compact_frame
+            with profile_stage('DataSingleton.compact', rows=len(data), dataset=name):
+                data, stats = compact_frame(data, **self._compaction)
+            with self._store_lock:
+                self._compaction_stats[name] = stats
+        with self._store_lock:
+            self._unshare(name)  # a reloaded frame makes its published block stale
             self._data_store[name] = data
+            self._data_store.move_to_end(name)
+            self._sizes[name] = int(data.memory_usage(deep=True).sum())
+            self._evict()
+        register_dataset(data, name, self._dataset_version(name))
+
+    def compaction_report(self):
+        """
+        Memory saved by compaction for each dataset compacted so far.
+        :return: DataFrame with columns dataset, bytes_before, bytes_after, bytes_saved,
+            percent_saved, float32_columns, categorical_columns, dropped_columns.
+        """
+        import pandas as pd
+        with self._store_lock:
+            rows = [{'dataset': name, **stats} for name, stats in self._compaction_stats.items()]
+        report = pd.DataFrame(rows, columns=['dataset', 'bytes_before', 'bytes_after', 'float32_columns',
+                                             'categorical_columns', 'dropped_columns'])
+        report.insert(3, 'bytes_saved', report['bytes_before'] - report['bytes_after'])
+        report.insert(4, 'percent_saved', report['bytes_saved'] / report['bytes_before'] * 100)
+        return report
+
+    def _dataset_version(self, name):
+        """
+        Version of a dataset for result caching: the source fingerprint, so cached
+        results stay valid across reloads of an unchanged file.
+        """
+        from utils.datasets.cache import DatasetCache
+        try:
+            version = DatasetCache.source_fingerprint(self._sources[name], self._select_preprocessing_class(name))
+        except (KeyError, OSError):
+            return uuid.uuid4().hex
+        if self._compaction is not None:
+            version += f"|compact:{self._compaction['tolerance']}:{self._compaction['non_numeric']}"
+        return version
+
+    def _evict(self):
+        """
+        Drop least recently used frames, and their shared-memory blocks, until the store
+        fits the memory budget. The most recently used frame is always kept.
+        """
+        if self._memory_budget is None:
+            return
+        while len(self._data_store) > 1 and \
+                sum(self._sizes.values()) + sum(self._shared_sizes.values()) > self._memory_budget:
+            name, _ = self._data_store.popitem(last=False)
+            del self._sizes[name]
+            self._unshare(name)
+
+    def _ensure_loaded(self, name):
+        """
+        Load a dataset from its source unless it is resident, sharing in-flight loads between threads.
+        """
+        with self._store_lock:
+            if name in self._data_store:
+                self._data_store.move_to_end(name)
+                return self._data_store[name]
+            if name not in self._sources:
+                raise ValueError(f"Dataset {name} not found.")
+            future = self._pending.get(name)
+            owner = future is None
+            if owner:
+                future = self._pending[name] = Future()
+
+        if owner:
+            try:
+                start = time.perf_counter()
+                with profile_stage('DataSingleton.load', dataset=name, executor='on-demand') as stage:
+                    preprocessing_class = self._select_preprocessing_class(name)
+                    data, source = _load_dataset(preprocessing_class, self._sources[name], self._cache)
+                    stage.rows = len(data)
+                    stage.args['source'] = source
+                self._store(name, data)
+                self._record_load(name, data, source, time.perf_counter() - start, executor='on-demand')
+                future.set_result(data)
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._store_lock:
+                    del self._pending[name]
+        return future.result()
+
+    def share(self, dataset_names=None):
+        """
+        Publish datasets to shared memory for worker processes, loading them first if needed.
+        Only the 'Date' column and numeric columns are published; blocks are reused until
+        the dataset is reloaded, count against the memory budget, and are released by
+        unshare or when the dataset is evicted.
+        :param dataset_names: Names of datasets to publish (default: all).
+        :return: A dict of dataset names to picklable SharedFrame handles; pass them to
+            utils.datasets.shared_store.attach_frame (or SharedDatasets) in the workers.
+        """
+        from utils.datasets.shared_store import SharedStore
+        with self._store_lock:
+            if self._shared_store is None:
+                self._shared_store = SharedStore()
+        handles = {}
+        for name in (self.dataset_names() if dataset_names is None else dataset_names):
+            data = self._ensure_loaded(name)
+            with self._store_lock:
+                handle = self._shared_store.handle(name)
+                published = self._shared_versions.get(name)
+                if handle is None or published is None or published() is not data:
+                    handle = self._shared_store.publish(name, data)
+                    self._shared_versions[name] = weakref.ref(data)
+                    self._shared_sizes[name] = self._shared_store.nbytes()[name]
+                    self._evict()
+            handles[name] = handle
+        return handles
+
+    def shared_datasets(self):
+        """
+        Names of the datasets currently published to shared memory.
+        """
+        with self._store_lock:
+            return list(self._shared_sizes)
+
+    def unshare(self, dataset_names=None):
+        """
+        Release the shared-memory blocks of datasets published with share. Frames already
+        attached elsewhere stay readable until they are dropped.
+        :param dataset_names: Names of datasets to release (default: all shared datasets).
+        """
+        with self._store_lock:
+            for name in (list(self._shared_sizes) if dataset_names is None else dataset_names):
+                self._unshare(name)
+
+    def _unshare(self, name):
+        if self._shared_store is not None and name in self._shared_sizes:
+            self._shared_store.unpublish(name)
+            del self._shared_sizes[name]
+            self._shared_versions.pop(name, None)
+
+    def prefetch(self, dataset_names):
+        """
+        Load the given datasets in the background.
+        :param dataset_names: Names of datasets to load.
+        :return: A list of futures resolving to the loaded frames.
+        """
+        with self._store_lock:
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(thread_name_prefix='prefetch')
+        return [self._prefetch_executor.submit(propagate(self._ensure_loaded), name) for name in dataset_names]
+
+    def dataset_names(self):
+        """
+        Names of all known datasets, loaded or not.
+        """
+        with self._store_lock:
+            return list(dict.fromkeys([*self._sources, *self._data_store]))
+
+    def memory_usage(self):
+        """
+        Resident size in bytes of each loaded dataset, including its shared-memory block
+        if it is published, least recently used first.
+        """
+        with self._store_lock:
+            return {name: self._sizes[name] + self._shared_sizes.get(name, 0) for name in self._data_store}
 
     def _select_preprocessing_class(self, name):
         """
         Select the appropriate preprocessing class based on the dataset name.
         """
-        if 'Sweden' in name:
-            from utils.datasets.sweden import SwedenPreprocessing
-            return SwedenPreprocessing
-        elif 'India' == name:
-            from utils.datasets.india import IndiaPreprocessing
-            return IndiaPreprocessing
-        elif 'Mexico' == name:
-            from utils.datasets.mexico import MexicoPreprocessing
-            return MexicoPreprocessing
-        elif 'Calihome' in name:
-            from utils.datasets.cali import CaliPreprocessing
-            return CaliPreprocessing
-        elif 'Caliapt' in name:
-            from utils.datasets.cali2 import CaliAptPreprocessing
-            return CaliAptPreprocessing
-        elif 'Italy' in name:
-            from utils.datasets.italy import ItalyPreprocessing
-            return ItalyPreprocessing
-        else:
-            raise ValueError(f"No preprocessing class defined for the dataset {name}")
+        return select_preprocessing_class(name, self._loaders)
 
-    def get_data(self, dataset_name):
+    def iter_chunks(self, dataset_name, chunksize=100_000):
         """
-        Retrieve the data for a specific dataset.
+        Stream a dataset from its source file in preprocessed chunks, without storing it.
+        :param dataset_name: Name of a dataset whose loader supports streaming.
+        :param chunksize: Rows per chunk.
+        :return: An iterator of DataFrames.
         """
-        if dataset_name not in self._data_store:
+        if dataset_name not in self._sources:
             raise ValueError(f"Dataset {dataset_name} not found.")
-        return self._data_store[dataset_name]
+        preprocessing_class = self._select_preprocessing_class(dataset_name)
+        if not hasattr(preprocessing_class, 'iter_chunks'):
+            raise ValueError(f"Streaming is not supported for the dataset {dataset_name}")
+        return preprocessing_class.iter_chunks(self._sources[dataset_name], chunksize=chunksize)
+
+    def get_data(self, dataset_name):
+        """
+        Retrieve the data for a specific dataset, loading it first if it is not resident.
+        """
+        return self._ensure_loaded(dataset_name)
@@ -1,13 +1,38 @@
 # preprocessing/india_preprocessing.py
 import pandas as pd
 
+from utils.profiling import profile_stage, profiled
+
 class IndiaPreprocessing:
+    VERSION = 1  # bump when the preprocessing output changes
+
     @staticmethod
+    @profiled(rows='result')
     def load_and_preprocess(file_path):
         # Example loading with potential India-specific column names and formats
-        df = pd.read_csv(file_path, low_memory=False)
+        with profile_stage('read_csv') as stage:
+            df = pd.read_csv(file_path, low_memory=False)
+            stage.rows = len(df)
 
         df.iloc[:, :8] = df.iloc[:, :8].apply(pd.to_numeric, errors='raise')
-        df['Date'] = pd.to_datetime(df['Date'].str.replace('|', ' '), format='%Y-%m-%d %H:%M:%S.%f', errors='coerce')
+        with profile_stage('to_datetime', rows=len(df)):
+            df['Date'] = pd.to_datetime(df['Date'].str.replace('|', ' '), format='%Y-%m-%d %H:%M:%S.%f', errors='coerce')
         df = df.iloc[:, :9]
         return df
+
+    @staticmethod
+    def iter_chunks(file_path, chunksize=100_000):
+        """
+        Stream the file as preprocessed chunks without reading it whole.
+
+        Only the first 9 columns are read; the 8 value columns as float64.
+        """
+        columns = pd.read_csv(file_path, nrows=0).columns[:9].tolist()
+        value_cols = columns[:8]
+
+        reader = pd.read_csv(file_path, usecols=columns,
+                             dtype={col: 'float64' for col in value_cols}, chunksize=chunksize)
+        for chunk in reader:
+            chunk = chunk[columns]
+            chunk['Date'] = pd.to_datetime(chunk['Date'].str.replace('|', ' '), format='%Y-%m-%d %H:%M:%S.%f', errors='coerce')
+            yield chunk
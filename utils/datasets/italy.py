@@ -1,12 +1,38 @@
 import pandas as pd
 
+from utils.profiling import profile_stage, profiled
+
 class ItalyPreprocessing:
+    VERSION = 1  # bump when the preprocessing output changes
+
     @staticmethod
+    @profiled(rows='result')
     def load_and_preprocess(file_path):
-        df = pd.read_csv(file_path, low_memory=False, delimiter=';')
+        with profile_stage('read_csv') as stage:
+            df = pd.read_csv(file_path, low_memory=False, delimiter=';')
+            stage.rows = len(df)
     
-        df['ts_insertion'] = pd.to_datetime(df['ts_insertion'], format='%Y-%m-%d %H:%M:%S')
+        with profile_stage('to_datetime', rows=len(df)):
+            df['ts_insertion'] = pd.to_datetime(df['ts_insertion'], format='%Y-%m-%d %H:%M:%S')
         
         df = df.rename(columns={'ts_insertion': 'Date'})
         
         return df
+
+    @staticmethod
+    def iter_chunks(file_path, chunksize=100_000, usecols=None):
+        """
+        Stream the file as preprocessed chunks without reading it whole.
+
+        Numeric columns are identified from the first `chunksize` rows and read
+        as float64; other columns are kept as read.
+        """
+        sample = pd.read_csv(file_path, nrows=chunksize, delimiter=';', usecols=usecols)
+        numeric_cols = sample.drop(columns=['ts_insertion']).select_dtypes(include=['number']).columns
+
+        reader = pd.read_csv(file_path, delimiter=';', usecols=sample.columns.tolist(),
+                             dtype={col: 'float64' for col in numeric_cols}, chunksize=chunksize)
+        for chunk in reader:
+            chunk = chunk[sample.columns]
+            chunk['ts_insertion'] = pd.to_datetime(chunk['ts_insertion'], format='%Y-%m-%d %H:%M:%S')
+            yield chunk.rename(columns={'ts_insertion': 'Date'})
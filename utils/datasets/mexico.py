@@ -1,18 +1,34 @@
 # preprocessing/india_preprocessing.py
 import pandas as pd
 
+from utils.profiling import profile_stage, profiled
+
 class MexicoPreprocessing:
+    VERSION = 1  # bump when the preprocessing output changes
+
     @staticmethod
+    @profiled(rows='result')
     def load_and_preprocess(file_path):
-        df = pd.read_excel(file_path)
-        df['Date'] = pd.to_datetime(df['Date'], format='%d-%m-%Y %H:%M')
+        with profile_stage('read_excel') as stage:
+            df = pd.read_excel(file_path)
+            stage.rows = len(df)
+        with profile_stage('to_datetime', rows=len(df)):
+            df['Date'] = pd.to_datetime(df['Date'], format='%d-%m-%Y %H:%M')
 
         df = df.drop(columns=['Data number'])
-        for i in range(1, len(df) - 1):
-            # Check if current row is '23:00' and the next is '00:00' of the next day
-            if df['Date'].iloc[i].hour == 23 and df['Date'].iloc[i + 1].hour == 0 and df['Date'].iloc[i].day == df['Date'].iloc[i + 1].day:
-                # print(df.at[i, 'Date'])
-                # Adjust the '23:00' timestamp to the previous day
-                df.at[i, 'Date'] = df['Date'].iloc[i] - pd.Timedelta(days=1)
-        
+        df['Date'] = MexicoPreprocessing.correct_midnight_timestamps(df['Date'])
+
         return df
+
+    @staticmethod
+    def correct_midnight_timestamps(dates):
+        """
+        Shift mislabeled '23:00' timestamps to the previous day.
+
+        A '23:00' reading followed by '00:00' on the same calendar day was stamped
+        with the next day's date. The first row is left untouched.
+        """
+        next_dates = dates.shift(-1)
+        mislabeled = (dates.dt.hour == 23) & (next_dates.dt.hour == 0) & (dates.dt.day == next_dates.dt.day)
+        mislabeled.iloc[:1] = False
+        return dates.mask(mislabeled, dates - pd.Timedelta(days=1))
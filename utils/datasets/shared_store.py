@@ -0,0 +1,257 @@
+import atexit
+import os
+import sys
+import uuid
+from multiprocessing import resource_tracker, shared_memory
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+
+_ALIGNMENT = 64
+
+
+class SharedFrame:
+    """
+    Picklable handle to a frame published in shared memory.
+
+    Holds the shared-memory block name and the layout of the arrays in it:
+    the 'Date' column and one (columns x rows) array per numeric dtype.
+    """
+
+    def __init__(self, dataset, block_name, n_rows, columns, date, groups):
+        self.dataset = dataset
+        self.block_name = block_name
+        self.n_rows = n_rows
+        self.columns = columns  # column order of the original frame
+        self.date = date        # (offset, dtype str) or None
+        self.groups = groups    # [(offset, dtype str, column names)]
+
+    def __repr__(self):
+        return f"SharedFrame({self.dataset!r}, rows={self.n_rows}, columns={len(self.columns)})"
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _shareable(series):
+    dtype = series.dtype
+    return isinstance(dtype, np.dtype) and (dtype.kind in 'biuf' or dtype.kind == 'M')
+
+
+def _view(buffer, offset, dtype, shape):
+    """
+    Array over part of a buffer. np.frombuffer keeps the buffer exported while
+    the array lives, so the mapping cannot be closed underneath it.
+    """
+    count = int(np.prod(shape))
+    return np.frombuffer(buffer, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+
+def publish_frame(df: pd.DataFrame, dataset=None):
+    """
+    Copy the 'Date' column and the numeric columns of a frame into a new shared-memory block.
+
+    Other columns (strings, categories, nullable extension types) are not published.
+
+    Parameters:
+        df (pd.DataFrame): Frame to publish.
+        dataset (str or None): Name stored in the handle.
+
+    Returns:
+        tuple: (SharedMemory owning the block, SharedFrame handle)
+    """
+    columns = [col for col in df.columns if _shareable(df[col]) and (col == 'Date' or df[col].dtype.kind != 'M')]
+    value_columns = [col for col in columns if col != 'Date']
+    by_dtype = {}
+    for col in value_columns:
+        by_dtype.setdefault(df[col].dtype.str, []).append(col)
+
+    n_rows = len(df)
+    layout, offset = [], 0
+    date = None
+    if 'Date' in columns:
+        date = (offset, df['Date'].dtype.str)
+        offset = _aligned(offset + n_rows * df['Date'].dtype.itemsize)
+    for dtype, cols in by_dtype.items():
+        layout.append((offset, dtype, cols))
+        offset = _aligned(offset + len(cols) * n_rows * np.dtype(dtype).itemsize)
+
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1),
+                                       name=f"tsmv-{uuid.uuid4().hex[:16]}")
+    _published.add(block.name)
+    if date is not None:
+        _view(block.buf, date[0], date[1], (n_rows,))[:] = df['Date'].to_numpy()
+    for group_offset, dtype, cols in layout:
+        target = _view(block.buf, group_offset, dtype, (len(cols), n_rows))
+        for i, col in enumerate(cols):
+            target[i] = df[col].to_numpy()
+        del target
+
+    return block, SharedFrame(dataset, block.name, n_rows, columns, date, layout)
+
+
+_published = set()  # blocks created by this process; forked workers inherit the set
+
+
+def _tracker_name(block):
+    """Name under which SharedMemory registers a block with the resource tracker."""
+    return '/' + block.name
+
+
+def _attach_block(name):
+    """
+    Attach to an existing block without leaving it registered with this process's
+    resource tracker, which would otherwise unlink it when the worker exits.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no track argument
+        pass
+    block = shared_memory.SharedMemory(name=name)
+    if os.name == 'posix' and name not in _published:
+        resource_tracker.unregister(_tracker_name(block), 'shared_memory')
+    return block
+
+
+class _Mapping:
+    """
+    Array interface over an attached block that owns the SharedMemory handle.
+
+    Arrays built on it keep it as their base, so the handle (and its memory
+    map) lives exactly as long as the last array and is closed by its own
+    finalizer once nothing exports the buffer any more.
+    """
+
+    def __init__(self, block):
+        self.block = block
+        address = np.frombuffer(block.buf, dtype=np.uint8).ctypes.data  # the temporary export ends here
+        self.__array_interface__ = {'data': (address, True), 'shape': (len(block.buf),),
+                                    'typestr': '|u1', 'version': 3}
+
+
+_attached = {}  # block name -> attached frame, reused by later attaches in this process
+_attached_lock = Lock()
+
+
+def attach_frame(handle: SharedFrame) -> pd.DataFrame:
+    """
+    Read-only, zero-copy DataFrame over a published frame.
+
+    Frames are cached per process, so repeated attaches are free. Writing to
+    the returned frame raises; take a copy to modify it. The mapping lives as
+    long as the frame (or any column taken from it) does.
+    """
+    with _attached_lock:
+        if handle.block_name in _attached:
+            return _attached[handle.block_name]
+
+        mapping = np.asarray(_Mapping(_attach_block(handle.block_name)))  # read-only
+        parts = []
+        if handle.date is not None:
+            dates = _view(mapping, handle.date[0], handle.date[1], (handle.n_rows,))
+            parts.append(pd.DataFrame({'Date': dates}, copy=False))
+        for offset, dtype, cols in handle.groups:
+            values = _view(mapping, offset, dtype, (len(cols), handle.n_rows))
+            parts.append(pd.DataFrame(values.T, columns=cols, copy=False))
+        del mapping
+
+        df = pd.concat(parts, axis=1)[handle.columns] if parts else pd.DataFrame(index=range(handle.n_rows))
+        _attached[handle.block_name] = df
+        return df
+
+
+def detach_all():
+    """Drop this process's cached attachments (frames still referenced elsewhere stay valid until released)."""
+    with _attached_lock:
+        _attached.clear()
+
+
+class SharedStore:
+    """
+    Owner of the shared-memory blocks published by one process.
+
+    Blocks are unlinked by close() or at interpreter exit.
+    """
+
+    def __init__(self):
+        self._blocks = {}   # dataset -> (SharedMemory, SharedFrame)
+        self._lock = Lock()
+        atexit.register(self.close)
+
+    def publish(self, dataset, df):
+        """
+        Publish a frame under a dataset name, replacing an earlier publication of it.
+
+        Returns:
+            SharedFrame
+        """
+        block, handle = publish_frame(df, dataset)
+        with self._lock:
+            previous = self._blocks.pop(dataset, None)
+            self._blocks[dataset] = (block, handle)
+        if previous is not None:
+            self._release(previous[0])
+        return handle
+
+    def handle(self, dataset):
+        with self._lock:
+            entry = self._blocks.get(dataset)
+        return None if entry is None else entry[1]
+
+    def handles(self):
+        with self._lock:
+            return {dataset: handle for dataset, (_, handle) in self._blocks.items()}
+
+    def nbytes(self):
+        """Size in bytes of each published block."""
+        with self._lock:
+            return {dataset: block.size for dataset, (block, _) in self._blocks.items()}
+
+    def unpublish(self, dataset):
+        with self._lock:
+            entry = self._blocks.pop(dataset, None)
+        if entry is not None:
+            self._release(entry[0])
+
+    @staticmethod
+    def _release(block):
+        with _attached_lock:
+            _attached.pop(block.name, None)  # frames still referenced elsewhere keep their own mapping
+        block.close()
+        _published.discard(block.name)
+        tracked = os.name == 'posix' and sys.version_info < (3, 13)
+        if tracked:
+            # A worker sharing our resource tracker may have unregistered the block when attaching
+            resource_tracker.register(_tracker_name(block), 'shared_memory')
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            if tracked:
+                resource_tracker.unregister(_tracker_name(block), 'shared_memory')
+
+    def close(self):
+        """Unlink every published block."""
+        with self._lock:
+            blocks, self._blocks = self._blocks, {}
+        for block, _ in blocks.values():
+            self._release(block)
+
+
+class SharedDatasets:
+    """
+    Read-only view of published datasets for worker processes, with the
+    dataset_names / get_data interface of DataSingleton.
+    """
+
+    def __init__(self, handles):
+        self._handles = dict(handles)
+
+    def dataset_names(self):
+        return list(self._handles)
+
+    def get_data(self, dataset_name):
+        if dataset_name not in self._handles:
+            raise ValueError(f"Dataset {dataset_name} not found.")
+        return attach_frame(self._handles[dataset_name])
@@ -1,16 +1,24 @@
 import pandas as pd
 
+from utils.profiling import profile_stage, profiled
+
 class SwedenPreprocessing:
+    VERSION = 1  # bump when the preprocessing output changes
+
     @staticmethod
+    @profiled(rows='result')
     def load_and_preprocess(file_path):
         # Load the file
-        df = pd.read_csv(file_path, delimiter='\t')
+        with profile_stage('read_csv') as stage:
+            df = pd.read_csv(file_path, delimiter='\t')
+            stage.rows = len(df)
         
         # Rename columns from Swedish to English
         df.columns = ['Date', 'Temperature', 'Humidity', 'CO2', 'PM1', 'PM2.5', 'PM10']
         
         # Parse the Date column
-        df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d %H:%M')
+        with profile_stage('to_datetime', rows=len(df)):
+            df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d %H:%M')
         
         # Convert other columns to numeric, handling commas as decimal points
         for col in df.columns[1:]:
@@ -1,49 +1,75 @@
 import pandas as pd
 import numpy as np
-def filter_single_dataset_by_heuristics(df, features, interval='D', theta_feat=0.8, theta_joint=0.7):
+
+from utils.profiling import profiled
+
+def _interval_coverage(df, features, interval='D'):
     """
-    Apply heuristic filtering to a single dataset.
-    Returns: filtered_df, summary_df
+    Per-interval feature and pairwise joint coverage for all intervals at once.
+
+    Rows are sorted by date (stably, as pd.Grouper does) and grouped into
+    intervals; present and joint counts of every non-empty interval come from
+    np.add.reduceat over the presence mask, one feature at a time for the pairs.
+
+    Returns:
+        tuple: (df sorted and indexed by 'Date', interval position of each row,
+        DataFrame with columns interval, rows, min_feat_cov, min_joint_cov
+        for every non-empty interval)
     """
-    df = df.copy()
-    df['Date'] = pd.to_datetime(df['Date'])
+    df = df.assign(Date=pd.to_datetime(df['Date']))
     df = df[df['Date'].notna()]
     df = df.set_index('Date')
+    df = df.iloc[np.argsort(df.index.to_numpy(), kind='stable')]
 
     grouped = df.groupby(pd.Grouper(freq=interval))
-    results = []
-    metadata = []
+    codes = grouped.ngroup().to_numpy()
+    labels = grouped.size().index
 
-    for name, group in grouped:
-        if len(group) == 0:
-            continue
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=int)
+    rows = np.diff(np.r_[starts, len(codes)])
+    row_interval = np.repeat(np.arange(len(starts)), rows)
 
-        present = group[features].notna().sum()
-        expected = len(group)
-        feat_cov = (present / expected).fillna(0)
+    present = df[features].notna().to_numpy()
+    if len(starts):
+        feat_counts = np.add.reduceat(present, starts, axis=0, dtype=np.int64)
+    else:
+        feat_counts = np.zeros((0, len(features)), dtype=np.int64)
 
-        if (feat_cov < theta_feat).any():
-            continue
+    min_joint = np.full(len(starts), np.nan)
+    for i in range(len(features) - 1):
+        joint = np.add.reduceat(present[:, i:i + 1] & present[:, i + 1:], starts, axis=0, dtype=np.int64)
+        min_joint = np.fmin(min_joint, joint.min(axis=1))
 
-        binary = group[features].notna().astype(int)
-        co_matrix = (binary.T @ binary) / expected
+    table = pd.DataFrame({
+        'interval': labels[codes[starts]],
+        'rows': rows,
+        'min_feat_cov': feat_counts.min(axis=1, initial=np.iinfo(np.int64).max) / rows,
+        'min_joint_cov': min_joint / rows,
+    })
+    return df, row_interval, table
 
-        i_lower = np.tril_indices(len(features), k=-1)
-        if (co_matrix.values[i_lower] < theta_joint).any():
-            continue
+@profiled
+def filter_single_dataset_by_heuristics(df, features, interval='D', theta_feat=0.8, theta_joint=0.7):
+    """
+    Apply heuristic filtering to a single dataset.
+
+    An interval is kept when every feature and every feature pair is present in
+    at least theta_feat / theta_joint of its rows. Coverage is computed for all
+    intervals in one batch and retained rows are selected with one boolean index.
+
+    Returns: filtered_df, summary_df
+    """
+    df, row_interval, table = _interval_coverage(df, features, interval)
 
-        results.append(group)
-        metadata.append({
-            'interval': name,
-            'rows': expected,
-            'min_feat_cov': feat_cov.min(),
-            'min_joint_cov': co_matrix.values[i_lower].min()
-        })
+    keep = (table['min_feat_cov'] >= theta_feat) & ~(table['min_joint_cov'] < theta_joint)
+    if not keep.any():
+        return pd.DataFrame().reset_index(), pd.DataFrame()
 
-    filtered = pd.concat(results) if results else pd.DataFrame()
-    summary = pd.DataFrame(metadata)
+    filtered = df[keep.to_numpy()[row_interval]]
+    summary = table[keep].reset_index(drop=True)
     return filtered.reset_index(), summary
 
+@profiled
 def filter_multiple_datasets_by_heuristics(data_singleton, dataset_names, features, interval='D', theta_feat=0.8, theta_joint=0.7):
     """
     Apply heuristic filtering to multiple datasets and summarize results.
@@ -81,3 +107,53 @@ def filter_multiple_datasets_by_heuristics(data_singleton, dataset_names, featur
 
     summary_df = pd.DataFrame(summaries)
     return results, summary_df
+
+@profiled
+def sweep_heuristic_thresholds(data_singleton, dataset_names, features, theta_feats, theta_joints, intervals=('D',)):
+    """
+    Evaluate filter_multiple_datasets_by_heuristics over a grid of thresholds and intervals.
+
+    Interval coverage is computed once per dataset and interval; every
+    (theta_feat, theta_joint) pair is then scored from it with one matrix product.
+
+    Returns:
+        summary_df: one row per dataset, interval, theta_feat and theta_joint with
+        original_rows, retained_rows and percent_retained (plus error, if any)
+    """
+    theta_feats = np.asarray(theta_feats, dtype=float)
+    theta_joints = np.asarray(theta_joints, dtype=float)
+    summaries = []
+
+    for name in dataset_names:
+        df = data_singleton.get_data(name)
+        total_rows = len(df)
+
+        for interval in intervals:
+            try:
+                _, _, table = _interval_coverage(df, features, interval)
+                min_feat = table['min_feat_cov'].to_numpy()[:, None]
+                min_joint = table['min_joint_cov'].to_numpy()[:, None]
+                feat_ok = (min_feat >= theta_feats) * table['rows'].to_numpy()[:, None]
+                joint_ok = ~(min_joint < theta_joints)
+                retained = feat_ok.T @ joint_ok  # (theta_feats x theta_joints)
+                error = None
+            except Exception as e:
+                retained = np.zeros((len(theta_feats), len(theta_joints)), dtype=int)
+                error = str(e)
+
+            for i, theta_feat in enumerate(theta_feats):
+                for j, theta_joint in enumerate(theta_joints):
+                    row = {
+                        'dataset': name,
+                        'interval': interval,
+                        'theta_feat': theta_feat,
+                        'theta_joint': theta_joint,
+                        'original_rows': total_rows,
+                        'retained_rows': int(retained[i, j]),
+                        'percent_retained': 100 * retained[i, j] / total_rows if total_rows > 0 else 0
+                    }
+                    if error is not None:
+                        row['error'] = error
+                    summaries.append(row)
+
+    return pd.DataFrame(summaries)
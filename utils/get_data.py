@@ -1,48 +1,38 @@
+import os
+
 from utils.datasets.data_singleton import DataSingleton
+from utils.registry import DatasetRegistry
 
-def get_cali():
-    cali_path = '/home/lvu/playground/data/California-homes/IAQ_Monitoring/'
-    import glob, os
-    file_paths = glob.glob(os.path.join(cali_path, '*.csv'))
-    return {f'Calihome{index}': file_path for index, file_path in enumerate(file_paths)}
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ts-missingness-visuals')
+DEFAULT_REGISTRY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datasets', 'datasets.toml')
 
-def get_cali2():
-    cali_path = '/home/lvu/playground/data/California-apt/IAQ_Activity_Monitoring/'
-    import glob, os
-    file_paths = glob.glob(os.path.join(cali_path, '*.csv'))
-    return {f'Caliapt{index}': file_path for index, file_path in enumerate(file_paths)}
+def get_registry(registry_path=DEFAULT_REGISTRY, data_root=None):
+    """
+    Dataset registry describing where every dataset lives and how to load it.
+    :param registry_path: TOML, JSON or YAML registry file.
+    :param data_root: Directory the registry's relative paths are resolved against
+        (default: the TS_MISSINGNESS_DATA_ROOT environment variable).
+    :return: DatasetRegistry instance.
+    """
+    return DatasetRegistry.from_file(registry_path, data_root=data_root)
 
-def get_sweden():
-    return {
-        'Sweden Bedroom': '/home/lvu/playground/data/Sweden/IAQbedroom.txt',
-        'Sweden Livingroom': '/home/lvu/playground/data/Sweden/IAQlivingroom.txt',
-    }
+def get_data_dict(registry_path=DEFAULT_REGISTRY, data_root=None):
+    """
+    Dataset names mapped to their source files.
+    """
+    return get_registry(registry_path, data_root).data_dict()
 
-def get_italy():
-    return {
-        'Italy1': '/home/lvu/playground/data/Italy-airport/gold.csv',
-        'Italy2': '/home/lvu/playground/data/Italy-airport/silver.csv',
-        'Italy3': '/home/lvu/playground/data/Italy-airport/brown.csv',
-    }
-    
-def get_data():
+def get_data(cache_dir=DEFAULT_CACHE_DIR, registry_path=DEFAULT_REGISTRY, data_root=None):
     """
     Get the data singleton containing all datasets.
+    :param cache_dir: Directory for the preprocessed-dataset cache (None disables it).
+    :param registry_path: TOML, JSON or YAML registry file listing the datasets.
+    :param data_root: Directory the registry's relative paths are resolved against
+        (default: the TS_MISSINGNESS_DATA_ROOT environment variable).
     :return: DataSingleton instance with all datasets loaded.
     """
-    data_dict = {
-        # 'Sweden': '/home/lvu/playground/data/Sweden/IAQbedroom.txt',
-        'India': '/home/lvu/playground/data/india.csv',
-        'Mexico': '/home/lvu/playground/data/Mexico/per-hour.xlsx'
-    }
-    cali_data = get_cali()
-    caliapt_data = get_cali2()
-    sweden_data = get_sweden()
-    italy_data = get_italy()
-
-    data_dict = {**data_dict, **sweden_data, **cali_data, **caliapt_data, **italy_data}
-
-    data_singleton = DataSingleton(data_dict)
+    registry = get_registry(registry_path, data_root)
+    data_singleton = DataSingleton(registry.data_dict(), cache_dir=cache_dir, loaders=registry.loaders())
     return data_singleton
 
 if __name__ == "__main__":
@@ -1,30 +1,91 @@
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
-def resample_time_series(df, freq='D', agg='mean'):
+from utils.co_coverage import bin_edges, compute_partial_co_coverage_vector
+from utils.profiling import propagate
+
+AGGREGATIONS = ('mean', 'sum', 'count', 'min', 'max', 'std', 'median', 'coverage')
+
+def _quantile_level(name):
+    """Quantile for names like 'q90' or 'q99.5', or None if the name is not a quantile."""
+    if isinstance(name, str) and name.startswith('q'):
+        try:
+            level = float(name[1:]) / 100
+        except ValueError:
+            return None
+        return level if 0 <= level <= 1 else None
+    return None
+
+def resample_time_series(df, freq='D', agg='mean', expected_points=None):
     """
     Resample a time series DataFrame to a specified frequency.
 
+    The rows are grouped into bins once and every aggregation reuses that
+    grouping. Counts and sums are reduced once and shared by 'sum', 'count',
+    'coverage' and, when requested together with them, 'mean'. 'min', 'max',
+    'std' and quantiles are one grouped reduction each.
+
     Parameters:
         df (pd.DataFrame): Must include a 'Date' column in datetime format.
-        freq (str): Resample frequency string (e.g., 'D', 'H', 'M', 'W').
-        agg (str): Aggregation method: 'mean', 'sum', etc.
+        freq (str): Resample frequency string (e.g., 'D', 'h', 'ME', 'W').
+        agg (str or list): Aggregation method, or a list of them: 'mean', 'sum', 'count',
+            'min', 'max', 'std', 'median', quantiles such as 'q90', or 'coverage'
+            (% of non-null values per bin).
+        expected_points (int, pd.Series or None): Expected samples per bin (see
+            get_expected_points_per_interval); coverage is then count / expected_points
+            instead of count / rows in the bin.
 
     Returns:
-        pd.DataFrame: Resampled DataFrame with 'Date' column.
+        pd.DataFrame: Resampled DataFrame with 'Date' column. With a list of
+        aggregations the columns are a (feature, aggregation) MultiIndex.
     """
     if 'Date' not in df.columns:
         raise ValueError("DataFrame must include a 'Date' column.")
-    
-    df = df.copy()
-    df = df.set_index('Date')
-    
-    if agg == 'mean':
-        df_resampled = df.resample(freq).mean()
-    elif agg == 'sum':
-        df_resampled = df.resample(freq).sum()
+
+    aggs = [agg] if isinstance(agg, str) else list(agg)
+    for name in aggs:
+        if name not in AGGREGATIONS and _quantile_level(name) is None:
+            raise ValueError(f"Unsupported aggregation: {name}")
+
+    columns = list(df.columns.drop('Date'))
+    grouped = df.groupby(pd.Grouper(key='Date', freq=freq))[columns]
+    reductions = {}
+
+    def shared(name):
+        """Grouped reduction, computed at most once."""
+        if name not in reductions:
+            reductions[name] = getattr(grouped, name)()
+        return reductions[name]
+
+    # Derive the mean from sums and counts when those are reduced anyway (numeric columns only,
+    # keeping float32 columns float32 as pandas' mean does)
+    derive_mean = {'sum', 'count', 'coverage'} & set(aggs) and all(
+        isinstance(df[col].dtype, np.dtype) and df[col].dtype.kind in 'iuf' for col in columns)
+
+    results = {}
+    for name in aggs:
+        if name == 'coverage':
+            expected = grouped.size().replace(0, np.nan) if expected_points is None else expected_points
+            results[name] = shared('count').div(expected, axis=0) * 100
+        elif name == 'mean' and derive_mean:
+            results[name] = (shared('sum') / shared('count')).astype(
+                {col: df[col].dtype for col in columns if df[col].dtype.kind == 'f'})
+        elif _quantile_level(name) is not None:
+            results[name] = grouped.quantile(_quantile_level(name))
+        else:
+            results[name] = shared(name)
+
+    if isinstance(agg, str):
+        df_resampled = results[agg]
     else:
-        raise ValueError(f"Unsupported aggregation: {agg}")
-    
+        df_resampled = pd.concat({name: results[name] for name in aggs}, axis=1)
+        df_resampled = df_resampled.swaplevel(axis=1).reindex(
+            columns=pd.MultiIndex.from_product([columns, aggs]))
+
     df_resampled = df_resampled.reset_index()
     return df_resampled
 
@@ -64,30 +125,104 @@ def get_expected_points_per_interval(original_df, target_freq='D'):
     expected = int(interval_length / median_delta)
     return expected
 
-from utils.co_coverage import compute_partial_co_coverage_vector
-import pandas as pd
+def _timed_co_coverage_vector(df, feature_pool, edges):
+    """Worker for gather_cross_dataset_co_coverage: (vector, seconds)."""
+    start = time.perf_counter()
+    vec = compute_partial_co_coverage_vector(df, feature_pool, edges)
+    return vec, time.perf_counter() - start
+
+def _shared_co_coverage_vector(handle, feature_pool, edges):
+    """Process-pool worker: attach the shared frame instead of receiving a pickled copy."""
+    from utils.datasets.shared_store import attach_frame
+    return _timed_co_coverage_vector(attach_frame(handle), feature_pool, edges)
 
-def gather_cross_dataset_co_coverage(data_singleton, dataset_names, start_date, end_date, feature_pool):
+def gather_cross_dataset_co_coverage(data_singleton, dataset_names, start_date, end_date, feature_pool,
+                                     executor='threads', max_workers=None, return_report=False):
     """
     Collect partial co-coverage vectors (zero-padded) for selected datasets.
 
+    Bin edges are computed once and shared by all datasets, which are processed
+    concurrently. With the 'processes' executor and a DataSingleton, frames are
+    published to shared memory (DataSingleton.share) and workers attach to
+    them instead of receiving pickled copies; blocks published for the call are
+    released when it returns.
+
+    Parameters:
+        executor (str): 'threads', 'processes' or 'serial'.
+        max_workers (int or None): Pool size.
+        return_report (bool): Also return a per-dataset report.
+
     Returns:
         vectors (list of list of float)
         successful_names (list of str)
+        report (pd.DataFrame, only if return_report): dataset, status ('ok', 'skipped'
+            when too few features are available, or 'error'), seconds, error_type, error.
+            Without it, failures are emitted as warnings.
     """
-    daily_bins = pd.date_range(start=start_date, end=end_date, freq='D')
+    if executor not in ('threads', 'processes', 'serial'):
+        raise ValueError(f"Unsupported executor: {executor}")
+
+    edges = bin_edges(pd.date_range(start=start_date, end=end_date, freq='D'))
+
+    shared = executor == 'processes' and hasattr(data_singleton, 'share')
+    already_shared = set(data_singleton.shared_datasets()) if shared else set()
+
+    def run(submit):
+        futures = {}
+        for name in dataset_names:
+            try:
+                if shared:
+                    handle = data_singleton.share([name])[name]
+                    futures[name] = submit(_shared_co_coverage_vector, handle, feature_pool, edges)
+                else:
+                    futures[name] = submit(_timed_co_coverage_vector, data_singleton.get_data(name), feature_pool, edges)
+            except Exception as e:
+                futures[name] = e
+        return futures
+
+    if executor == 'serial':
+        def submit(fn, *args):
+            return fn(*args)
+        outcomes = run(submit)
+    else:
+        pool_class = ProcessPoolExecutor if executor == 'processes' else ThreadPoolExecutor
+        try:
+            with pool_class(max_workers=max_workers) as pool:
+                if executor == 'processes':
+                    futures = run(pool.submit)
+                else:
+                    futures = run(lambda fn, *args: pool.submit(propagate(fn), *args))
+                outcomes = {}
+                for name, future in futures.items():
+                    try:
+                        outcomes[name] = future if isinstance(future, Exception) else future.result()
+                    except Exception as e:
+                        outcomes[name] = e
+        finally:
+            if shared:
+                data_singleton.unshare([name for name in dataset_names if name not in already_shared])
+
     vectors = []
     names = []
-
+    records = []
     for name in dataset_names:
-        try:
-            df = data_singleton.get_data(name)
-            vec = compute_partial_co_coverage_vector(df, feature_pool, daily_bins)
-            if vec is not None:
-                vectors.append(vec)
-                names.append(name)
-        except Exception as e:
-            print(f"Skipping {name}: {e}")
+        outcome = outcomes[name]
+        if isinstance(outcome, Exception):
+            records.append({'dataset': name, 'status': 'error', 'seconds': None,
+                            'error_type': type(outcome).__name__, 'error': str(outcome)})
+            if not return_report:
+                warnings.warn(f"Skipping {name}: {outcome}")
+            continue
+
+        vec, seconds = outcome
+        records.append({'dataset': name, 'status': 'ok' if vec is not None else 'skipped', 'seconds': seconds,
+                        'error_type': None, 'error': None})
+        if vec is not None:
+            vectors.append(vec)
+            names.append(name)
+
+    if return_report:
+        return vectors, names, pd.DataFrame(records, columns=['dataset', 'status', 'seconds', 'error_type', 'error'])
     return vectors, names
 
 if __name__ == "__main__":
@@ -0,0 +1,196 @@
+import pandas as pd
+import numpy as np
+
+from utils.bitmaps import pack_presence, bitmap_counts, bitmap_co_counts
+from utils.missingness import build_gap_index
+from utils.summary import bin_statistics
+
+
+class IncrementalCoverageStats:
+    """
+    Append-only coverage statistics for a growing sensor feed.
+
+    Each update() folds a batch of new rows into running counts (per-feature
+    presence, pairwise co-occurrence, per-period counts, records per finer bin
+    and gap runs, including the gap still open at the end of the feed), so
+    the cost of a refresh is proportional to the batch, not the history.
+    Queries return the same results as the batch functions on all rows seen.
+
+    Batches must arrive in 'Date' order. The numeric columns are fixed by the
+    first non-empty batch; periods and finer bins should be calendar-anchored
+    ('h', 'D', 'W', 'ME', or a divisor of a day).
+    """
+
+    def __init__(self, freq='D', finer_resolution='h'):
+        self.freq = freq
+        self.finer_resolution = finer_resolution
+        self.features = None
+        self.total_rows = 0
+        self.dated_rows = 0
+        self.missing_cells = 0
+        self.first_date = None
+        self.last_date = None
+        self._present = None
+        self._co_counts = None
+        self._period_counts = None
+        self._period_sizes = None
+        self._finer_counts = None
+        self._num_gaps = None
+        self._gap_total = None
+        self._gap_max = None
+        self._open_gap = None
+
+    def _init_features(self, batch):
+        self.features = batch.select_dtypes(include='number').columns.drop('Date', errors='ignore')
+        n_features = len(self.features)
+        self._present = np.zeros(n_features, dtype=np.int64)
+        self._co_counts = np.zeros((n_features, n_features), dtype=np.int64)
+        self._num_gaps = np.zeros(n_features, dtype=np.int64)
+        self._gap_total = np.zeros(n_features, dtype=np.int64)
+        self._gap_max = np.zeros(n_features, dtype=np.int64)
+        self._open_gap = np.zeros(n_features, dtype=np.int64)
+
+    def update(self, batch: pd.DataFrame):
+        """
+        Fold a batch of new rows into the statistics.
+
+        Parameters:
+            batch (pd.DataFrame): New rows with a 'Date' column, later than all previous rows.
+
+        Returns:
+            IncrementalCoverageStats: self, for chaining.
+        """
+        if 'Date' not in batch.columns:
+            raise ValueError("DataFrame must include a 'Date' column.")
+        if len(batch) == 0:
+            return self
+        if self.features is None:
+            self._init_features(batch)
+
+        missing = self.features.difference(batch.columns)
+        if len(missing):
+            batch = batch.reindex(columns=[*batch.columns, *missing])
+        self.total_rows += len(batch)
+
+        bits = pack_presence(batch, self.features)
+        self._present += bitmap_counts(bits)
+        self._co_counts += bitmap_co_counts(bits)
+
+        self._update_periods(batch)
+        self._update_dated(batch)
+        self._update_gaps(batch)
+        return self
+
+    @staticmethod
+    def _add(total, part):
+        return part if total is None else total.add(part, fill_value=0)
+
+    def _update_periods(self, batch):
+        grouped = batch.set_index('Date')[self.features].groupby(pd.Grouper(freq=self.freq))
+        self._period_counts = self._add(self._period_counts, grouped.count())
+        self._period_sizes = self._add(self._period_sizes, grouped.size())
+
+    def _update_dated(self, batch):
+        dated = batch.assign(Date=pd.to_datetime(batch['Date'], errors='coerce')).dropna(subset=['Date'])
+        if len(dated) == 0:
+            return
+        dated = dated.set_index('Date')
+        self.dated_rows += len(dated)
+        self.missing_cells += int(dated.isnull().sum().sum())
+        first, last = dated.index.min(), dated.index.max()
+        self.first_date = first if self.first_date is None else min(self.first_date, first)
+        self.last_date = last if self.last_date is None else max(self.last_date, last)
+        self._finer_counts = self._add(self._finer_counts, dated.resample(self.finer_resolution).size())
+
+    def _update_gaps(self, batch):
+        gap_index = build_gap_index(batch[['Date', *self.features]])
+        for f, feature in enumerate(self.features):
+            starts = gap_index.gap_starts(feature)
+            lengths = gap_index.gap_lengths(feature).astype(np.int64)
+            reaches_end = len(starts) > 0 and starts[-1] + lengths[-1] == len(batch)
+
+            # Join the gap left open by the previous batch
+            if self._open_gap[f] and len(starts) and starts[0] == 0:
+                lengths[0] += self._open_gap[f]
+            elif self._open_gap[f]:
+                lengths = np.concatenate([[self._open_gap[f]], lengths])
+
+            self._open_gap[f] = 0
+            if reaches_end:
+                self._open_gap[f], lengths = lengths[-1], lengths[:-1]
+
+            self._num_gaps[f] += len(lengths)
+            self._gap_total[f] += lengths.sum()
+            self._gap_max[f] = max(self._gap_max[f], lengths.max(initial=0))
+
+    def feature_coverage(self) -> pd.Series:
+        """
+        Same as missingness.compute_feature_coverage on all rows seen.
+
+        Returns:
+            Series with feature names and % of available data.
+        """
+        return pd.Series(self._present, index=self.features) / self.total_rows * 100
+
+    def co_coverage_matrix(self, selected_columns=None) -> pd.DataFrame:
+        """
+        Same as co_coverage.compute_co_coverage_matrix on all rows seen.
+
+        Returns:
+            pd.DataFrame: Symmetric matrix of co-coverage percentages (0-100).
+        """
+        co_counts = pd.DataFrame(self._co_counts, index=self.features, columns=self.features)
+        if selected_columns:
+            cols = pd.Index([col for col in selected_columns if col in self.features])
+            co_counts = co_counts.loc[cols, cols]
+        return co_counts / self.total_rows * 100
+
+    def periodic_coverage(self) -> pd.DataFrame:
+        """
+        Same as missingness.compute_periodic_coverage(freq=self.freq) on all rows seen.
+
+        Returns:
+            DataFrame: rows = periods, columns = features, values = % coverage
+        """
+        # Fill in periods that fall between batches
+        counts = self._period_counts.resample(self.freq).sum()
+        total_per_period = self._period_sizes.resample(self.freq).sum().replace(0, np.nan)
+        return counts.div(total_per_period, axis=0) * 100
+
+    def gap_stats(self) -> pd.DataFrame:
+        """
+        Same as missingness.compute_gap_stats on all rows seen; the trailing gap counts as closed.
+
+        Returns:
+            DataFrame with columns: feature, num_gaps, mean_gap, max_gap
+        """
+        stats = []
+        for f, feature in enumerate(self.features):
+            num = self._num_gaps[f] + (self._open_gap[f] > 0)
+            if num > 0:
+                stats.append({
+                    'feature': feature,
+                    'num_gaps': int(num),
+                    'mean_gap': (self._gap_total[f] + self._open_gap[f]) / num,
+                    'max_gap': max(self._gap_max[f], self._open_gap[f])
+                })
+            else:
+                stats.append({
+                    'feature': feature,
+                    'num_gaps': 0,
+                    'mean_gap': 0,
+                    'max_gap': 0
+                })
+        return pd.DataFrame(stats)
+
+    def comprehensive_statistics(self, resolution='D', threshold=0.8) -> dict:
+        """
+        Per-dataset metrics of summary.calculate_comprehensive_statistics on all rows seen.
+
+        Returns:
+            dict: Metric name to value.
+        """
+        finer_counts = self._finer_counts.resample(self.finer_resolution).sum()
+        time_span = (self.last_date - self.first_date).days
+        stats, _ = bin_statistics(finer_counts, self.dated_rows, self.missing_cells, time_span, resolution, threshold)
+        return stats
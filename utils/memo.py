@@ -0,0 +1,206 @@
+import copy
+import functools
+import glob
+import hashlib
+import inspect
+import os
+import pickle
+import weakref
+from collections import OrderedDict
+from threading import RLock
+
+import numpy as np
+import pandas as pd
+
+
+class ResultCache:
+    """
+    Cache of analysis results keyed on (dataset, version, function, parameters).
+
+    Entries live in an in-memory LRU and, when disk_dir is set, also as pickle
+    files that survive the process. Dataset versions come from DataSingleton
+    (see register_dataset), so entries from an older version of a dataset
+    never hit and are dropped when the dataset is reloaded with new content.
+    """
+
+    def __init__(self, max_entries=128, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = None
+        self.enabled = True
+        self._entries = OrderedDict()  # least recently used first
+        self._lock = RLock()
+        self.set_disk_dir(disk_dir)
+
+    def set_disk_dir(self, disk_dir):
+        self.disk_dir = os.path.abspath(os.path.expanduser(disk_dir)) if disk_dir else None
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def _digest(text):
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _disk_path(self, key):
+        (name, _), _, _ = key
+        return os.path.join(self.disk_dir, f"{self._digest(name)[:16]}-{self._digest(repr(key))}.pkl")
+
+    def get(self, key):
+        """
+        Look a key up in memory, then on disk.
+
+        Returns:
+            tuple: (hit, value)
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return True, self._entries[key]
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                return False, None
+            self._remember(key, value)
+            return True, value
+        return False, None
+
+    def put(self, key, value):
+        """
+        Store a result in memory and, if configured, on disk.
+        """
+        self._remember(key, value)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, path)
+            except (OSError, pickle.PicklingError, TypeError, AttributeError):
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, dataset_name=None):
+        """
+        Drop cached results for one dataset, or for all datasets if no name is given.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if dataset_name is None or key[0][0] == dataset_name:
+                    del self._entries[key]
+
+        if self.disk_dir:
+            prefix = '' if dataset_name is None else f"{self._digest(dataset_name)[:16]}-"
+            for path in glob.glob(os.path.join(self.disk_dir, f"{prefix}*.pkl")):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Drop every cached result."""
+        self.invalidate()
+
+
+result_cache = ResultCache()
+
+_datasets = {}  # id(frame) -> (weakref to frame, (name, version))
+_versions = {}  # name -> latest registered version
+_registry_lock = RLock()
+
+
+def configure_result_cache(max_entries=None, disk_dir=None, enabled=None):
+    """
+    Adjust the shared result cache.
+
+    Parameters:
+        max_entries (int or None): In-memory LRU capacity.
+        disk_dir (str or None): Directory for the on-disk tier ('' disables it).
+        enabled (bool or None): Turn memoization on or off.
+    """
+    if max_entries is not None:
+        result_cache.max_entries = max_entries
+    if disk_dir is not None:
+        result_cache.set_disk_dir(disk_dir)
+    if enabled is not None:
+        result_cache.enabled = enabled
+
+
+def register_dataset(df, name, version):
+    """
+    Identify a loaded frame so that results computed on it can be cached.
+
+    Registering a new version for a name invalidates the cached results of
+    the previous version.
+    """
+    with _registry_lock:
+        previous = _versions.get(name)
+        _versions[name] = version
+        key = id(df)
+        _datasets[key] = (weakref.ref(df, lambda _, key=key: _datasets.pop(key, None)), (name, version))
+    if previous is not None and previous != version:
+        result_cache.invalidate(name)
+
+
+def dataset_token(df):
+    """
+    (name, version) of a registered frame, or None for any other object.
+    """
+    entry = _datasets.get(id(df))
+    if entry is None or entry[0]() is not df:
+        return None
+    return entry[1]
+
+
+def _copy_result(value):
+    """Hand out copies so callers cannot modify cached results."""
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.copy()
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, (int, float, str, type(None))):
+        return value
+    return copy.deepcopy(value)
+
+
+def memoize(func):
+    """
+    Cache the results of func(df, ...) for frames registered with register_dataset.
+
+    Calls on unregistered frames, or with arguments that cannot be pickled,
+    are passed straight through.
+    """
+    signature = inspect.signature(func)
+    qualname = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(df, *args, **kwargs):
+        token = dataset_token(df)
+        if token is None or not result_cache.enabled:
+            return func(df, *args, **kwargs)
+
+        bound = signature.bind(df, *args, **kwargs)
+        bound.apply_defaults()
+        try:
+            params = hashlib.sha256(pickle.dumps(list(bound.arguments.items())[1:])).hexdigest()
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return func(df, *args, **kwargs)
+
+        key = (token, qualname, params)
+        hit, value = result_cache.get(key)
+        if not hit:
+            value = func(df, *args, **kwargs)
+            result_cache.put(key, value)
+        return _copy_result(value)
+
+    return wrapper
@@ -1,42 +1,203 @@
 import pandas as pd
 import numpy as np
 
-def compute_gap_stats(df: pd.DataFrame) -> pd.DataFrame:
+from utils.bitmaps import pack_presence, bitmap_counts
+from utils.memo import memoize
+from utils.profiling import profiled
+
+class GapIndex:
     """
-    Compute missing gap statistics for each numeric feature.
+    Run-length index of missing-value gaps for a set of features.
+
+    Gaps are stored as flat arrays grouped by feature (CSR style): the row
+    position where each gap starts, its length in rows, and the timestamps
+    bounding it. Once built, every query runs on these arrays only.
+    """
+
+    def __init__(self, features, offsets, starts, lengths, start_times, end_times):
+        self.features = list(features)
+        self.offsets = offsets
+        self.starts = starts
+        self.lengths = lengths
+        self.start_times = start_times
+        self.end_times = end_times
+        self._positions = {feature: i for i, feature in enumerate(self.features)}
+
+    def _slice(self, feature) -> slice:
+        i = self._positions[feature]
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    def gap_starts(self, feature) -> np.ndarray:
+        """Row positions where the gaps of a feature start."""
+        return self.starts[self._slice(feature)]
+
+    def gap_lengths(self, feature) -> np.ndarray:
+        """Gap lengths of a feature, in rows."""
+        return self.lengths[self._slice(feature)]
+
+    def gap_start_times(self, feature) -> pd.DatetimeIndex:
+        """Timestamps of the first missing row of each gap of a feature."""
+        return pd.DatetimeIndex(self.start_times[self._slice(feature)])
+
+    def gap_durations(self, feature) -> pd.TimedeltaIndex:
+        """
+        Time-weighted gap durations of a feature: from the first missing row to
+        the next observed row (or to the last timestamp for a trailing gap).
+        """
+        sl = self._slice(feature)
+        return pd.TimedeltaIndex(self.end_times[sl] - self.start_times[sl])
+
+    def histogram(self, feature, bins=10):
+        """
+        Histogram of gap lengths (in rows) for a feature.
+
+        Returns:
+            tuple: (counts, bin_edges) as returned by np.histogram.
+        """
+        return np.histogram(self.gap_lengths(feature), bins=bins)
+
+    def percentiles(self, q=(50, 90, 99)) -> pd.DataFrame:
+        """
+        Gap-length percentiles per feature.
+
+        Returns:
+            DataFrame: rows = features, columns = q, values = gap length in rows
+            (NaN for features without gaps).
+        """
+        q = list(q)
+        values = [
+            np.percentile(self.gap_lengths(f), q) if self.offsets[i + 1] > self.offsets[i] else np.full(len(q), np.nan)
+            for i, f in enumerate(self.features)
+        ]
+        return pd.DataFrame(values, index=self.features, columns=q)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        All gaps as a table.
+
+        Returns:
+            DataFrame with columns: feature, start, length, start_time, end_time, duration
+        """
+        counts = np.diff(self.offsets)
+        return pd.DataFrame({
+            'feature': np.repeat(np.array(self.features, dtype=object), counts),
+            'start': self.starts,
+            'length': self.lengths,
+            'start_time': self.start_times,
+            'end_time': self.end_times,
+            'duration': self.end_times - self.start_times,
+        })
+
+    def query(self, features=None, min_length=None, max_length=None,
+              min_duration=None, start=None, end=None) -> pd.DataFrame:
+        """
+        Select gaps by feature, length, duration and time window.
+
+        Parameters:
+            features (list or None): Restrict to these features.
+            min_length, max_length (int or None): Bounds on the gap length in rows.
+            min_duration (str or pd.Timedelta or None): e.g. '6h'.
+            start, end (str or pd.Timestamp or None): Keep gaps overlapping [start, end).
+
+        Returns:
+            DataFrame: Same columns as to_frame().
+        """
+        gaps = self.to_frame()
+        keep = np.ones(len(gaps), dtype=bool)
+        if features is not None:
+            keep &= gaps['feature'].isin(features).to_numpy()
+        if min_length is not None:
+            keep &= gaps['length'].to_numpy() >= min_length
+        if max_length is not None:
+            keep &= gaps['length'].to_numpy() <= max_length
+        if min_duration is not None:
+            keep &= (gaps['duration'] >= pd.Timedelta(min_duration)).to_numpy()
+        if start is not None:
+            keep &= (gaps['end_time'] > pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            keep &= (gaps['start_time'] < pd.Timestamp(end)).to_numpy()
+        return gaps[keep].reset_index(drop=True)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Per-feature gap statistics.
+
+        Returns:
+            DataFrame with columns: feature, num_gaps, mean_gap, max_gap
+        """
+        stats = []
+        for feature in self.features:
+            gap_lengths = self.gap_lengths(feature).astype(np.int64)
+            if len(gap_lengths) > 0:
+                stats.append({
+                    'feature': feature,
+                    'num_gaps': len(gap_lengths),
+                    'mean_gap': np.mean(gap_lengths),
+                    'max_gap': np.max(gap_lengths)
+                })
+            else:
+                stats.append({
+                    'feature': feature,
+                    'num_gaps': 0,
+                    'mean_gap': 0,
+                    'max_gap': 0
+                })
+        return pd.DataFrame(stats)
+
+
+@profiled
+@memoize
+def build_gap_index(df: pd.DataFrame) -> GapIndex:
+    """
+    Build a GapIndex for every numeric feature in a single pass over the NaN mask.
+
+    Run boundaries for all columns are found at once with np.diff on the
+    zero-padded (features x time) mask: +1 marks a gap start, -1 a gap end.
+
+    Parameters:
+        df (pd.DataFrame): Must include a 'Date' column. Rows are ordered by 'Date'.
 
     Returns:
-        DataFrame with columns: feature, num_gaps, mean_gap, max_gap
+        GapIndex
     """
     if 'Date' not in df.columns:
         raise ValueError("DataFrame must include a 'Date' column.")
 
-    df = df.copy().sort_values('Date')
-    stats = []
-
-    for col in df.select_dtypes(include='number').columns:
-        is_na = df[col].isna()
-        gaps = (is_na != is_na.shift()).cumsum()[is_na]  # group consecutive NaNs
-        gap_lengths = gaps.value_counts().values
-
-        if len(gap_lengths) > 0:
-            stats.append({
-                'feature': col,
-                'num_gaps': len(gap_lengths),
-                'mean_gap': np.mean(gap_lengths),
-                'max_gap': np.max(gap_lengths)
-            })
-        else:
-            stats.append({
-                'feature': col,
-                'num_gaps': 0,
-                'mean_gap': 0,
-                'max_gap': 0
-            })
+    df = df.sort_values('Date')
+    numeric_cols = df.select_dtypes(include='number').columns
+    n_rows = len(df)
+
+    padded = np.zeros((len(numeric_cols), n_rows + 2), dtype=np.int8)
+    padded[:, 1:-1] = df[numeric_cols].isna().to_numpy().T
+    edges = np.diff(padded, axis=1)
+
+    cols, starts = np.nonzero(edges == 1)
+    ends = np.nonzero(edges == -1)[1]
+    offsets = np.searchsorted(cols, np.arange(len(numeric_cols) + 1))
+
+    dtype = np.int32 if n_rows < np.iinfo(np.int32).max else np.int64
+    dates = np.asarray(df['Date'], dtype='datetime64[ns]')
+    start_times = dates[starts]
+    end_times = dates[np.minimum(ends, n_rows - 1)]
 
-    return pd.DataFrame(stats)
+    return GapIndex(numeric_cols, offsets, starts.astype(dtype), (ends - starts).astype(dtype),
+                    start_times, end_times)
 
 
+@profiled
+@memoize
+def compute_gap_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute missing gap statistics for each numeric feature.
+
+    Returns:
+        DataFrame with columns: feature, num_gaps, mean_gap, max_gap
+    """
+    return build_gap_index(df).summary()
+
+
+@profiled
+@memoize
 def compute_feature_coverage(df: pd.DataFrame) -> pd.Series:
     """
     Compute the percentage of non-missing values for each numeric column.
@@ -46,9 +207,12 @@ def compute_feature_coverage(df: pd.DataFrame) -> pd.Series:
     """
     numeric_cols = df.select_dtypes(include='number').columns
     total = len(df)
-    return df[numeric_cols].notna().sum() / total * 100
+    present = pd.Series(bitmap_counts(pack_presence(df, numeric_cols)), index=numeric_cols)
+    return present / total * 100
 
 
+@profiled
+@memoize
 def compute_periodic_coverage(df: pd.DataFrame, freq='D') -> pd.DataFrame:
     """
     Compute per-period (e.g., per day) coverage for each feature.
@@ -68,28 +232,315 @@ def compute_periodic_coverage(df: pd.DataFrame, freq='D') -> pd.DataFrame:
 
     return counts.div(total_per_period, axis=0) * 100
 
+# Finer resolution at which presence is counted for each heatmap bin size
+TIME_RANGE_TO_RATE = {'D': 'h', 'W': 'h', 'M': 'D', 'H': 'min', 'min': 's'}
+BIN_FREQUENCIES = {'M': 'MS', 'H': 'h'}
+
+@profiled
+@memoize
+def compute_temporal_coverage_matrix(df: pd.DataFrame, sample_rate='D', selected_columns=None):
+    """
+    Percentage of finer intervals with data, per feature and broader time bin.
+
+    A finer interval (see TIME_RANGE_TO_RATE) counts as covered for a feature
+    if it holds at least one observation. Bins are half-open and start at the
+    first finer interval; the expected number of finer intervals comes from
+    each bin's actual width, so months of different lengths are handled.
+
+    Parameters:
+        df (pd.DataFrame): Must include a 'Date' column and numeric columns.
+        sample_rate (str): Target bin size ('D', 'W', 'M', 'H' or 'min').
+        selected_columns (list or None): Optional subset of columns.
+
+    Returns:
+        tuple: (np.ndarray of shape (features, bins) with % coverage,
+        pd.DatetimeIndex of bin edges (bins + 1), list of feature names)
+    """
+    if 'Date' not in df.columns:
+        raise ValueError("DataFrame must include a 'Date' column.")
+
+    if sample_rate not in TIME_RANGE_TO_RATE:
+        raise ValueError(f"Unsupported sample_rate: {sample_rate}")
+
+    finer_rate = TIME_RANGE_TO_RATE[sample_rate]
+    if not selected_columns:
+        selected_columns = list(df.select_dtypes(include='number').columns.drop('Date', errors='ignore'))
+
+    indexed = df[['Date', *selected_columns]].assign(Date=pd.to_datetime(df['Date'])).set_index('Date')
+    finer = indexed.resample(finer_rate).count() > 0
+
+    if finer.empty:
+        raise ValueError("No data after finer resampling")
+
+    edges = pd.date_range(start=finer.index[0], end=finer.index[-1],
+                          freq=BIN_FREQUENCIES.get(sample_rate, sample_rate))
+
+    if len(edges) < 2:
+        raise ValueError("Not enough intervals to compute heatmap")
+
+    # Covered finer intervals per bin from differences of a running count
+    positions = finer.index.searchsorted(edges, side='left')
+    running = np.zeros((len(finer) + 1, len(selected_columns)), dtype=np.int64)
+    np.cumsum(finer.to_numpy(), axis=0, out=running[1:])
+    counts = running[positions[1:]] - running[positions[:-1]]
+
+    widths = np.diff(edges.to_numpy()) / pd.Timedelta(1, unit=finer_rate)
+    max_points = np.maximum(widths, 1)
+    matrix = (counts / max_points[:, None] * 100).T
+    return matrix, edges, list(selected_columns)
+
+def fixed_step(freq, tz=None):
+    """
+    Length of a frequency with a fixed step, as a Timedelta.
+
+    Sub-daily frequencies (e.g. '5min', 'h') and multiples of 'D' on tz-naive
+    data have a fixed step; calendar frequencies ('W', 'ME', 'MS', ...) and
+    days in a timezone with DST do not.
+
+    Parameters:
+        freq (str, pd.DateOffset or pd.Timedelta): Frequency.
+        tz (tzinfo or None): Timezone of the data.
+
+    Returns:
+        pd.Timedelta or None: The step, or None if the frequency has no fixed length.
+    """
+    offset = pd.tseries.frequencies.to_offset(freq)
+    if isinstance(offset, pd.offsets.Tick):
+        return pd.Timedelta(offset)
+    if isinstance(offset, pd.offsets.Day) and tz is None:
+        return pd.Timedelta(days=offset.n)
+    return None
+
+def period_edges(labels, freq) -> np.ndarray:
+    """
+    Boundaries of consecutive resample periods.
+
+    Right-closed frequencies ('W', 'ME', ...) label each period by its end;
+    like DataFrame.resample, their edges are extended to whole days.
+
+    Parameters:
+        labels (pd.DatetimeIndex): Non-empty period labels, as produced by resample(freq).
+        freq (str): Resample frequency.
+
+    Returns:
+        np.ndarray: len(labels) + 1 edges as int64 nanoseconds; period k is [edges[k], edges[k + 1]).
+    """
+    grouper = pd.Grouper(freq=freq)
+    labels = np.asarray(labels, dtype='datetime64[ns]')
+    if grouper.closed == 'right':
+        edges = np.concatenate([[np.datetime64(pd.Timestamp(labels[0]) - grouper.freq, 'ns')], labels])
+        if fixed_step(freq) is None:
+            edges = edges + np.timedelta64(1, 'D')
+    else:
+        edges = np.concatenate([labels, [np.datetime64(pd.Timestamp(labels[-1]) + grouper.freq, 'ns')]])
+    return edges.view('i8')
+
+def infer_grid_step(dates) -> pd.Timedelta:
+    """
+    Most common positive spacing between consecutive timestamps over the whole series.
+
+    Parameters:
+        dates (array-like): Timestamps, in any order.
+
+    Returns:
+        pd.Timedelta: The modal step.
+    """
+    t = np.sort(np.asarray(dates, dtype='datetime64[ns]').view('i8'))
+    deltas = np.diff(t)
+    deltas = deltas[deltas > 0]
+    if len(deltas) == 0:
+        raise ValueError("Could not infer frequency. Please specify it manually.")
+    values, counts = np.unique(deltas, return_counts=True)
+    return pd.Timedelta(int(values[np.argmax(counts)]), unit='ns')
+
+
+class RegularGrid:
+    """
+    Regular time grid over a frame, without materializing the missing rows.
+
+    The grid runs from the first timestamp (origin) to the last in steps of
+    `step`. Only the observed rows are stored, with the grid slot each one
+    falls on; coverage, gap and resampling queries treat every other slot as
+    missing. to_frame() builds the dense frame on request.
+    """
+
+    def __init__(self, origin, step, slots, values, n_slots, unit='ns'):
+        self.origin = origin
+        self.step = step
+        self.slots = slots
+        self.values = values
+        self.n_slots = n_slots
+        self.unit = unit  # resolution of the original 'Date' column
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, freq=None):
+        """
+        Place the rows of a frame on a regular grid.
+
+        Rows that fall between grid points are dropped and duplicate
+        timestamps raise, as with DataFrame.reindex.
+
+        Parameters:
+            df (pd.DataFrame): Must include a 'Date' column.
+            freq (str, pd.Timedelta or None): Grid step; inferred with infer_grid_step if None.
+                Only fixed-length steps (e.g. '5min', 'h', 'D') are supported.
+
+        Returns:
+            RegularGrid
+        """
+        if 'Date' not in df.columns:
+            raise ValueError("DataFrame must include a 'Date' column.")
+
+        df = df.sort_values('Date', kind='stable')
+        df = df[df['Date'].notna()]
+        if len(df) == 0:
+            raise ValueError("DataFrame has no timestamps.")
+        dates = pd.to_datetime(df['Date'])
+        t = np.asarray(dates, dtype='datetime64[ns]').view('i8')
+        if (np.diff(t) == 0).any():
+            raise ValueError("cannot reindex on an axis with duplicate labels")
+
+        if freq is None:
+            step = infer_grid_step(t.view('datetime64[ns]'))
+        else:
+            step = fixed_step(freq, dates.dt.tz)
+            if step is None:
+                raise ValueError(f"Frequency {freq} does not have a fixed step")
+
+        step_ns = step.value
+        offsets = t - t[0]
+        on_grid = offsets % step_ns == 0
+        values = df.drop(columns='Date')[on_grid].reset_index(drop=True)
+        return cls(pd.Timestamp(t[0]), step, offsets[on_grid] // step_ns, values,
+                   int(offsets[-1] // step_ns) + 1, dates.dt.unit)
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """All grid timestamps (materialized on access)."""
+        return pd.date_range(self.origin, periods=self.n_slots, freq=self.step, name='Date', unit=self.unit)
+
+    @property
+    def features(self) -> pd.Index:
+        return self.values.select_dtypes(include='number').columns
+
+    def observed_times(self) -> pd.DatetimeIndex:
+        """Timestamps of the observed rows."""
+        return pd.DatetimeIndex(self.origin + self.slots * self.step, name='Date').as_unit(self.unit)
+
+    def coverage(self) -> pd.Series:
+        """
+        Same as compute_feature_coverage on the dense frame.
+
+        Returns:
+            Series with feature names and % of available data.
+        """
+        return self.values[self.features].count() / self.n_slots * 100
+
+    def gap_index(self) -> GapIndex:
+        """
+        Same as build_gap_index on the dense frame; unobserved slots count as missing.
+
+        Returns:
+            GapIndex
+        """
+        features = self.features
+        present = self.values[features].notna().to_numpy()
+        starts, ends, offsets = [], [], [0]
+        for f in range(len(features)):
+            # Slots holding a value, framed by virtual ones just outside the grid
+            bounds = np.concatenate([[-1], self.slots[present[:, f]], [self.n_slots]])
+            gap_starts = bounds[:-1] + 1
+            gap_ends = bounds[1:]
+            keep = gap_ends > gap_starts
+            starts.append(gap_starts[keep])
+            ends.append(gap_ends[keep])
+            offsets.append(offsets[-1] + int(keep.sum()))
+
+        starts = np.concatenate(starts).astype(np.int64) if starts else np.zeros(0, dtype=np.int64)
+        ends = np.concatenate(ends).astype(np.int64) if ends else np.zeros(0, dtype=np.int64)
+        dtype = np.int32 if self.n_slots < np.iinfo(np.int32).max else np.int64
+        origin = np.datetime64(self.origin.to_datetime64(), 'ns')
+        step = np.timedelta64(self.step.value, 'ns')
+        return GapIndex(features, np.array(offsets), starts.astype(dtype), (ends - starts).astype(dtype),
+                        origin + starts * step, origin + np.minimum(ends, self.n_slots - 1) * step)
+
+    def gap_stats(self) -> pd.DataFrame:
+        """
+        Same as compute_gap_stats on the dense frame.
+
+        Returns:
+            DataFrame with columns: feature, num_gaps, mean_gap, max_gap
+        """
+        return self.gap_index().summary()
+
+    def _slots_per_period(self, resampled_index, freq):
+        """
+        Number of grid slots in each resample period, counted from the period
+        edges without materializing the grid.
+        """
+        if len(resampled_index) == 0:
+            return pd.Series(0, index=resampled_index)
+        bounds = period_edges(resampled_index, freq)
+        first_slot = -((self.origin.value - bounds) // self.step.value)  # ceil((bound - origin) / step)
+        return pd.Series(np.diff(np.clip(first_slot, 0, self.n_slots)), index=resampled_index)
+
+    def resample(self, freq='D', agg='mean'):
+        """
+        Aggregate the grid to a coarser frequency.
+
+        Aggregations that ignore missing values ('mean', 'sum', 'min', 'max',
+        'count', ...) are computed on the observed rows only. 'coverage' is
+        the % of grid slots per period holding a value.
+
+        Parameters:
+            freq (str): Target frequency.
+            agg (str): Aggregation function name or 'coverage'.
+
+        Returns:
+            pd.DataFrame: Resampled frame indexed by 'Date'.
+        """
+        observed = self.values[self.features].set_axis(self.observed_times())
+        if agg != 'coverage':
+            return observed.resample(freq).agg(agg)
+        counts = observed.resample(freq).count()
+        return counts.div(self._slots_per_period(counts.index, freq), axis=0) * 100
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Dense frame with one row per grid slot and NaN rows for unobserved slots.
+
+        Returns:
+            pd.DataFrame: Same as reconstruct_time_index.
+        """
+        dense = self.values.set_axis(self.slots).reindex(np.arange(self.n_slots))
+        dense.index = self.index
+        return dense.reset_index()
+
+@profiled
 def reconstruct_time_index(df: pd.DataFrame, inferred_freq: str = None) -> pd.DataFrame:
     """
     Reindex the time series DataFrame onto a full DateTimeIndex at inferred or given frequency.
 
+    Use RegularGrid.from_frame directly to query coverage, gaps or resampled
+    values without building the dense frame.
+
     Parameters:
         df (pd.DataFrame): Must include a 'Date' column.
-        inferred_freq (str or None): If None, will auto-infer the frequency.
+        inferred_freq (str or None): If None, the most common spacing between timestamps is used.
 
     Returns:
         pd.DataFrame: Reindexed DataFrame with missing rows filled as NaN.
     """
     if 'Date' not in df.columns:
         raise ValueError("DataFrame must include a 'Date' column.")
-    
+
+    if inferred_freq is None or fixed_step(inferred_freq, pd.to_datetime(df['Date']).dt.tz) is not None:
+        return RegularGrid.from_frame(df, inferred_freq).to_frame()
+
+    # Calendar frequencies (e.g. 'MS') have no fixed step
     df = df.copy().sort_values('Date')
     df = df.set_index('Date')
 
-    if inferred_freq is None:
-        inferred_freq = pd.infer_freq(df.index[:100])
-        if inferred_freq is None:
-            raise ValueError("Could not infer frequency. Please specify it manually.")
-
     full_index = pd.date_range(start=df.index.min(), end=df.index.max(), freq=inferred_freq)
     df = df.reindex(full_index)
 
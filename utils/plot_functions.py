@@ -1,32 +1,231 @@
+import base64
+import io
+
+import matplotlib
+import matplotlib.dates as mdates
+import matplotlib.image
+from matplotlib.figure import Figure
 import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
 
-def plot_time_series_heatmap(df: pd.DataFrame, title: str = "Time Series Heatmap") -> go.Figure:
+from utils.missingness import compute_temporal_coverage_matrix
+
+HEATMAP_AGGREGATIONS = ('mean', 'min', 'max', 'coverage')
+RENDERERS = ('heatmap', 'image', 'matplotlib')
+MATPLOTLIB_COLORMAPS = {'Viridis': 'viridis', 'Blues': 'Blues'}
+
+def rasterize_matrix(z, colorscale='Viridis', zmin=None, zmax=None) -> np.ndarray:
+    """
+    Map a matrix to RGBA pixels, one per cell; missing cells are transparent.
+
+    Parameters:
+        z (array-like): Matrix of shape (rows, columns).
+        colorscale (str): Plotly colorscale name (or any matplotlib colormap name).
+        zmin, zmax (float or None): Color range; defaults to the data range.
+
+    Returns:
+        np.ndarray: uint8 array of shape (rows, columns, 4).
+    """
+    z = np.ma.masked_invalid(np.asarray(z, dtype=float))
+    zmin, zmax = _value_range(z, zmin, zmax)
+    norm = matplotlib.colors.Normalize(vmin=zmin, vmax=zmax)
+    cmap = matplotlib.colormaps[MATPLOTLIB_COLORMAPS.get(colorscale, colorscale)]
+    return cmap(norm(z), bytes=True)
+
+def _value_range(z, zmin, zmax):
+    """Color range of a masked matrix, with 0..1 defaults when it has no valid values."""
+    has_values = z.count() > 0
+    zmin = (z.min() if has_values else 0) if zmin is None else zmin
+    zmax = (z.max() if has_values else 1) if zmax is None else zmax
+    return zmin, zmax
+
+def _png_data_uri(rgba):
+    buffer = io.BytesIO()
+    matplotlib.image.imsave(buffer, rgba, format='png')
+    return 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode()
+
+def _image_traces(levels, colorscale, zmin, zmax, colorbar_title):
+    """
+    One go.Image per (x, z) level, all stretched over x in [0, 1], followed by
+    an empty marker trace that carries the colorbar. Empty levels get an empty image.
+    """
+    zmin, zmax = _value_range(np.ma.masked_invalid(np.asarray(levels[0][1], dtype=float)), zmin, zmax)
+
+    traces = []
+    for _, z in levels:
+        width = np.shape(z)[1]
+        if np.size(z) == 0:
+            traces.append(go.Image(hoverinfo='skip', visible=not traces))
+            continue
+        traces.append(go.Image(
+            source=_png_data_uri(rasterize_matrix(z, colorscale, zmin, zmax)),
+            x0=0.5 / width, dx=1 / width, y0=0, dy=1,
+            hoverinfo='skip', visible=not traces
+        ))
+    traces.append(go.Scatter(
+        x=[None], y=[None], mode='markers', showlegend=False, hoverinfo='skip',
+        marker=dict(colorscale=colorscale, cmin=zmin, cmax=zmax, color=[zmin], showscale=True,
+                    colorbar=dict(title=colorbar_title))
+    ))
+    return traces
+
+def _image_axes(x, y, n_ticks=8):
+    """Axis settings mapping image pixel coordinates back to times and feature names."""
+    positions = np.unique(np.linspace(0, len(x) - 1, min(n_ticks, len(x))).astype(int))
+    return dict(
+        xaxis=dict(tickvals=(positions + 0.5) / len(x), ticktext=[str(x[p]) for p in positions], range=[0, 1]),
+        yaxis=dict(tickvals=list(range(len(y))), ticktext=list(y), autorange=True),
+    )
+
+def _matplotlib_figure(z, start, end, y, colorscale, zmin, zmax, colorbar_title, title, xlabel, ylabel):
+    """
+    Render a (features, time) matrix with imshow on a fixed-size matplotlib figure.
+    """
+    fig = Figure(figsize=(12, min(2 + 0.25 * len(y), 24)))
+    ax = fig.add_subplot()
+    ax.set(title=title, xlabel=xlabel, ylabel=ylabel)
+    if np.size(z) == 0:
+        return fig
+    image = ax.imshow(
+        np.ma.masked_invalid(np.asarray(z, dtype=float)),
+        aspect='auto', interpolation='nearest', origin='lower',
+        cmap=MATPLOTLIB_COLORMAPS.get(colorscale, colorscale), vmin=zmin, vmax=zmax,
+        extent=(mdates.date2num(start), mdates.date2num(end), -0.5, len(y) - 0.5)
+    )
+    ax.xaxis_date()
+    ax.set_yticks(range(len(y)), labels=list(y))
+    fig.colorbar(image, ax=ax, label=colorbar_title)
+    return fig
+
+def downsample_time_series(df: pd.DataFrame, width: int, agg: str = 'mean'):
+    """
+    Aggregate a time series into `width` equal-duration time buckets.
+
+    Parameters:
+        df (pd.DataFrame): Must include a 'Date' column and numeric columns.
+        width (int): Number of buckets (target heatmap columns).
+        agg (str): 'mean', 'min', 'max', or 'coverage' (% of rows present per bucket).
+
+    Returns:
+        tuple: (bucket start times as pd.DatetimeIndex, np.ndarray of shape
+        (features, width) with NaN for empty buckets, numeric column names);
+        no buckets when df has no dated rows.
+    """
+    if agg not in HEATMAP_AGGREGATIONS:
+        raise ValueError(f"Unsupported aggregation: {agg}")
+
+    df = df.sort_values('Date')
+    df = df[df['Date'].notna()]
+    numeric_cols = df.select_dtypes(include='number').columns.drop('Date', errors='ignore')
+
+    t = np.asarray(df['Date'], dtype='datetime64[ns]').view('i8')
+    if len(t) == 0:
+        return pd.DatetimeIndex([]), np.empty((len(numeric_cols), 0)), numeric_cols
+    t0, span = t[0], t[-1] - t[0] + 1
+    bucket = np.minimum(((t - t0) / span * width).astype(np.int64), width - 1)
+
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    filled = bucket[starts]
+    values = df[numeric_cols].to_numpy(dtype=float)
+    present = ~np.isnan(values)
+
+    if agg == 'mean':
+        sums = np.add.reduceat(np.where(present, values, 0), starts, axis=0)
+        counts = np.add.reduceat(present, starts, axis=0, dtype=np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            reduced = sums / counts
+    elif agg == 'min':
+        reduced = np.fmin.reduceat(values, starts, axis=0)
+    elif agg == 'max':
+        reduced = np.fmax.reduceat(values, starts, axis=0)
+    else:
+        counts = np.add.reduceat(present, starts, axis=0, dtype=np.int64)
+        reduced = counts / np.diff(np.r_[starts, len(t)])[:, None] * 100
+
+    z = np.full((len(numeric_cols), width), np.nan)
+    z[:, filled] = reduced.T
+    edges = pd.to_datetime(t0 + (np.arange(width) * (span / width)).astype(np.int64))
+    return edges, z, numeric_cols
+
+def plot_time_series_heatmap(df: pd.DataFrame, title: str = "Time Series Heatmap", max_columns=2000,
+                             agg='mean', zoom_levels=None, renderer='heatmap'):
     """
     Create a heatmap of feature values over time.
 
+    Long series are aggregated server-side (see downsample_time_series) so the
+    figure size stays bounded regardless of input length.
+
     Parameters:
         df (pd.DataFrame): Must include a 'Date' column and numeric columns.
         title (str): Plot title.
+        max_columns (int or None): Aggregate to this many time columns when the
+            input has more timestamps; None plots every timestamp.
+        agg (str): Aggregation per column bucket: 'mean', 'min', 'max' or 'coverage'.
+            Unaggregated series show their values, or 0/100 presence for 'coverage'.
+        zoom_levels (list of int or None): Precompute several widths; the figure gets
+            one trace per level and a menu to switch between them.
+        renderer (str): 'heatmap' (go.Heatmap), 'image' (a PNG-backed go.Image) or
+            'matplotlib' (a matplotlib Figure of the first level).
 
     Returns:
-        go.Figure: A Plotly heatmap object (not shown).
+        go.Figure or matplotlib.figure.Figure: The figure (not shown).
     """
     if 'Date' not in df.columns:
         raise ValueError("DataFrame must include a 'Date' column.")
-    
-    df = df.copy().sort_values('Date')
-    df = df.set_index('Date')
-    numeric_cols = df.select_dtypes(include='number').columns
-
-    fig = go.Figure(data=go.Heatmap(
-        z=df[numeric_cols].T.values,  # shape (features, time)
-        x=df.index,                   # time axis
-        y=numeric_cols,              # feature names
-        colorscale='Viridis',
-        colorbar=dict(title='Value')
-    ))
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unsupported renderer: {renderer}")
+    if agg not in HEATMAP_AGGREGATIONS:
+        raise ValueError(f"Unsupported aggregation: {agg}")
+
+    if zoom_levels:
+        widths = list(zoom_levels)
+    elif max_columns and len(df) > max_columns:
+        widths = [max_columns]
+    else:
+        widths = []
+
+    colorbar_title = 'Coverage (%)' if agg == 'coverage' else 'Value'
+    levels = []
+    if widths:
+        for width in widths:
+            x, z, numeric_cols = downsample_time_series(df, width, agg)
+            levels.append((x, z))
+    else:
+        df = df.copy().sort_values('Date')
+        df = df.set_index('Date')
+        numeric_cols = df.select_dtypes(include='number').columns
+        values = df[numeric_cols]
+        if agg == 'coverage':
+            values = values.notna() * 100.0  # each column holds one row: present or not
+        levels.append((df.index, values.T.values))  # shape (features, time)
+
+    if renderer == 'matplotlib':
+        x, z = levels[0]
+        if len(x) == 0:
+            start = end = None
+        else:
+            start = x[0]
+            end = x[-1] + (x[-1] - x[-2]) if len(x) > 1 else x[-1] + pd.Timedelta(1, unit='s')
+        return _matplotlib_figure(z, start, end, numeric_cols, 'Viridis', None, None,
+                                  colorbar_title, title, "Date", "Feature")
+
+    if renderer == 'image':
+        traces = _image_traces(levels, 'Viridis', None, None, colorbar_title)
+    else:
+        traces = [
+            go.Heatmap(
+                z=z,
+                x=x,                # time axis
+                y=numeric_cols,     # feature names
+                colorscale='Viridis',
+                colorbar=dict(title=colorbar_title),
+                visible=i == 0
+            )
+            for i, (x, z) in enumerate(levels)
+        ]
+
+    fig = go.Figure(data=traces)
 
     fig.update_layout(
         title=title,
@@ -35,90 +234,82 @@ def plot_time_series_heatmap(df: pd.DataFrame, title: str = "Time Series Heatmap
         height=400 + 20 * len(numeric_cols),
         margin=dict(l=40, r=40, t=40, b=40)
     )
+    if renderer == 'image':
+        fig.update_layout(**_image_axes(levels[0][0], numeric_cols))
+
+    if len(widths) > 1:
+        extra = [True] * (len(traces) - len(widths))  # colorbar trace of the image renderer
+        fig.update_layout(updatemenus=[dict(
+            buttons=[
+                dict(label=f"{width} columns", method='update',
+                     args=[{'visible': [i == j for j in range(len(widths))] + extra}])
+                for i, width in enumerate(widths)
+            ],
+        )])
 
     return fig
 
-def plot_temporal_coverage_heatmap(df: pd.DataFrame, sample_rate='D', selected_columns=None, title=None) -> go.Figure:
+def plot_temporal_coverage_heatmap(df: pd.DataFrame, sample_rate='D', selected_columns=None, title=None,
+                                   renderer='heatmap'):
     """
     Plot a temporal coverage heatmap using nested resampling logic.
 
+    The matrix comes from missingness.compute_temporal_coverage_matrix.
+
     Parameters:
         df (pd.DataFrame): Must include a 'Date' column and numeric columns.
         sample_rate (str): Target bin size ('D', 'W', 'M', etc.)
         selected_columns (list or None): Optional subset of columns.
         title (str): Optional plot title.
+        renderer (str): 'heatmap' (go.Heatmap), 'image' (a PNG-backed go.Image) or
+            'matplotlib' (a matplotlib Figure).
 
     Returns:
-        go.Figure: A Plotly heatmap object.
+        go.Figure or matplotlib.figure.Figure: The heatmap figure.
     """
-    TIME_RANGE_TO_RATE = {'D': 'h', 'W': 'h', 'M': 'D', 'H': 'min', 'min': 's'}
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unsupported renderer: {renderer}")
 
     try:
-        if 'Date' not in df.columns:
-            raise ValueError("DataFrame must include a 'Date' column.")
-
-        if sample_rate not in TIME_RANGE_TO_RATE:
-            raise ValueError(f"Unsupported sample_rate: {sample_rate}")
-
-        finer_rate = TIME_RANGE_TO_RATE[sample_rate]
+        coverage_matrix, bin_edges, selected_columns = compute_temporal_coverage_matrix(
+            df, sample_rate, selected_columns)
 
-        df = df.copy()
-        df['Date'] = pd.to_datetime(df['Date'])
-        df = df.sort_values('Date')
+        title = title or f"Temporal Coverage Heatmap ({sample_rate} bins)"
+        if renderer == 'matplotlib':
+            return _matplotlib_figure(coverage_matrix, bin_edges[0], bin_edges[-1], selected_columns, 'Blues', 0, 100,
+                                      "Coverage (%)", title, "Time Intervals", "Features")
 
-        finer = df.set_index('Date').resample(finer_rate).mean().reset_index()
-
-        if finer.empty:
-            raise ValueError("No data after finer resampling")
-
-        # Generate broader bins
-        if sample_rate == 'M':
-            broader_bins = pd.date_range(start=finer['Date'].iloc[0], end=finer['Date'].iloc[-1], freq='MS')
+        time_labels = bin_edges[:-1].strftime('%Y-%m-%d %H:%M:%S')
+        if renderer == 'image':
+            traces = _image_traces([(time_labels, coverage_matrix)], 'Blues', 0, 100, "Coverage (%)")
         else:
-            broader_bins = pd.date_range(start=finer['Date'].iloc[0], end=finer['Date'].iloc[-1], freq=sample_rate)
-
-        if len(broader_bins) < 2:
-            raise ValueError("Not enough intervals to compute heatmap")
-
-        if not selected_columns:
-            selected_columns = list(finer.columns)
-            selected_columns.remove('Date')
-
-        coverage_matrix = []
-
-        for col in selected_columns:
-            finer['bin'] = pd.cut(finer['Date'], bins=broader_bins, labels=broader_bins[:-1], right=False)
-            bin_counts = finer.groupby('bin', observed=True)[col].count()
-
-            broader_dur = pd.Timedelta(f'1{sample_rate}')
-            finer_dur = pd.Timedelta(f'1{finer_rate}')
-            max_points = max(broader_dur.total_seconds() / finer_dur.total_seconds(), 1)
-
-            coverage = (bin_counts / max_points) * 100
-            coverage = coverage.reindex(broader_bins[:-1], fill_value=0).tolist()
-            coverage_matrix.append(coverage)
-
-        time_labels = [str(t) for t in broader_bins[:-1]]
-        fig = go.Figure(data=go.Heatmap(
-            z=coverage_matrix,
-            x=time_labels,
-            y=selected_columns,
-            colorscale='Blues',
-            zmin=0,
-            zmax=100,
-            colorbar=dict(title="Coverage (%)")
-        ))
+            traces = go.Heatmap(
+                z=coverage_matrix,
+                x=time_labels,
+                y=selected_columns,
+                colorscale='Blues',
+                zmin=0,
+                zmax=100,
+                colorbar=dict(title="Coverage (%)")
+            )
+        fig = go.Figure(data=traces)
 
         fig.update_layout(
-            title=title or f"Temporal Coverage Heatmap ({sample_rate} bins)",
+            title=title,
             xaxis_title="Time Intervals",
             yaxis_title="Features",
             margin=dict(l=40, r=40, t=40, b=40),
             height=400 + 20 * len(selected_columns),
         )
+        if renderer == 'image':
+            fig.update_layout(**_image_axes(time_labels, selected_columns))
         return fig
 
     except Exception as e:
+        if renderer == 'matplotlib':
+            fig = Figure()
+            fig.suptitle(f"Error: {str(e)}")
+            return fig
         fig = go.Figure()
         fig.update_layout(
             title=f"Error: {str(e)}",
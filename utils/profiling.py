@@ -0,0 +1,312 @@
+"""
+Opt-in timing and memory instrumentation for the load and analysis stages.
+
+    from utils import profiling
+    profiling.enable()
+    ...  # load datasets, run analyses
+    profiling.report()                      # one row per stage call
+    profiling.summary()                     # totals per stage
+    profiling.to_chrome_trace('trace.json') # open in chrome://tracing or ui.perfetto.dev
+
+Stages are marked with the profiled decorator or the profile_stage context
+manager. While profiling is disabled (the default) a decorated function costs
+one flag check per call and profile_stage does no work. Functions submitted
+to thread pools are wrapped with propagate so their stages nest under the
+submitting stage.
+
+Peak memory comes from tracemalloc and is the peak traced allocation above
+the level at stage entry, including nested stages. tracemalloc is process
+wide, so peaks of stages running concurrently in threads overlap; worker
+processes are not traced.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+class _State:
+    enabled = False
+    trace_memory = False
+    started_tracemalloc = False
+    origin = 0.0
+
+
+_state = _State()
+_records = []
+_records_lock = threading.Lock()
+_open_stages = contextvars.ContextVar('open_stages', default=())  # stack of open stages, innermost last
+
+
+def enable(trace_memory=True):
+    """
+    Start recording stages.
+
+    Parameters:
+        trace_memory (bool): Also record peak memory with tracemalloc (slows traced code down noticeably).
+    """
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _state.started_tracemalloc = True
+    _state.trace_memory = trace_memory and tracemalloc.is_tracing()
+    if not _state.enabled:
+        _state.origin = time.perf_counter()
+    _state.enabled = True
+
+
+def disable():
+    """Stop recording stages; records collected so far are kept."""
+    _state.enabled = False
+    if _state.started_tracemalloc:
+        tracemalloc.stop()
+        _state.started_tracemalloc = False
+    _state.trace_memory = False
+
+
+def is_enabled():
+    return _state.enabled
+
+
+def reset():
+    """Drop all records."""
+    with _records_lock:
+        _records.clear()
+    _state.origin = time.perf_counter()
+
+
+def propagate(func):
+    """
+    Wrap a function that runs in a thread pool so that its stages are recorded
+    under the stage open where it was submitted. Returns func itself while
+    profiling is disabled.
+    """
+    if not _state.enabled:
+        return func
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # a context can only be entered by one thread at a time, so every call gets its own copy
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
+
+
+class _Stage:
+    """An open stage; `rows` and `args` may be filled in before it closes."""
+    __slots__ = ('name', 'rows', 'args', 'start', 'base_memory', 'peak_memory', 'child_rows', 'token')
+
+    def __init__(self, name, rows, args):
+        self.name = name
+        self.rows = rows
+        self.args = args
+        self.base_memory = None
+        self.peak_memory = 0
+        self.child_rows = 0
+        self.token = None
+
+
+class _NullStage:
+    """Returned by profile_stage while profiling is disabled; attribute writes are ignored."""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        pass
+
+    @property
+    def args(self):
+        return {}
+
+
+_null_stage = _NullStage()
+
+
+def _open(name, rows=None, args=None):
+    stage = _Stage(name, rows, dict(args or {}))
+    stack = _open_stages.get()
+    if _state.trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        # Fold the peak reached so far into the enclosing stage before resetting it
+        if stack and stack[-1].base_memory is not None:
+            stack[-1].peak_memory = max(stack[-1].peak_memory, peak)
+        tracemalloc.reset_peak()
+        stage.base_memory = current
+        stage.peak_memory = current
+    stage.token = _open_stages.set((*stack, stage))
+    stage.start = time.perf_counter()
+    return stage
+
+
+def _close(stage):
+    end = time.perf_counter()
+    _open_stages.reset(stage.token)
+    stack = _open_stages.get()
+    peak_bytes = None
+    if stage.base_memory is not None and tracemalloc.is_tracing():
+        stage.peak_memory = max(stage.peak_memory, tracemalloc.get_traced_memory()[1])
+        peak_bytes = stage.peak_memory - stage.base_memory
+        if stack and stack[-1].base_memory is not None:
+            stack[-1].peak_memory = max(stack[-1].peak_memory, stage.peak_memory)
+    if stack and stage.rows is not None:
+        stack[-1].child_rows += stage.rows
+
+    record = {
+        'stage': stage.name,
+        'parent': stack[-1].name if stack else None,
+        'depth': len(stack),
+        'thread': threading.get_ident(),
+        'start': stage.start - _state.origin,
+        'seconds': end - stage.start,
+        'rows': stage.rows,
+        'peak_bytes': peak_bytes,
+        'args': stage.args,
+    }
+    with _records_lock:
+        _records.append(record)
+
+
+@contextmanager
+def profile_stage(name, rows=None, **args):
+    """
+    Record a block as a stage.
+
+    Parameters:
+        name (str): Stage name.
+        rows (int or None): Rows processed; may also be set later via the yielded stage's `rows`.
+        **args: Extra values stored with the record (e.g. dataset name).
+
+    Yields:
+        The open stage (a no-op object when profiling is disabled).
+    """
+    if not _state.enabled:
+        yield _null_stage
+        return
+    stage = _open(name, rows, args)
+    try:
+        yield stage
+    finally:
+        _close(stage)
+
+
+def _count_rows(value):
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+
+def _input_rows(args):
+    for value in args:
+        if _count_rows(value) is not None:
+            return _count_rows(value)
+    return None
+
+
+def profiled(func=None, *, name=None, rows='input'):
+    """
+    Record each call of a function as a stage.
+
+    Use as @profiled or @profiled(name=..., rows=...).
+
+    Parameters:
+        name (str or None): Stage name (default: the function's qualified name).
+        rows (str): 'input' counts the rows of the first DataFrame or Series argument,
+            or else the rows of the stages nested in the call (e.g. one per dataset);
+            'result' counts the rows of the returned frame (for loaders).
+    """
+    if func is None:
+        return functools.partial(profiled, name=name, rows=rows)
+    stage_name = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _state.enabled:
+            return func(*args, **kwargs)
+        stage = _open(stage_name)
+        try:
+            result = func(*args, **kwargs)
+            if rows == 'result':
+                stage.rows = _count_rows(result)
+            else:
+                stage.rows = _input_rows(args)
+                if stage.rows is None and stage.child_rows:
+                    stage.rows = stage.child_rows
+            return result
+        finally:
+            _close(stage)
+
+    return wrapper
+
+
+def report() -> pd.DataFrame:
+    """
+    All recorded stages in completion order.
+
+    Returns:
+        pd.DataFrame: Columns stage, parent, depth, thread, start (seconds since enable/reset),
+        seconds, rows, peak_mb, args.
+    """
+    with _records_lock:
+        records = list(_records)
+    table = pd.DataFrame(records, columns=['stage', 'parent', 'depth', 'thread', 'start', 'seconds',
+                                           'rows', 'peak_bytes', 'args'])
+    table['rows'] = table['rows'].astype('Int64')
+    table['peak_mb'] = table.pop('peak_bytes').astype(float) / 2 ** 20
+    return table[['stage', 'parent', 'depth', 'thread', 'start', 'seconds', 'rows', 'peak_mb', 'args']]
+
+
+def summary() -> pd.DataFrame:
+    """
+    Totals per stage, slowest first.
+
+    Returns:
+        pd.DataFrame: Index stage; columns calls, total_seconds, max_seconds, rows, max_peak_mb.
+    """
+    table = report()
+    grouped = table.groupby('stage')
+    return pd.DataFrame({
+        'calls': grouped.size(),
+        'total_seconds': grouped['seconds'].sum(),
+        'max_seconds': grouped['seconds'].max(),
+        'rows': grouped['rows'].sum(),
+        'max_peak_mb': grouped['peak_mb'].max(),
+    }).sort_values('total_seconds', ascending=False)
+
+
+def to_chrome_trace(path=None) -> dict:
+    """
+    Recorded stages in the Chrome trace event format (complete events).
+
+    Parameters:
+        path (str or None): Also write the trace as JSON to this file.
+
+    Returns:
+        dict: {'traceEvents': [...]}
+    """
+    with _records_lock:
+        records = list(_records)
+    events = []
+    for record in records:
+        args = dict(record['args'])
+        if record['rows'] is not None:
+            args['rows'] = record['rows']
+        if record['peak_bytes'] is not None:
+            args['peak_mb'] = round(record['peak_bytes'] / 2 ** 20, 3)
+        events.append({
+            'name': record['stage'],
+            'ph': 'X',
+            'ts': record['start'] * 1e6,
+            'dur': record['seconds'] * 1e6,
+            'pid': os.getpid(),
+            'tid': record['thread'],
+            'args': {key: str(value) if not isinstance(value, (int, float, str)) else value
+                     for key, value in args.items()},
+        })
+    trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+    if path:
+        with open(path, 'w') as f:
+            json.dump(trace, f)
+    return trace
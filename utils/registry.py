@@ -0,0 +1,351 @@
+"""
+Config-driven dataset registry.
+
+A registry file (TOML, JSON, or YAML if PyYAML is installed) maps dataset
+groups to source files and a loader class:
+
+    [groups.Calihome]
+    pattern = "California-homes/IAQ_Monitoring/*.csv"
+    name = "Calihome{index}"          # {index}, {stem} and {group} are available
+    loader = "utils.datasets.cali.CaliPreprocessing"
+
+    [groups.Sweden]
+    loader = "utils.datasets.sweden.SwedenPreprocessing"
+    files = { "Sweden Bedroom" = "/data/Sweden/IAQbedroom.txt" }
+
+Relative patterns and files are resolved against a data root, given as
+data_root or in the TS_MISSINGNESS_DATA_ROOT environment variable, so the
+same registry works wherever the data is mounted.
+
+Discovery globs the groups in parallel and reuses the previous match list
+while the directory is unchanged. A JSON manifest caches per-file metadata
+(size, mtime, rows, time range, columns), so datasets can be selected by
+metadata without opening the files; only new or changed files are scanned.
+"""
+import fnmatch
+import glob
+import importlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+DEFAULT_MANIFEST = os.path.join(os.path.expanduser('~'), '.cache', 'ts-missingness-visuals', 'registry-manifest.json')
+DATA_ROOT_ENV = 'TS_MISSINGNESS_DATA_ROOT'
+
+
+def load_config(path):
+    """
+    Read a registry file.
+
+    Returns:
+        dict: Group name to group settings (pattern/name or files, loader).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.toml':
+        import tomllib
+        with open(path, 'rb') as f:
+            config = tomllib.load(f)
+    elif ext == '.json':
+        with open(path) as f:
+            config = json.load(f)
+    elif ext in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("Reading YAML registries requires PyYAML (pip install pyyaml).") from e
+        with open(path) as f:
+            config = yaml.safe_load(f)
+    else:
+        raise ValueError(f"Unsupported registry format: {ext}")
+
+    groups = config.get('groups', {})
+    for group, settings in groups.items():
+        if 'loader' not in settings:
+            raise ValueError(f"Group {group} has no loader.")
+        if ('pattern' in settings) == ('files' in settings):
+            raise ValueError(f"Group {group} needs exactly one of 'pattern' or 'files'.")
+    return groups
+
+
+def resolve_paths(groups, data_root=None):
+    """
+    Resolve the relative patterns and files of registry groups against a data root.
+
+    Parameters:
+        groups (dict): Group settings as returned by load_config.
+        data_root (str or None): Directory of the data (default: the TS_MISSINGNESS_DATA_ROOT
+            environment variable).
+
+    Returns:
+        dict: Copy of groups with absolute patterns and files.
+    """
+    data_root = data_root or os.environ.get(DATA_ROOT_ENV)
+
+    def resolve(path):
+        path = os.path.expanduser(path)
+        if os.path.isabs(path):
+            return path
+        if not data_root:
+            raise ValueError(f"Relative path {path} needs a data root: pass data_root or set {DATA_ROOT_ENV}.")
+        return os.path.join(os.path.expanduser(data_root), path)
+
+    resolved = {}
+    for group, settings in groups.items():
+        settings = dict(settings)
+        if 'pattern' in settings:
+            settings['pattern'] = resolve(settings['pattern'])
+        else:
+            settings['files'] = {name: resolve(path) for name, path in settings['files'].items()}
+        resolved[group] = settings
+    return resolved
+
+
+def import_loader(dotted_path):
+    """Import a loader class from 'package.module.ClassName'."""
+    module_name, _, class_name = dotted_path.rpartition('.')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _static_dir(pattern):
+    """Directory of a pattern whose only wildcards are in the file name, else None."""
+    directory, file_pattern = os.path.split(pattern)
+    if glob.has_magic(directory) or not glob.has_magic(file_pattern):
+        return None
+    return directory or '.'
+
+
+def _scan_file(loader, path):
+    """Load one file and summarize it: rows, time range and columns."""
+    df = import_loader(loader).load_and_preprocess(path)
+    dates = pd.to_datetime(df['Date'], errors='coerce') if 'Date' in df.columns else pd.Series(dtype='datetime64[ns]')
+    return {
+        'rows': len(df),
+        'start': None if dates.isna().all() else dates.min().isoformat(),
+        'end': None if dates.isna().all() else dates.max().isoformat(),
+        'columns': [str(col) for col in df.columns if col != 'Date'],
+    }
+
+
+class DatasetRegistry:
+    """
+    Datasets discovered from a registry config, with a cached manifest of file metadata.
+    """
+
+    def __init__(self, groups, manifest_path=DEFAULT_MANIFEST, max_workers=None, data_root=None):
+        self.groups = resolve_paths(groups, data_root)
+        self.manifest_path = manifest_path
+        self.max_workers = max_workers
+        self._manifest = self._read_manifest()
+        self._entries = None
+
+    @classmethod
+    def from_file(cls, path, manifest_path=DEFAULT_MANIFEST, max_workers=None, data_root=None):
+        return cls(load_config(path), manifest_path=manifest_path, max_workers=max_workers, data_root=data_root)
+
+    def _read_manifest(self):
+        if self.manifest_path:
+            try:
+                with open(self.manifest_path) as f:
+                    manifest = json.load(f)
+                if isinstance(manifest, dict):
+                    return {'globs': manifest.get('globs', {}), 'files': manifest.get('files', {})}
+            except (OSError, ValueError):
+                pass
+        return {'globs': {}, 'files': {}}
+
+    def _write_manifest(self):
+        if not self.manifest_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifest_path)), exist_ok=True)
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _match(self, pattern):
+        """
+        Files matching a pattern, reusing the cached list while the directory is unchanged.
+
+        Returns:
+            tuple: (files, directory mtime to cache the list under, or None)
+        """
+        directory = _static_dir(pattern)
+        if directory is None:
+            return sorted(glob.glob(pattern, recursive=True)), None
+        try:
+            dir_mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return [], None
+        cached = self._manifest['globs'].get(pattern)
+        if cached and cached['dir_mtime_ns'] == dir_mtime:
+            return cached['files'], None
+        files = sorted(os.path.join(directory, name)
+                       for name in fnmatch.filter(os.listdir(directory), os.path.basename(pattern)))
+        return files, dir_mtime
+
+    def discover(self, refresh=False):
+        """
+        Resolve every group to dataset names and files.
+
+        Parameters:
+            refresh (bool): Glob again even if the directories look unchanged.
+
+        Returns:
+            dict: Dataset name to {'group', 'path', 'loader'}, in config order.
+        """
+        if self._entries is not None and not refresh:
+            return self._entries
+        if refresh:
+            self._manifest['globs'] = {}
+
+        patterns = [settings['pattern'] for settings in self.groups.values() if 'pattern' in settings]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            matches = list(executor.map(self._match, patterns))
+
+        globs_changed = False
+        files_by_pattern = {}
+        for pattern, (files, dir_mtime) in zip(patterns, matches):
+            files_by_pattern[pattern] = files
+            if dir_mtime is not None:
+                self._manifest['globs'][pattern] = {'dir_mtime_ns': dir_mtime, 'files': files}
+                globs_changed = True
+
+        entries = {}
+        for group, settings in self.groups.items():
+            if 'files' in settings:
+                named_files = settings['files'].items()
+            else:
+                template = settings.get('name', '{group}{index}')
+                named_files = [
+                    (template.format(index=index, stem=os.path.splitext(os.path.basename(path))[0], group=group), path)
+                    for index, path in enumerate(files_by_pattern[settings['pattern']])
+                ]
+            for name, path in named_files:
+                entries[name] = {'group': group, 'path': path, 'loader': settings['loader']}
+
+        if globs_changed:
+            self._write_manifest()
+        self._entries = entries
+        return entries
+
+    def data_dict(self):
+        """Dataset names mapped to source files, as taken by DataSingleton."""
+        return {name: entry['path'] for name, entry in self.discover().items()}
+
+    def loaders(self):
+        """Dataset names mapped to loader classes, for DataSingleton(loaders=...)."""
+        classes = {}
+        result = {}
+        for name, entry in self.discover().items():
+            if entry['loader'] not in classes:
+                classes[entry['loader']] = import_loader(entry['loader'])
+            result[name] = classes[entry['loader']]
+        return result
+
+    def _file_key(self, entry):
+        """Manifest validity key of a file: size, mtime and loader version, or None if missing."""
+        try:
+            stat = os.stat(entry['path'])
+        except OSError:
+            return None
+        version = getattr(import_loader(entry['loader']), 'VERSION', 0)
+        return [stat.st_size, stat.st_mtime_ns, entry['loader'], version]
+
+    def scan(self, names=None, executor='threads'):
+        """
+        Make sure the manifest holds metadata for the given datasets, loading only new or changed files.
+
+        Parameters:
+            names (list or None): Datasets to scan (default: all).
+            executor (str): 'threads' or 'processes' for the files that need loading.
+
+        Returns:
+            dict: Dataset name to the error raised while scanning it (empty if all succeeded).
+        """
+        entries = self.discover()
+        names = list(entries) if names is None else names
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            keys = dict(zip(names, pool.map(lambda name: self._file_key(entries[name]), names)))
+
+        stale = [name for name in names
+                 if keys[name] is not None and self._manifest['files'].get(entries[name]['path'], {}).get('key') != keys[name]]
+        errors = {name: FileNotFoundError(entries[name]['path']) for name in names if keys[name] is None}
+        if stale:
+            pool_class = ProcessPoolExecutor if executor == 'processes' else ThreadPoolExecutor
+            with pool_class(max_workers=self.max_workers) as pool:
+                futures = {name: pool.submit(_scan_file, entries[name]['loader'], entries[name]['path'])
+                           for name in stale}
+                for name, future in futures.items():
+                    try:
+                        metadata = future.result()
+                    except Exception as e:
+                        errors[name] = e
+                        continue
+                    self._manifest['files'][entries[name]['path']] = {'key': keys[name], **metadata}
+            self._write_manifest()
+        return errors
+
+    def manifest(self, scan=True):
+        """
+        Metadata of all datasets.
+
+        Parameters:
+            scan (bool): Scan new or changed files first; otherwise only cached metadata is shown.
+
+        Returns:
+            pd.DataFrame: Columns dataset, group, path, loader, size, mtime, rows, start, end, columns.
+        """
+        if scan:
+            self.scan()
+        rows = []
+        for name, entry in self.discover().items():
+            cached = self._manifest['files'].get(entry['path'], {})
+            key = cached.get('key') or [None, None]
+            rows.append({
+                'dataset': name,
+                'group': entry['group'],
+                'path': entry['path'],
+                'loader': entry['loader'],
+                'size': key[0],
+                'mtime': pd.Timestamp(key[1], unit='ns') if key[1] is not None else pd.NaT,
+                'rows': cached.get('rows'),
+                'start': pd.Timestamp(cached['start']) if cached.get('start') else pd.NaT,
+                'end': pd.Timestamp(cached['end']) if cached.get('end') else pd.NaT,
+                'columns': cached.get('columns'),
+            })
+        table = pd.DataFrame(rows, columns=['dataset', 'group', 'path', 'loader', 'size', 'mtime', 'rows',
+                                            'start', 'end', 'columns'])
+        return table.astype({'size': 'Int64', 'rows': 'Int64'})
+
+    def select(self, groups=None, overlaps=None, columns=None, min_rows=None):
+        """
+        Names of the datasets matching all given conditions, from the manifest.
+
+        Parameters:
+            groups (list or None): Only these groups.
+            overlaps (str, tuple or None): Time range the data must overlap: a period
+                such as '2023' or '2023-06', or a (start, end) pair.
+            columns (list or None): Columns every selected dataset must have.
+            min_rows (int or None): Minimum number of rows.
+
+        Returns:
+            list: Dataset names in config order.
+        """
+        table = self.manifest(scan=overlaps is not None or columns is not None or min_rows is not None)
+        keep = pd.Series(True, index=table.index)
+        if groups is not None:
+            keep &= table['group'].isin(groups)
+        if overlaps is not None:
+            if isinstance(overlaps, str):
+                period = pd.Period(overlaps)
+                start, end = period.start_time, period.end_time
+            else:
+                start, end = (pd.Timestamp(bound) for bound in overlaps)
+            keep &= (table['start'] <= end) & (table['end'] >= start)
+        if columns is not None:
+            keep &= table['columns'].map(lambda cols: cols is not None and set(columns) <= set(cols))
+        if min_rows is not None:
+            keep &= table['rows'].fillna(-1) >= min_rows
+        return table.loc[keep, 'dataset'].tolist()
@@ -0,0 +1,303 @@
+"""
+Batch export of missingness reports for every dataset.
+
+    python -m utils.report --data-root /path/to/data --out reports/
+
+For each dataset this writes Parquet tables (gap stats, gaps, feature coverage,
+periodic coverage, co-coverage) and static figures (HTML and PNG) to
+<out>/<dataset>/. Datasets are processed in parallel. A manifest in the output
+directory records the source fingerprint each report was built from, so
+datasets whose inputs and options are unchanged are skipped on the next run.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+REPORT_VERSION = 1  # bump when the set or content of artifacts changes
+MANIFEST_NAME = 'manifest.json'
+
+
+def dataset_slug(name):
+    """Directory name for a dataset's artifacts."""
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', name).strip('_') or 'dataset'
+
+
+def report_fingerprint(file_path, preprocessing_class, options):
+    """
+    Identify the inputs of a report: the source file, its loader and the report options.
+
+    Returns:
+        str: Hex digest.
+    """
+    from utils.datasets.cache import DatasetCache
+    source = DatasetCache.source_fingerprint(file_path, preprocessing_class)
+    token = f"{source}|{REPORT_VERSION}|{json.dumps(options, sort_keys=True)}"
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_up_to_date(entry, fingerprint, out_dir):
+    """
+    Whether a manifest entry was built from the same inputs and all its artifacts still exist.
+    """
+    if not entry or entry.get('status') != 'ok' or entry.get('fingerprint') != fingerprint:
+        return False
+    return all(os.path.exists(os.path.join(out_dir, artifact)) for artifact in entry.get('artifacts', []))
+
+
+def write_dataset_report(df, name, dataset_dir, sample_rate='D', figures=True):
+    """
+    Compute all missingness artifacts for one dataset and write them to a directory.
+
+    Parameters:
+        df (pd.DataFrame): Preprocessed dataset with a 'Date' column.
+        name (str): Dataset name, used in figure titles.
+        dataset_dir (str): Output directory (created if needed).
+        sample_rate (str): Bin size of the temporal coverage heatmap and periodic coverage.
+        figures (bool): Also write HTML and PNG figures.
+
+    Returns:
+        list: File names written, relative to dataset_dir.
+    """
+    from utils.co_coverage import compute_co_coverage_matrix
+    from utils.missingness import (build_gap_index, compute_feature_coverage, compute_periodic_coverage,
+                                   compute_temporal_coverage_matrix)
+    from utils.plot_functions import plot_temporal_coverage_heatmap, plot_time_series_heatmap
+
+    os.makedirs(dataset_dir, exist_ok=True)
+    periodic_freq = 'ME' if sample_rate == 'M' else sample_rate.replace('H', 'h')
+    gap_index = build_gap_index(df)
+
+    tables = {
+        'gap_stats': gap_index.summary(),
+        'gaps': gap_index.to_frame(),
+        'feature_coverage': compute_feature_coverage(df).rename('coverage').rename_axis('feature').reset_index(),
+        'periodic_coverage': compute_periodic_coverage(df, freq=periodic_freq).reset_index(),
+        'co_coverage': compute_co_coverage_matrix(df),
+    }
+    written = []
+    for table_name, table in tables.items():
+        file_name = f"{table_name}.parquet"
+        table.columns = table.columns.astype(str)
+        table.to_parquet(os.path.join(dataset_dir, file_name))
+        written.append(file_name)
+
+    if figures:
+        # plot_temporal_coverage_heatmap draws errors into the figure; surface them as failures instead
+        compute_temporal_coverage_matrix(df, sample_rate)
+        coverage_title = f"{name}: Temporal Coverage ({sample_rate} bins)"
+        values_title = f"{name}: Time Series Heatmap"
+        html_figures = {
+            'temporal_coverage.html': plot_temporal_coverage_heatmap(df, sample_rate, title=coverage_title),
+            'time_series.html': plot_time_series_heatmap(df, title=values_title, renderer='image'),
+        }
+        png_figures = {
+            'temporal_coverage.png': plot_temporal_coverage_heatmap(df, sample_rate, title=coverage_title,
+                                                                    renderer='matplotlib'),
+            'time_series.png': plot_time_series_heatmap(df, title=values_title, renderer='matplotlib'),
+        }
+        for file_name, fig in html_figures.items():
+            fig.write_html(os.path.join(dataset_dir, file_name), include_plotlyjs='cdn')
+            written.append(file_name)
+        for file_name, fig in png_figures.items():
+            fig.savefig(os.path.join(dataset_dir, file_name), dpi=100, bbox_inches='tight')
+            written.append(file_name)
+    return written
+
+
+def _report_worker(preprocessing_class, file_path, name, out_dir, cache_dir, options):
+    """
+    Load one dataset and write its report. Runs in a pool worker; the frame is
+    released once the report is written.
+
+    Returns:
+        tuple: (artifact paths relative to out_dir, rows, seconds)
+    """
+    from utils.datasets.cache import DatasetCache
+    from utils.datasets.data_singleton import _load_dataset
+    from utils.memo import register_dataset
+
+    start = time.perf_counter()
+    cache = DatasetCache(cache_dir) if cache_dir else None
+    df, _ = _load_dataset(preprocessing_class, file_path, cache)
+    # lets the figures reuse the coverage matrix computed for the tables
+    register_dataset(df, name, DatasetCache.source_fingerprint(file_path, preprocessing_class))
+    slug = dataset_slug(name)
+    written = write_dataset_report(df, name, os.path.join(out_dir, slug), **options)
+    return [f"{slug}/{file_name}" for file_name in written], len(df), time.perf_counter() - start
+
+
+def generate_reports(data_dict, out_dir, cache_dir=None, datasets=None, sample_rate='D', figures=True,
+                     force=False, executor='processes', max_workers=None, loaders=None, log=print):
+    """
+    Write reports for all (or the selected) datasets, skipping those that are up to date.
+
+    Parameters:
+        data_dict (dict): Dataset names mapped to source files, as for DataSingleton.
+        out_dir (str): Output directory.
+        cache_dir (str or None): DataSingleton preprocessed-dataset cache.
+        datasets (list or None): Subset of dataset names.
+        sample_rate (str): Bin size for the coverage heatmap and periodic coverage.
+        figures (bool): Also write HTML and PNG figures.
+        force (bool): Rebuild reports even when their inputs are unchanged.
+        executor (str): 'processes', 'threads' or 'serial'.
+        max_workers (int or None): Pool size.
+        loaders (dict or None): Dataset names mapped to preprocessing classes (e.g. from
+            DatasetRegistry.loaders()); other names fall back to matching on the name.
+        log (callable): Progress output.
+
+    Returns:
+        pd.DataFrame: One row per dataset with columns dataset, status
+        ('ok', 'skipped' or 'error'), rows, seconds, error.
+    """
+    from utils.datasets.data_singleton import EXECUTORS, select_preprocessing_class
+
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unsupported executor: {executor}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    names = list(datasets) if datasets else list(data_dict)
+    unknown = [name for name in names if name not in data_dict]
+    if unknown:
+        raise ValueError(f"Dataset {unknown[0]} not found.")
+
+    options = {'sample_rate': sample_rate, 'figures': figures}
+    manifest = load_manifest(out_dir)
+    rows, todo, classes = [], {}, {}
+
+    for name in names:
+        try:
+            classes[name] = select_preprocessing_class(name, loaders)
+            fingerprint = report_fingerprint(data_dict[name], classes[name], options)
+        except (OSError, ValueError) as e:
+            rows.append({'dataset': name, 'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+            log(f"{name}: error ({e})")
+            continue
+        if not force and is_up_to_date(manifest.get(name), fingerprint, out_dir):
+            rows.append({'dataset': name, 'status': 'skipped'})
+            log(f"{name}: unchanged, skipped")
+        else:
+            todo[name] = fingerprint
+
+    def finish(name, artifacts, n_rows, seconds):
+        manifest[name] = {
+            'status': 'ok',
+            'fingerprint': todo[name],
+            'source': data_dict[name],
+            'artifacts': artifacts,
+            'rows': n_rows,
+            'seconds': round(seconds, 3),
+            'generated_at': pd.Timestamp.now(tz='UTC').isoformat(),
+        }
+        save_manifest(out_dir, manifest)
+        rows.append({'dataset': name, 'status': 'ok', 'rows': n_rows, 'seconds': seconds})
+        log(f"{name}: {len(artifacts)} artifacts in {seconds:.1f}s")
+
+    def fail(name, e):
+        manifest.pop(name, None)
+        save_manifest(out_dir, manifest)
+        rows.append({'dataset': name, 'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+        log(f"{name}: error ({e})")
+
+    if executor == 'serial':
+        for name in todo:
+            try:
+                finish(name, *_report_worker(classes[name], data_dict[name], name, out_dir, cache_dir, options))
+            except Exception as e:
+                fail(name, e)
+    else:
+        pool_class = ProcessPoolExecutor if executor == 'processes' else ThreadPoolExecutor
+        with pool_class(max_workers=max_workers) as pool:
+            futures = {pool.submit(_report_worker, classes[name], data_dict[name], name, out_dir, cache_dir,
+                                   options): name
+                       for name in todo}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    finish(name, *future.result())
+                except Exception as e:
+                    fail(name, e)
+
+    order = {name: i for i, name in enumerate(names)}
+    rows.sort(key=lambda row: order[row['dataset']])
+    return pd.DataFrame(rows, columns=['dataset', 'status', 'rows', 'seconds', 'error'])
+
+
+def parse_args(argv=None):
+    from utils.get_data import DEFAULT_CACHE_DIR, DEFAULT_REGISTRY
+
+    parser = argparse.ArgumentParser(
+        prog='python -m utils.report',
+        description="Write missingness reports (Parquet tables, HTML/PNG figures) for every dataset.")
+    parser.add_argument('--out', default='reports', help="Output directory (default: reports)")
+    parser.add_argument('--registry', default=DEFAULT_REGISTRY,
+                        help="Dataset registry (TOML, JSON or YAML) listing the datasets and their loaders "
+                             "(default: utils/datasets/datasets.toml)")
+    parser.add_argument('--data-root',
+                        help="Directory the registry's relative paths are resolved against "
+                             "(default: $TS_MISSINGNESS_DATA_ROOT)")
+    parser.add_argument('--config', help="JSON file mapping dataset names to source files, used instead of "
+                                         "the registry; loaders are picked by dataset name")
+    parser.add_argument('--datasets', nargs='+', help="Only these datasets")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="Preprocessed-dataset cache ('' disables it)")
+    parser.add_argument('--sample-rate', default='D', choices=['D', 'W', 'M', 'H', 'min'],
+                        help="Bin size of the coverage heatmap and periodic coverage (default: D)")
+    parser.add_argument('--no-figures', action='store_true', help="Only write the Parquet tables")
+    parser.add_argument('--force', action='store_true', help="Rebuild reports whose inputs are unchanged")
+    parser.add_argument('--executor', default='processes', choices=['processes', 'threads', 'serial'])
+    parser.add_argument('--workers', type=int, default=None, help="Pool size (default: CPU count)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.config:
+        with open(args.config) as f:
+            data_dict = json.load(f)
+        loaders = None
+    else:
+        from utils.get_data import get_registry
+        try:
+            registry = get_registry(args.registry, args.data_root)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        data_dict, loaders = registry.data_dict(), registry.loaders()
+
+    results = generate_reports(
+        data_dict, args.out, cache_dir=args.cache_dir or None, datasets=args.datasets,
+        sample_rate=args.sample_rate, figures=not args.no_figures, force=args.force,
+        executor=args.executor, max_workers=args.workers, loaders=loaders)
+
+    counts = results['status'].value_counts()
+    print(f"{counts.get('ok', 0)} written, {counts.get('skipped', 0)} skipped, "
+          f"{counts.get('error', 0)} failed -> {os.path.abspath(args.out)}")
+    return 1 if counts.get('error', 0) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import pandas as pd
+
+from utils.co_coverage import compute_bin_presence, compute_presence_co_coverage, fill_empty_bins
+from utils.incremental import IncrementalCoverageStats
+
+# Reducers that consume an iterator of chunks (e.g. DataSingleton.iter_chunks)
+# and return the same result as the batch function on the concatenated frame,
+# holding only one chunk in memory at a time. Numeric columns are taken from
+# the first chunk.
+
+
+def _consume(chunks, freq='D'):
+    stats = IncrementalCoverageStats(freq=freq)
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
+
+
+def stream_feature_coverage(chunks) -> pd.Series:
+    """
+    Streaming counterpart of missingness.compute_feature_coverage.
+
+    Returns:
+        Series with feature names and % of available data.
+    """
+    stats = _consume(chunks)
+    if stats.features is None:
+        return pd.Series(dtype=float)
+    return stats.feature_coverage()
+
+
+def stream_co_coverage_matrix(chunks, selected_columns=None) -> pd.DataFrame:
+    """
+    Streaming counterpart of co_coverage.compute_co_coverage_matrix.
+
+    Returns:
+        pd.DataFrame: Symmetric matrix of co-coverage percentages (0-100).
+    """
+    stats = _consume(chunks)
+    if stats.features is None:
+        return pd.DataFrame()
+    return stats.co_coverage_matrix(selected_columns)
+
+
+def stream_periodic_coverage(chunks, freq='D') -> pd.DataFrame:
+    """
+    Streaming counterpart of missingness.compute_periodic_coverage.
+
+    Period labels must not depend on where a chunk starts, so freq should be
+    calendar-anchored ('h', 'D', 'W', 'ME', or a divisor of a day).
+
+    Returns:
+        DataFrame: rows = periods, columns = features, values = % coverage
+    """
+    stats = _consume(chunks, freq=freq)
+    if stats.features is None:
+        return pd.DataFrame()
+    return stats.periodic_coverage()
+
+
+def stream_gap_stats(chunks) -> pd.DataFrame:
+    """
+    Streaming counterpart of missingness.compute_gap_stats.
+
+    Chunks must arrive in 'Date' order; a gap still open at the end of a chunk
+    is joined with a gap opening the next one.
+
+    Returns:
+        DataFrame with columns: feature, num_gaps, mean_gap, max_gap
+    """
+    stats = _consume(chunks)
+    if stats.features is None:
+        return pd.DataFrame()
+    return stats.gap_stats()
+
+
+def stream_partial_co_coverage_vector(chunks, feature_pool, daily_bins):
+    """
+    Streaming counterpart of co_coverage.compute_partial_co_coverage_vector.
+
+    Returns:
+        list: Average co-coverage for each feature in feature_pool (zero if not in dataset).
+    """
+    available, presence, bin_rows = None, None, None
+    for chunk in chunks:
+        if available is None:
+            available = [f for f in feature_pool if f in chunk.columns]
+            if len(available) < 1:
+                return None
+        chunk_presence, chunk_rows = compute_bin_presence(chunk, available, daily_bins)
+        if presence is None:
+            presence, bin_rows = chunk_presence, chunk_rows
+        else:
+            presence |= chunk_presence
+            bin_rows += chunk_rows
+
+    if presence is None:
+        return None
+    co_matrix = compute_presence_co_coverage(fill_empty_bins(presence, bin_rows))
+    avg_cov = dict(zip(available, co_matrix.mean(axis=1)))
+    return [avg_cov.get(f, 0.0) for f in feature_pool]
@@ -1,29 +1,207 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
-def calculate_comprehensive_statistics(data_singleton, resolution='D', finer_resolution='h', threshold=0.8, debug=False):
+from utils.missingness import fixed_step, period_edges
+from utils.profiling import profiled, propagate
+
+def bin_statistics(finer_counts, total_records, missing_records, time_span, resolution='D', threshold=0.8):
+    """
+    Derive the per-dataset summary metrics from record counts per finer bin.
+
+    Args:
+        finer_counts (pd.Series): Number of records per finer bin (e.g. hourly), indexed by bin start.
+        total_records (int): Number of records with a valid date.
+        missing_records (int): Number of missing cells across all value columns.
+        time_span (int): Days between the first and last record.
+        resolution (str): Temporal resolution for aggregation (e.g., 'D' for daily).
+        threshold (float): Minimum fraction of finer bins per bin to be considered usable.
+
+    Returns:
+        tuple: (dict of metrics, pd.Series of present finer bins per resolution bin)
+    """
+    rolled = roll_up_counts(finer_counts, [resolution])[resolution]
+    stats = present_bin_statistics(rolled['present_bins'], total_records, missing_records, time_span, threshold,
+                                   rolled['expected_bins'])
+    return stats, rolled['present_bins']
+
+def present_bin_statistics(daily_counts, total_records, missing_records, time_span, threshold=0.8, expected_bins=24):
+    """
+    Summary metrics from the number of present finer bins per resolution bin
+    (the 'present_bins' column of roll_up_counts).
+
+    A bin is recorded when at least half of its finer bins hold data, and
+    usable when at least `threshold` of them do.
+
+    Args:
+        expected_bins (int or pd.Series): Finer bins per resolution bin (the
+            'expected_bins' column of roll_up_counts); 24 for days of hours.
+
+    Returns:
+        dict: Metrics as reported by calculate_comprehensive_statistics.
+    """
+    completeness_ratio = (total_records - missing_records) / total_records if total_records > 0 else 0
+
+    share = daily_counts / expected_bins
+    total_expected_bins = len(daily_counts)
+    recorded_bins = (share >= 0.5).sum()  # Require at least half of the finer bins (12 hours in a day)
+    usable_bins = (share >= threshold).sum()
+    usable_bins2 = (share >= 0.5).sum()
+
+    return {
+        'Total Records': total_records,
+        'Missing Records': missing_records,
+        'Completeness Ratio': completeness_ratio * 100,
+        'Time Span (days)': time_span,
+        'Total Expected Bins': total_expected_bins,
+        'Recorded Bins (>=12h)': recorded_bins,
+        'Usable Bins (>80%)': usable_bins,
+        'Percentage Recorded Data': (recorded_bins / total_expected_bins) * 100 if total_expected_bins > 0 else 0,
+        'Percentage Usable Data (>80%)': (usable_bins / total_expected_bins) * 100 if total_expected_bins > 0 else 0,
+        'Percentage Usable Data (>50%)': (usable_bins2 / total_expected_bins) * 100 if total_expected_bins > 0 else 0
+    }
+
+def count_records_per_bin(dates, resolution='h') -> pd.Series:
+    """
+    Count records per time bin in one pass over the timestamps.
+
+    For fixed-width resolutions the bin position of every timestamp is computed
+    arithmetically and counted with np.bincount; bins are anchored like
+    DataFrame.resample (at midnight of the first day), so the result equals
+    data.resample(resolution).size().
+
+    Args:
+        dates (pd.Series or pd.DatetimeIndex): Record timestamps, without NaT.
+        resolution (str): Bin width (e.g., 'h').
+
+    Returns:
+        pd.Series: Records per bin, indexed by bin start, including empty bins.
+    """
+    dates = pd.DatetimeIndex(dates)
+    fixed = fixed_step(resolution, dates.tz)
+    if len(dates) == 0 or fixed is None:
+        return pd.Series(1, index=dates).resample(resolution).size()
+
+    step = fixed.value
+    first = dates.min()
+    day_start = first.normalize()
+    origin = day_start + pd.Timedelta((first - day_start).value // step * step)
+
+    ns = np.asarray(dates, dtype='datetime64[ns]').view('i8')
+    counts = np.bincount((ns - origin.value) // step)
+    return pd.Series(counts, index=pd.date_range(origin, periods=len(counts), freq=resolution))
+
+def roll_up_counts(finer_counts, resolutions=('D', 'W', 'ME'), finer_resolution=None) -> dict:
+    """
+    Roll records per finer bin up to coarser resolutions, without revisiting the records.
+
+    Args:
+        finer_counts (pd.Series): Output of count_records_per_bin.
+        resolutions (iterable of str): Coarser resolutions, e.g. 'D', 'W', 'ME'.
+        finer_resolution (str or None): Width of the finer bins; defaults to the frequency of finer_counts.
+
+    Returns:
+        dict: resolution -> DataFrame with columns 'records' (records per bin),
+        'present_bins' (finer bins with at least one record per bin) and
+        'expected_bins' (finer bins per bin, e.g. 24 for days of hours, 168 for weeks).
+    """
+    if finer_resolution is None:
+        finer_resolution = finer_counts.index.freq
+    if finer_resolution is None:
+        raise ValueError("finer_resolution is required when finer_counts has no frequency.")
+
+    present = (finer_counts > 0).astype(int)
+    rolled = {}
+    for res in resolutions:
+        grouped = present.groupby(pd.Grouper(freq=res))
+        present_bins = grouped.sum()
+        rolled[res] = pd.DataFrame({
+            'records': finer_counts.groupby(pd.Grouper(freq=res)).sum(),
+            'present_bins': present_bins,
+            'expected_bins': expected_bins_per_period(present_bins.index, res, finer_resolution),
+        })
+    return rolled
+
+def expected_bins_per_period(labels, resolution, finer_resolution) -> np.ndarray:
+    """
+    Number of finer bins in each full resolution bin, from the bin edges.
+
+    Edge bins count in full, as partially covered days always have. Bins are
+    measured in local wall time, so days around a DST change count 24 hours.
+
+    Returns:
+        np.ndarray: int64 count per label.
+    """
+    labels = pd.DatetimeIndex(labels)
+    if len(labels) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if labels.tz is not None:
+        labels = labels.tz_localize(None)
+
+    edges = period_edges(labels, resolution)
+    step = fixed_step(finer_resolution)
+    if step is None:
+        bounds = pd.DatetimeIndex(edges.view('datetime64[ns]'))
+        return np.array([len(pd.date_range(start, end, freq=finer_resolution, inclusive='left'))
+                         for start, end in zip(bounds[:-1], bounds[1:])], dtype=np.int64)
+    first_bin = -((edges[0] - edges) // step.value)  # ceil((edge - first edge) / step)
+    return np.diff(first_bin)
+
+@profiled
+def dataset_bin_counts(data, finer_resolution='h'):
+    """
+    Single pass over one dataset collecting everything the summary metrics need.
+    The frame is not modified or copied.
+
+    Returns:
+        tuple: (finer_counts, total_records, missing_records, time_span)
+    """
+    dates = pd.to_datetime(data['Date'], errors='coerce')
+    valid = dates.notna().to_numpy()
+    dates = dates[valid]
+
+    total_records = int(valid.sum())
+    missing_records = 0
+    for col in data.columns.drop('Date'):
+        missing_records += int(data[col].isna().to_numpy()[valid].sum())
+    time_span = (dates.max() - dates.min()).days
+
+    return count_records_per_bin(dates, finer_resolution), total_records, missing_records, time_span
+
+@profiled
+def calculate_comprehensive_statistics(data_singleton, resolution='D', finer_resolution='h', threshold=0.8,
+                                       debug=False, max_workers=None):
     """
     Compute comprehensive statistics for each dataset, ensuring:
     - More accurate recorded data percentage
     - Stricter criteria for recorded bins (requiring at least 50% of hours)
     - Total expected bins remain all possible days
+
+    Each dataset is reduced to record counts per finer bin in one pass (see
+    dataset_bin_counts); datasets are processed in parallel.
     
     Args:
         data_singleton: The DataSingleton object containing datasets.
-        resolution (str): Temporal resolution for aggregation (e.g., 'D' for daily).
+        resolution (str or list): Temporal resolution for aggregation (e.g., 'D' for daily), or a
+            list of resolutions (e.g., ['D', 'W', 'ME']) rolled up from the same finer counts.
         finer_resolution (str): Finer resolution for checking data presence (e.g., 'H' for hourly).
         threshold (float): Minimum percentage of expected data per bin to be considered usable.
         debug (bool): Whether to print debug information for detailed analysis.
+        max_workers (int or None): Number of datasets processed concurrently.
 
     Returns:
-        pd.DataFrame: A DataFrame containing comprehensive statistics for each dataset.
+        pd.DataFrame: A DataFrame containing comprehensive statistics for each dataset;
+        a dict of resolution -> DataFrame when a list of resolutions is given.
     """
-    stats = {}
+    resolutions = [resolution] if isinstance(resolution, str) else list(resolution)
     prefixes = ['Sweden', 'Italy', 'Caliapt', 'Calihome']
     aggregated_datasets = {prefix: [] for prefix in prefixes}
     non_grouped_datasets = {}
     
     # Group datasets by prefix
-    for dataset_name in data_singleton._data_store:
+    dataset_names = data_singleton.dataset_names()
+    for dataset_name in dataset_names:
         matched = False
         for prefix in prefixes:
             if dataset_name.startswith(prefix):
@@ -33,66 +211,49 @@ def calculate_comprehensive_statistics(data_singleton, resolution='D', finer_res
         if not matched:
             non_grouped_datasets[dataset_name] = dataset_name
     
-    def compute_stats(data, dataset_name):
-        data['Date'] = pd.to_datetime(data['Date'], errors='coerce')
-        data = data.dropna(subset=['Date'])  # Ensure no missing dates
-        data.set_index('Date', inplace=True)  # Set Date as index
-        total_records = len(data)
-        
-        # Identify missing timestamps
-        missing_records = data.isnull().sum().sum()
-        completeness_ratio = (total_records - missing_records) / total_records if total_records > 0 else 0
-        
-        # Determine time span covered
-        time_span = (data.index.max() - data.index.min()).days
-        
-        # Resample to finer resolution and check data presence
-        finer_resampled_data = data.resample(finer_resolution).size()
-        finer_resampled_data = finer_resampled_data > 0
-        finer_resampled_data = finer_resampled_data.astype(int)
-
-        # Group by daily bins properly using pd.Grouper
-        daily_counts = finer_resampled_data.groupby(pd.Grouper(freq=resolution)).sum()
-        
-        total_expected_bins = len(daily_counts)
-        recorded_bins = (daily_counts >= 12).sum()  # Require at least 12 hours in a day
-        usable_bins = (daily_counts / 24 >= threshold).sum()
-        usable_bins2 = (daily_counts / 24 >= 0.5).sum()
-        
-        
-        if debug and dataset_name.startswith("Sweden"):
+    def compute_stats(dataset_name):
+        finer_counts, total_records, missing_records, time_span = dataset_bin_counts(
+            data_singleton.get_data(dataset_name), finer_resolution
+        )
+        rolled = roll_up_counts(finer_counts, resolutions, finer_resolution)
+        return {
+            res: (present_bin_statistics(rolled[res]['present_bins'], total_records, missing_records, time_span,
+                                         threshold, rolled[res]['expected_bins']), rolled[res]['present_bins'])
+            for res in resolutions
+        }
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(zip(dataset_names, executor.map(propagate(compute_stats), dataset_names)))
+
+    if debug:
+        for dataset_name, per_resolution in results.items():
+            if not dataset_name.startswith("Sweden"):
+                continue
+            dataset_stats, daily_counts = per_resolution[resolutions[0]]
             print(f"\nDebugging {dataset_name}:")
-            print(f"Total Expected Bins (All Days): {total_expected_bins}")
-            print(f"Recorded Bins (>=12 hours/day): {recorded_bins}")
-            print(f"Usable Bins (>80% data): {usable_bins}")
-            print(f"Total Records: {total_records}")
-            print(f"Missing Records: {missing_records}")
-            print(f"Completeness Ratio: {completeness_ratio * 100:.2f}%")
-            print(f"Time Span Covered (Days): {time_span}")
+            print(f"Total Expected Bins (All Days): {dataset_stats['Total Expected Bins']}")
+            print(f"Recorded Bins (>=12 hours/day): {dataset_stats['Recorded Bins (>=12h)']}")
+            print(f"Usable Bins (>80% data): {dataset_stats['Usable Bins (>80%)']}")
+            print(f"Total Records: {dataset_stats['Total Records']}")
+            print(f"Missing Records: {dataset_stats['Missing Records']}")
+            print(f"Completeness Ratio: {dataset_stats['Completeness Ratio']:.2f}%")
+            print(f"Time Span Covered (Days): {dataset_stats['Time Span (days)']}")
             print("Sample of Daily Bin Counts:")
             print(daily_counts.sample(10))  # Print 10 random daily bin counts for validation
-        
-        return {
-            'Total Records': total_records,
-            'Missing Records': missing_records,
-            'Completeness Ratio': completeness_ratio * 100,
-            'Time Span (days)': time_span,
-            'Total Expected Bins': total_expected_bins,
-            'Recorded Bins (>=12h)': recorded_bins,
-            'Usable Bins (>80%)': usable_bins,
-            'Percentage Recorded Data': (recorded_bins / total_expected_bins) * 100 if total_expected_bins > 0 else 0,
-            'Percentage Usable Data (>80%)': (usable_bins / total_expected_bins) * 100 if total_expected_bins > 0 else 0,
-            'Percentage Usable Data (>50%)': (usable_bins2 / total_expected_bins) * 100 if total_expected_bins > 0 else 0
-        }
-    
-    # Process grouped datasets by averaging sub-dataset statistics
-    for group, dataset_names in aggregated_datasets.items():
-        if dataset_names:
-            sub_stats = [compute_stats(data_singleton.get_data(name), name) for name in dataset_names]
-            stats[group] = {metric: sum(d[metric] for d in sub_stats) / len(sub_stats) for metric in sub_stats[0]}
-    
-    # Process non-grouped datasets individually
-    for dataset_name in non_grouped_datasets:
-        stats[dataset_name] = compute_stats(data_singleton.get_data(dataset_name), dataset_name)
-    
-    return pd.DataFrame.from_dict(stats, orient='index')
\ No newline at end of file
+
+    tables = {}
+    for res in resolutions:
+        stats = {}
+        # Process grouped datasets by averaging sub-dataset statistics
+        for group, names in aggregated_datasets.items():
+            if names:
+                sub_stats = [results[name][res][0] for name in names]
+                stats[group] = {metric: sum(d[metric] for d in sub_stats) / len(sub_stats) for metric in sub_stats[0]}
+
+        # Process non-grouped datasets individually
+        for dataset_name in non_grouped_datasets:
+            stats[dataset_name] = results[dataset_name][res][0]
+
+        tables[res] = pd.DataFrame.from_dict(stats, orient='index')
+
+    return tables[resolution] if isinstance(resolution, str) else tables